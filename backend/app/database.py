@@ -9,7 +9,13 @@ HYBRID APPROACH:
 from typing import Optional, Any
 from prisma import Prisma  # type: ignore
 from app.config import settings
+from app.utils.observabilitas import (
+    catat_operasi_db,
+    listener_perintah_motor,
+    listener_pool_motor
+)
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -36,8 +42,9 @@ def dapatkan_motor_client() -> Any:
             connectTimeoutMS=10000,
             socketTimeoutMS=10000,
             retryWrites=False,  # Cosmos DB requirement
-            maxPoolSize=50,
-            minPoolSize=10
+            maxPoolSize=settings.motor_max_pool_size,
+            minPoolSize=settings.motor_min_pool_size,
+            event_listeners=[listener_perintah_motor, listener_pool_motor]  # Metrik Prometheus
         )
         logger.info("🔧 Motor client singleton dibuat")
     return _motor_client
@@ -70,8 +77,36 @@ def dapatkan_collection(nama_collection: str) -> Any:
 
 
 # ===== PRISMA CLIENT (OPTIONAL - FALLBACK) =====
+class PrismaTerukur(Prisma):
+    """
+    Prisma Client yang mencatat latensi setiap query ke metrik Prometheus.
+    Semua action model (find_many, count, create, dll) lewat _execute.
+    """
+
+    async def _execute(self, *, method: Any, arguments: Any, model: Any = None, root_selection: Any = None) -> Any:
+        mulai = time.perf_counter()
+        berhasil = False
+        try:
+            hasil = await super()._execute(
+                method=method,
+                arguments=arguments,
+                model=model,
+                root_selection=root_selection
+            )
+            berhasil = True
+            return hasil
+        finally:
+            catat_operasi_db(
+                "prisma",
+                getattr(model, "__name__", "-"),
+                str(method),
+                time.perf_counter() - mulai,
+                berhasil=berhasil
+            )
+
+
 # Instance Prisma Client
-prisma = Prisma()
+prisma = PrismaTerukur()
 
 
 async def sambungkan_prisma() -> bool:
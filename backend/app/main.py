@@ -11,8 +11,22 @@ Core Objectives:
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from app.config import settings
 from app.database import sambungkan_database, putuskan_database
+from app.middleware.metrik_api import MiddlewareMetrikAPI, pencatat_metrik_api
+from app.middleware.prometheus import MiddlewarePrometheus
+from app.utils.observabilitas import monitor_event_loop, render_metrik
+from app.services.health_service import cek_kesiapan
+from app.services.export_service import batalkan_semua_export
+from app.services.penilaian_service import pool_sandbox
+from app.services.duplikat_service import batalkan_backfill
+from app.services.rekomendasi_service import penjadwal_rekomendasi
+from app.services.miskonsepsi_service import penjadwal_miskonsepsi
+from app.services.penguasaan_service import penjadwal_bkt
+from app.services.pola_sekuens_service import penjadwal_pola_sekuens
+from app.services.template_error_service import batalkan_backfill_template
+from app.utils.auth import tutup_executor_bcrypt
 from app.routes import auth, analyze, history, patterns, admin, mahasiswa, exercise
 
 # Inisialisasi FastAPI app
@@ -24,6 +38,14 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Metrik per request (MetrikAPI) - ditambahkan sebelum CORS agar preflight tidak ikut tercatat
+if settings.metrik_api_aktif:
+    app.add_middleware(MiddlewareMetrikAPI)
+
+# Histogram latensi per rute untuk Prometheus
+if settings.prometheus_aktif:
+    app.add_middleware(MiddlewarePrometheus)
+
 # CORS middleware untuk frontend Next.js
 app.add_middleware(
     CORSMiddleware,
@@ -82,6 +104,14 @@ async def startup():
     """Event handler saat aplikasi startup"""
     print("🚀 PahamKode Backend starting...")
     await sambungkan_database()
+    if settings.metrik_api_aktif:
+        pencatat_metrik_api.mulai()
+    if settings.prometheus_aktif:
+        monitor_event_loop.mulai()
+    penjadwal_rekomendasi.mulai()
+    penjadwal_miskonsepsi.mulai()
+    penjadwal_bkt.mulai()
+    penjadwal_pola_sekuens.mulai()
     print("✅ Backend siap!")
 
 
@@ -89,6 +119,18 @@ async def startup():
 async def shutdown():
     """Event handler saat aplikasi shutdown"""
     print("⏹️  PahamKode Backend shutting down...")
+    if settings.metrik_api_aktif:
+        await pencatat_metrik_api.hentikan()
+    await monitor_event_loop.hentikan()
+    await penjadwal_rekomendasi.hentikan()
+    await penjadwal_miskonsepsi.hentikan()
+    await penjadwal_bkt.hentikan()
+    await penjadwal_pola_sekuens.hentikan()
+    await batalkan_semua_export()
+    await pool_sandbox.hentikan()
+    await batalkan_backfill()
+    await batalkan_backfill_template()
+    tutup_executor_bcrypt()
     await putuskan_database()
 
 
@@ -105,8 +147,49 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint untuk monitoring"""
-    return {
-        "status": "sehat",
-        "database": "terhubung"
-    }
+    """
+    Health check endpoint untuk monitoring
+
+    Status code sama dengan /readyz (503 jika komponen wajib tidak siap);
+    body menyebut status tiap database dan komponen yang membuatnya tidak sehat.
+    """
+    kesiapan = await cek_kesiapan()
+    sehat = kesiapan["status"] == "siap"
+    komponen = kesiapan["komponen"]
+    return JSONResponse(
+        status_code=200 if sehat else 503,
+        content={
+            "status": "sehat" if sehat else "tidak_sehat",
+            "database": "terhubung" if komponen["motor"]["status"] == "ok" else "terputus",
+            "prisma": "terhubung" if komponen["prisma"]["status"] == "ok" else "terputus",
+            "penyebab": kesiapan["gagal"]
+        }
+    )
+
+
+@app.get("/livez")
+async def liveness_probe():
+    """Liveness probe: proses hidup dan event loop masih melayani request"""
+    return {"status": "hidup"}
+
+
+@app.get("/readyz")
+async def readiness_probe():
+    """
+    Readiness probe untuk orchestrator/load balancer
+    
+    Returns 503 jika Motor (atau Prisma bila HEALTH_WAJIB_PRISMA) tidak siap, pool
+    koneksi jenuh, atau event loop tertahan
+    """
+    kesiapan = await cek_kesiapan()
+    return JSONResponse(
+        status_code=200 if kesiapan["status"] == "siap" else 503,
+        content=kesiapan
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Endpoint Prometheus/OpenMetrics untuk scraping"""
+    isi, content_type = render_metrik()
+    return Response(content=isi, media_type=content_type)
@@ -0,0 +1,239 @@
+"""
+Middleware pencatatan metrik HTTP ke collection MetrikAPI
+
+Setiap request dicatat (endpoint template, method, status, durasi, user agent, IP)
+ke ring buffer di memori tanpa await apapun di jalur request. Task background
+kemudian mem-flush buffer ke database secara batch dengan insert_many.
+
+Catatan:
+- Ring buffer memakai collections.deque(maxlen=N): append/popleft atomic di CPython,
+  jadi tidak butuh lock. Jika buffer penuh, entri tertua dibuang (dan dihitung).
+- Rute dengan volume tinggi bisa di-sampling (lihat METRIK_API_SAMPLING).
+  Setiap entri menyimpan bobot_sampel = 1/rate agar agregasi tetap tidak bias.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Collection hasil @@map("metrik_api") di schema.prisma
+METRIK_API_COLLECTION = "metrik_api"
+
+# Endpoint yang tidak perlu dicatat (monitoring & dokumentasi)
+JALUR_DIKECUALIKAN = {"/health", "/livez", "/readyz", "/metrics", "/docs", "/redoc", "/openapi.json", "/favicon.ico"}
+
+# Template untuk request yang tidak cocok dengan rute manapun (hindari kardinalitas tinggi)
+TEMPLATE_TIDAK_DIKENAL = "<tidak_dikenal>"
+
+
+def dapatkan_template_endpoint(scope: Dict[str, Any]) -> str:
+    """
+    Ambil template path rute (misal "/api/admin/mahasiswa/{id_mahasiswa}")
+    dari scope ASGI. FastAPI mengisi scope["route"] saat routing.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    return template or TEMPLATE_TIDAK_DIKENAL
+
+
+def dapatkan_header(scope: Dict[str, Any], nama: bytes) -> Optional[str]:
+    """Ambil nilai header (nama lowercase) dari scope ASGI"""
+    for kunci, nilai in scope.get("headers", []):
+        if kunci == nama:
+            return nilai.decode("latin-1")
+    return None
+
+
+def dapatkan_ip_klien(scope: Dict[str, Any]) -> Optional[str]:
+    """
+    Ambil IP klien. Hop X-Forwarded-For dari kiri bisa diisi bebas oleh klien, jadi
+    hanya hop yang ditambahkan proxy tepercaya yang dipakai: dengan
+    JUMLAH_PROXY_TEPERCAYA = n, IP klien adalah hop ke-n dari kanan. n = 0 (atau
+    header lebih pendek dari n) -> alamat koneksi langsung (scope["client"]).
+    """
+    jumlah_proxy = settings.jumlah_proxy_tepercaya
+    if jumlah_proxy > 0:
+        forwarded = dapatkan_header(scope, b"x-forwarded-for")
+        hop = [h.strip() for h in forwarded.split(",")] if forwarded else []
+        if len(hop) >= jumlah_proxy and hop[-jumlah_proxy]:
+            return hop[-jumlah_proxy]
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+class PencatatMetrikAPI:
+    """
+    Ring buffer metrik API + flusher background ke database
+    """
+
+    def __init__(
+        self,
+        ukuran_buffer: int = 10000,
+        ukuran_batch: int = 500,
+        interval_flush: float = 5.0,
+        sampling: Optional[Dict[str, float]] = None,
+        sampling_default: float = 1.0
+    ):
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=ukuran_buffer)
+        self._ukuran_batch = ukuran_batch
+        self._interval_flush = interval_flush
+        self._sampling = sampling or {}
+        self._sampling_default = sampling_default
+        self._task: Optional[asyncio.Task] = None
+        self.jumlah_dibuang = 0
+        self.jumlah_ditulis = 0
+
+    def catat(
+        self,
+        endpoint: str,
+        method: str,
+        status_code: int,
+        waktu_respons_ms: float,
+        user_agent: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        error_message: Optional[str] = None
+    ) -> None:
+        """
+        Catat satu request ke buffer (sinkron, tanpa I/O).
+        Error (status >= 500) selalu dicatat penuh agar pesan error tidak hilang karena sampling.
+        """
+        rate = self._sampling.get(endpoint, self._sampling_default)
+        if status_code >= 500:
+            rate = 1.0
+        if rate <= 0 or (rate < 1.0 and random.random() >= rate):
+            return
+
+        if len(self._buffer) == self._buffer.maxlen:
+            self.jumlah_dibuang += 1
+
+        # Nama field mengikuti @map di model MetrikAPI (schema.prisma)
+        self._buffer.append({
+            "endpoint": endpoint,
+            "method": method,
+            "status_code": status_code,
+            "waktu_respons": round(waktu_respons_ms, 3),
+            "user_agent": user_agent,
+            "ip_address": ip_address,
+            "error_message": error_message,
+            "bobot_sampel": 1.0 / rate,
+            "created_at": datetime.utcnow()
+        })
+
+    def _ambil_batch(self) -> List[Dict[str, Any]]:
+        """Ambil maksimal ukuran_batch entri dari depan buffer"""
+        batch: List[Dict[str, Any]] = []
+        while self._buffer and len(batch) < self._ukuran_batch:
+            batch.append(self._buffer.popleft())
+        return batch
+
+    async def flush(self) -> int:
+        """
+        Tulis seluruh isi buffer ke database (batch per batch)
+
+        Returns:
+            Jumlah entri yang berhasil ditulis
+        """
+        from app.database import dapatkan_collection
+
+        total = 0
+        while self._buffer:
+            batch = self._ambil_batch()
+            try:
+                collection = dapatkan_collection(METRIK_API_COLLECTION)
+                await collection.insert_many(batch, ordered=False)
+                total += len(batch)
+            except Exception as e:
+                # Metrik bersifat best-effort: jangan retry agar buffer tidak menumpuk
+                self.jumlah_dibuang += len(batch)
+                logger.warning(f"⚠️ Gagal flush {len(batch)} metrik API: {e}")
+                break
+
+        self.jumlah_ditulis += total
+        return total
+
+    async def _loop_flush(self) -> None:
+        """Loop background: flush buffer setiap interval_flush detik"""
+        while True:
+            await asyncio.sleep(self._interval_flush)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"⚠️ Loop flush metrik API error: {e}")
+
+    def mulai(self) -> None:
+        """Mulai task flusher background (dipanggil saat startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop_flush())
+            logger.info("📊 Flusher metrik API dimulai")
+
+    async def hentikan(self) -> None:
+        """Hentikan flusher dan tulis sisa buffer (dipanggil saat shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        logger.info(f"📊 Flusher metrik API berhenti (ditulis: {self.jumlah_ditulis}, dibuang: {self.jumlah_dibuang})")
+
+
+# Singleton instance
+pencatat_metrik_api = PencatatMetrikAPI(
+    ukuran_buffer=settings.metrik_api_ukuran_buffer,
+    ukuran_batch=settings.metrik_api_ukuran_batch,
+    interval_flush=settings.metrik_api_interval_flush,
+    sampling=settings.metrik_api_sampling,
+    sampling_default=settings.metrik_api_sampling_default
+)
+
+
+class MiddlewareMetrikAPI:
+    """
+    ASGI middleware yang mengukur setiap request HTTP dan
+    mencatatnya ke PencatatMetrikAPI
+    """
+
+    def __init__(self, app: Any, pencatat: Optional[PencatatMetrikAPI] = None):
+        self.app = app
+        self.pencatat = pencatat or pencatat_metrik_api
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope.get("path") in JALUR_DIKECUALIKAN:
+            await self.app(scope, receive, send)
+            return
+
+        mulai = time.perf_counter()
+        status_code = 500
+        error_message: Optional[str] = None
+
+        async def kirim(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, kirim)
+        except Exception as e:
+            error_message = f"{type(e).__name__}: {e}"[:500]
+            raise
+        finally:
+            self.pencatat.catat(
+                endpoint=dapatkan_template_endpoint(scope),
+                method=scope.get("method", ""),
+                status_code=status_code,
+                waktu_respons_ms=(time.perf_counter() - mulai) * 1000,
+                user_agent=dapatkan_header(scope, b"user-agent"),
+                ip_address=dapatkan_ip_klien(scope),
+                error_message=error_message
+            )
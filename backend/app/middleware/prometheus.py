@@ -0,0 +1,47 @@
+"""
+Middleware metrik Prometheus - latensi per rute & request in-flight
+"""
+
+import time
+from typing import Any, Dict
+
+from app.middleware.metrik_api import dapatkan_template_endpoint
+from app.utils.observabilitas import LATENSI_HTTP, REQUEST_IN_FLIGHT
+
+# Endpoint scrape sendiri tidak perlu diukur
+JALUR_DIKECUALIKAN = {"/metrics"}
+
+
+class MiddlewarePrometheus:
+    """
+    ASGI middleware yang mengisi histogram latensi HTTP per template rute.
+    Label memakai template (bukan path mentah) agar kardinalitas tetap rendah.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope.get("path") in JALUR_DIKECUALIKAN:
+            await self.app(scope, receive, send)
+            return
+
+        mulai = time.perf_counter()
+        status_code = 500
+
+        async def kirim(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUEST_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, kirim)
+        finally:
+            REQUEST_IN_FLIGHT.dec()
+            LATENSI_HTTP.labels(
+                dapatkan_template_endpoint(scope),
+                scope.get("method", ""),
+                str(status_code)
+            ).observe(time.perf_counter() - mulai)
@@ -4,7 +4,7 @@ Semua field menggunakan Bahasa Indonesia sesuai syarat pengembangan
 """
 
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from typing import Dict, List, Optional
 from enum import Enum
 from datetime import datetime
 
@@ -224,15 +224,30 @@ class RequestBulkAction(BaseModel):
 # Admin - AI Metrics Schemas
 # ============================================================
 
+class MetrikRuteAI(BaseModel):
+    """Metrik AI per rute router model"""
+    rute: str = Field(..., description="kecil / besar ('-' untuk data sebelum router)")
+    total_requests: int = Field(..., description="Request yang pertama kali diarahkan ke rute ini (tanpa fallback)")
+    jumlah_percobaan: int = Field(..., description="Semua panggilan LLM di rute ini, termasuk fallback")
+    total_token: int
+    total_biaya: float = Field(..., description="Total biaya dalam USD")
+    rata_rata_waktu_respons: float = Field(..., description="Rata-rata waktu respons per percobaan dalam detik")
+    success_rate: float = Field(..., description="Persentase percobaan berhasil (parse sukses)")
+    jumlah_fallback: int = Field(..., description="Percobaan fallback (setelah parse model kecil gagal) di rute ini")
+
+
 class ResponseMetrikAI(BaseModel):
     """Response untuk metrik AI"""
-    total_requests: int = Field(..., description="Total request ke AI")
+    total_requests: int = Field(..., description="Total request analisis ke AI (fallback tidak dihitung ulang)")
+    total_percobaan: int = Field(..., description="Total panggilan LLM, termasuk fallback")
+    total_fallback: int = Field(..., description="Panggilan fallback ke model besar setelah parse model kecil gagal")
     total_token_input: int = Field(..., description="Total token input")
     total_token_output: int = Field(..., description="Total token output")
     total_token: int = Field(..., description="Total semua token")
     total_biaya: float = Field(..., description="Total biaya dalam USD")
-    rata_rata_waktu_respons: float = Field(..., description="Rata-rata waktu respons dalam detik")
-    success_rate: float = Field(..., description="Persentase request berhasil")
+    rata_rata_waktu_respons: float = Field(..., description="Rata-rata waktu respons per request dalam detik (termasuk fallback)")
+    success_rate: float = Field(..., description="Persentase request berhasil (hasil akhir setelah fallback)")
+    per_rute: List[MetrikRuteAI] = Field(default=[], description="Rincian per rute model (kecil/besar)")
 
 
 # ============================================================
@@ -299,6 +314,32 @@ class RequestExportLaporan(BaseModel):
     periode: str = Field(default="bulan_ini", description="Periode: minggu_ini, bulan_ini, semua")
 
 
+class RequestExportKohort(BaseModel):
+    """Request untuk export kohort (admin), dijalankan sebagai background job"""
+    dataset: str = Field(default="submisi", description="Dataset: submisi, pola, progress")
+    format: str = Field(default="csv", description="Format: csv atau parquet")
+    gzip: bool = Field(default=False, description="Kompres CSV dengan gzip (diabaikan untuk parquet)")
+    tanggal_mulai: Optional[datetime] = Field(None, description="Filter tanggal mulai (inklusif)")
+    tanggal_selesai: Optional[datetime] = Field(None, description="Filter tanggal selesai (eksklusif)")
+    topik: Optional[str] = Field(None, description="Filter topik")
+    role: Optional[str] = Field(default="mahasiswa", description="Filter role user (kosong = semua)")
+
+
+class ResponseJobExport(BaseModel):
+    """Response status job export kohort"""
+    id_job: str
+    status: str = Field(..., description="menunggu, berjalan, selesai, gagal")
+    dataset: str
+    format: str
+    baris_diproses: int
+    total_baris: Optional[int] = Field(None, description="Perkiraan total baris (count saat job mulai)")
+    persentase: float
+    dibuat: datetime
+    selesai: Optional[datetime]
+    pesan_error: Optional[str]
+    url_download: Optional[str]
+
+
 # ============================================================
 # Topik Pembelajaran Schemas
 # ============================================================
@@ -314,6 +355,12 @@ class RequestTambahTopik(BaseModel):
     estimasi_waktu: Optional[int] = Field(None, description="Estimasi waktu dalam menit")
 
 
+class RequestGabungTopik(BaseModel):
+    """Request untuk menggabungkan variasi topik ke satu topik pembelajaran"""
+    sumber: List[str] = Field(..., min_length=1, description="Variasi topik yang digabung (mis. 'Looping', 'perulangan')")
+    tujuan: str = Field(..., description="Nama topik pembelajaran tujuan")
+
+
 class ResponseTopikPembelajaran(BaseModel):
     """Response untuk topik pembelajaran"""
     id: str
@@ -352,12 +399,63 @@ class ResponseTopikSulit(BaseModel):
     rata_rata_penguasaan: float = Field(..., description="Rata-rata tingkat penguasaan")
 
 
+class ResponsePolaSekuens(BaseModel):
+    """Response untuk pola sekuens error (urutan transisi yang sering muncul)"""
+    dimensi: str = Field(..., description="tipe_error atau topik")
+    pola: List[str] = Field(..., description="Urutan tipe error / topik")
+    panjang: int = Field(..., description="Jumlah langkah dalam pola")
+    jumlah_mahasiswa: int = Field(..., description="Jumlah mahasiswa yang riwayatnya memuat pola")
+    persentase_mahasiswa: float = Field(..., description="Persentase dari mahasiswa dengan >= 2 error")
+    dihitung: datetime = Field(..., description="Waktu batch mining")
+
+
 class ResponseRekomendasiKurikulum(BaseModel):
     """Response untuk rekomendasi kurikulum"""
     topik_prioritas: List[str] = Field(..., description="Topik yang perlu diprioritaskan")
     topik_mudah: List[str] = Field(..., description="Topik yang sudah dikuasai")
     gap_pembelajaran: List[str] = Field(..., description="Gap yang perlu diisi")
     saran_urutan: List[str] = Field(..., description="Urutan pembelajaran yang disarankan")
+    topik_sering_bersamaan: Dict[str, List[str]] = Field(
+        default_factory=dict,
+        description="Per topik prioritas: topik yang paling sering gagal bersamaan"
+    )
+    topik_terblokir: Dict[str, List[str]] = Field(
+        default_factory=dict,
+        description="Per topik yang disarankan: prerequisite (transitif) yang belum dikuasai kohort"
+    )
+
+
+class PasanganTopikKookurensi(BaseModel):
+    """Satu topik yang sering muncul bersama topik acuan"""
+    topik: str
+    jumlah_bersama: int = Field(..., description="Jumlah submisi error yang memuat kedua topik")
+    probabilitas_bersyarat: float = Field(..., description="P(topik ini | topik acuan)")
+    jaccard: float = Field(..., description="Jumlah bersama / gabungan submisi kedua topik")
+
+
+class TipeErrorTemplate(BaseModel):
+    """Sebaran tipe_error (wording LLM) dalam satu template error"""
+    tipe_error: Optional[str] = None
+    jumlah: int
+
+
+class ResponseTemplateError(BaseModel):
+    """Response untuk template pesan error (hasil template mining Drain)"""
+    id_template: str = Field(..., description="ID template, kunci grouping SubmisiError.idTemplate")
+    template: str = Field(..., description="Template pesan, bagian variabel diganti <*> / <STR> / <NUM> / <PATH>")
+    jumlah: int = Field(..., description="Jumlah submisi dengan template ini")
+    jumlah_mahasiswa: int = Field(..., description="Jumlah mahasiswa berbeda")
+    tipe_error: List[TipeErrorTemplate] = Field(default=[], description="tipe_error terbanyak untuk template ini")
+    contoh: Optional[str] = Field(None, description="Contoh pesan error asli")
+    dibuat: Optional[datetime] = None
+    terakhir: Optional[datetime] = None
+
+
+class ResponseKookurensiTopik(BaseModel):
+    """Response untuk top-k topik yang sering gagal bersamaan"""
+    topik: str
+    jumlah_submisi: int = Field(..., description="Jumlah submisi error yang memuat topik acuan")
+    pasangan: List[PasanganTopikKookurensi]
 
 
 # ============================================================
@@ -373,7 +471,11 @@ class RequestTambahExercise(BaseModel):
     instruksi: str = Field(..., description="Instruksi lengkap")
     kode_pemula: Optional[str] = Field(None, description="Starter code")
     solusi_referensi: str = Field(..., description="Reference solution")
-    test_cases: List[str] = Field(default=[], description="Test case descriptions")
+    test_cases: List[str] = Field(
+        default=[],
+        description='Test case: deskripsi, atau JSON yang bisa dieksekusi '
+                    '{"input": ..., "output_diharapkan": ...} / {"ekspresi": ..., "hasil_diharapkan": ...}'
+    )
     poin_belajar: List[str] = Field(default=[], description="Learning points")
     estimasi_waktu: Optional[int] = Field(None, description="Estimasi waktu (menit)")
 
@@ -401,6 +503,48 @@ class RequestSubmitExercise(BaseModel):
     kode_submisi: str = Field(..., description="Kode solusi mahasiswa")
 
 
+class AnggotaKlasterDuplikat(BaseModel):
+    """Satu submisi di dalam klaster duplikat"""
+    id_submission: str
+    id_mahasiswa: str
+    nama_mahasiswa: Optional[str] = None
+    nilai_score: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+
+class KlasterDuplikat(BaseModel):
+    """Kelompok submisi yang saling mirip (estimasi Jaccard >= ambang)"""
+    jumlah_submisi: int
+    jumlah_mahasiswa: int
+    kemiripan_minimum: float
+    anggota: List[AnggotaKlasterDuplikat]
+
+
+class ResponseKlasterDuplikat(BaseModel):
+    """Response klaster duplikat submisi per exercise"""
+    id_exercise: str
+    ambang: float
+    jumlah_klaster: int
+    klaster: List[KlasterDuplikat]
+
+
+class ResponseStatusBackfill(BaseModel):
+    """Status job backfill (signature MinHash / template error)"""
+    berjalan: bool
+    diproses: int
+    mulai: Optional[datetime] = None
+    selesai: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class HasilTestCase(BaseModel):
+    """Hasil satu test case dari sandbox penilaian"""
+    nomor: int
+    status: str  # lulus, gagal, error, timeout
+    pesan: Optional[str] = None
+    durasi_ms: float
+
+
 class ResponseExerciseSubmission(BaseModel):
     """Response untuk exercise submission"""
     id: str
@@ -411,4 +555,6 @@ class ResponseExerciseSubmission(BaseModel):
     nilai_score: Optional[int]
     feedback: Optional[str]
     created_at: datetime
+    hasil_test: Optional[List[HasilTestCase]] = None  # Hanya saat submit & test case dijalankan
+    kemiripan_struktur: Optional[float] = None  # 0-1, kemiripan AST dengan solusi referensi (saat submit)
 
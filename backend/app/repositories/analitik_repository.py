@@ -0,0 +1,51 @@
+"""
+Analitik Repository - agregasi Motor untuk statistik per mahasiswa
+
+Dipakai oleh dashboard mahasiswa dan detail mahasiswa (admin) untuk menggantikan
+banyak query count/find_many terpisah dengan satu pipeline $facet per collection.
+Nama field mengikuti mapping Prisma (@map), jadi pakai snake_case.
+"""
+from typing import Any, Dict, List, Union
+from bson import ObjectId
+from app.database import dapatkan_collection
+
+
+def ke_object_id(id_mahasiswa: Union[str, ObjectId]) -> Union[str, ObjectId]:
+    """
+    Konversi id mahasiswa ke ObjectId (field id_mahasiswa disimpan sebagai @db.ObjectId)
+    ID yang tidak valid dikembalikan apa adanya agar query tidak crash (hasilnya kosong).
+    """
+    if isinstance(id_mahasiswa, ObjectId):
+        return id_mahasiswa
+    return ObjectId(id_mahasiswa) if ObjectId.is_valid(id_mahasiswa) else id_mahasiswa
+
+
+async def agregasi_facet(
+    nama_collection: str,
+    filter_match: Dict[str, Any],
+    facet: Dict[str, List[Dict[str, Any]]]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Jalankan satu pipeline [$match, $facet] dalam satu round-trip
+
+    Args:
+        nama_collection: Nama collection MongoDB
+        filter_match: Filter $match (sebaiknya memakai field ber-index, misal id_mahasiswa)
+        facet: Sub-pipeline per panel, {nama_panel: [stage, ...]}
+
+    Returns:
+        Dict {nama_panel: list hasil}; panel tanpa hasil berisi list kosong
+    """
+    collection = dapatkan_collection(nama_collection)
+    hasil = await collection.aggregate([
+        {"$match": filter_match},
+        {"$facet": facet}
+    ]).to_list(length=1)
+
+    dokumen = hasil[0] if hasil else {}
+    return {nama: dokumen.get(nama, []) for nama in facet}
+
+
+def ambil_count(panel: List[Dict[str, Any]], field: str = "jumlah") -> int:
+    """Ambil nilai dari panel {$count: field}; panel kosong berarti 0"""
+    return int(panel[0].get(field, 0)) if panel else 0
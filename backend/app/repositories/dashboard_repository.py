@@ -0,0 +1,115 @@
+"""
+Dashboard Repository - snapshot dashboard per mahasiswa (Motor)
+
+Satu dokumen per mahasiswa di collection "dashboard_mahasiswa" (_id = id mahasiswa),
+diperbarui secara incremental saat analisis baru masuk, sehingga GET dashboard
+cukup satu find_one. Field "versi" naik setiap kali snapshot berubah dan dipakai
+sebagai optimistic lock saat snapshot dibangun ulang.
+"""
+from typing import Any, Dict, Optional
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from app.database import dapatkan_collection
+import logging
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_COLLECTION = "dashboard_mahasiswa"
+
+# Jumlah aktivitas terbaru yang disimpan di snapshot
+JUMLAH_AKTIVITAS = 5
+
+
+async def ambil_snapshot(id_mahasiswa: str) -> Optional[Dict[str, Any]]:
+    """Ambil snapshot dashboard (None jika belum pernah dibangun)"""
+    return await dapatkan_collection(DASHBOARD_COLLECTION).find_one({"_id": id_mahasiswa})
+
+
+async def simpan_snapshot(id_mahasiswa: str, data: Dict[str, Any], versi_lama: Optional[int]) -> bool:
+    """
+    Simpan snapshot hasil bangun ulang, hanya jika tidak ada update lain sejak dibaca
+
+    Args:
+        id_mahasiswa: ID mahasiswa
+        data: Isi snapshot (tanpa _id/versi/basi)
+        versi_lama: Versi snapshot saat dibaca (None jika belum ada)
+
+    Returns:
+        True jika tersimpan, False jika kalah balapan dengan update lain
+    """
+    dokumen = {
+        **data,
+        "versi": (versi_lama or 0) + 1,
+        "basi": False,
+        "diperbarui": datetime.utcnow()
+    }
+    collection = dapatkan_collection(DASHBOARD_COLLECTION)
+    try:
+        if versi_lama is None:
+            await collection.insert_one({"_id": id_mahasiswa, **dokumen})
+            return True
+        hasil = await collection.replace_one({"_id": id_mahasiswa, "versi": versi_lama}, dokumen)
+        return hasil.modified_count == 1
+    except DuplicateKeyError:
+        return False
+
+
+async def catat_analisis_baru(
+    id_mahasiswa: str,
+    aktivitas: Dict[str, Any],
+    awal_minggu: datetime
+) -> bool:
+    """
+    Update incremental saat satu submisi error baru tersimpan
+
+    Hanya berlaku jika snapshot masih segar dan masih di minggu yang sama;
+    selain itu snapshot ditandai basi dan dibangun ulang saat dibaca.
+
+    Returns:
+        True jika snapshot ter-update secara incremental
+    """
+    collection = dapatkan_collection(DASHBOARD_COLLECTION)
+    hasil = await collection.update_one(
+        {"_id": id_mahasiswa, "basi": False, "awal_minggu": awal_minggu},
+        {
+            "$inc": {"total_error": 1, "error_minggu_ini": 1, "versi": 1},
+            "$push": {
+                "aktivitas_terbaru": {
+                    "$each": [aktivitas],
+                    "$position": 0,
+                    "$slice": JUMLAH_AKTIVITAS
+                }
+            },
+            "$set": {"diperbarui": datetime.utcnow()}
+        }
+    )
+    if hasil.matched_count == 0:
+        await tandai_basi(id_mahasiswa)
+        return False
+    return True
+
+
+async def perbarui_ringkasan_progress(id_mahasiswa: str, ringkasan: Dict[str, Any]) -> None:
+    """Set field turunan progress_belajar/pola_error (dihitung ulang oleh service)"""
+    hasil = await dapatkan_collection(DASHBOARD_COLLECTION).update_one(
+        {"_id": id_mahasiswa, "basi": False},
+        {
+            "$set": {**ringkasan, "diperbarui": datetime.utcnow()},
+            "$inc": {"versi": 1}
+        }
+    )
+    if hasil.matched_count == 0:
+        await tandai_basi(id_mahasiswa)
+
+
+async def tandai_basi(id_mahasiswa: str) -> None:
+    """
+    Tandai snapshot basi agar dibangun ulang pada pembacaan berikutnya.
+    Upsert: jika snapshot sedang dibangun pertama kali, insert-nya akan gagal
+    (DuplicateKeyError) sehingga snapshot yang ketinggalan tidak tersimpan.
+    """
+    await dapatkan_collection(DASHBOARD_COLLECTION).update_one(
+        {"_id": id_mahasiswa},
+        {"$set": {"basi": True}, "$inc": {"versi": 1}},
+        upsert=True
+    )
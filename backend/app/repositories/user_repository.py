@@ -10,7 +10,10 @@ Semua operasi User CRUD menggunakan Motor secara langsung.
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from bson import ObjectId
+from app.config import settings
 from app.database import dapatkan_collection
+from app.utils.cache import CacheTTL
+from app.utils.loader import LoaderBatch
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,8 +21,19 @@ logger = logging.getLogger(__name__)
 # Collection name
 USERS_COLLECTION = "User"
 
+# Cache user by id (untuk dependency autentikasi yang dipanggil setiap request)
+_cache_user = CacheTTL("user", ukuran_maks=settings.user_cache_ukuran, ttl_detik=settings.user_cache_ttl)
+
 # ===== HELPER FUNCTIONS =====
 
+def _konversi_user_batch(doc: Dict[str, Any]) -> Dict[str, Any]:
+    user = _convert_user_doc(doc) or {}
+    user.pop("passwordHash", None)
+    return user
+
+# Loader batch untuk join user by id (tanpa cache, passwordHash tidak ikut)
+_loader_user = LoaderBatch(USERS_COLLECTION, konversi=_konversi_user_batch)
+
 def _convert_user_doc(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     """
     Convert MongoDB document ke format yang compatible dengan API.
@@ -149,6 +163,46 @@ async def cari_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
         logger.error(f"❌ Error finding user by id: {e}")
         return None
 
+async def cari_user_by_id_cached(user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Cari user berdasarkan ID lewat cache TTL pendek.
+    Dipakai di jalur autentikasi; cache di-invalidasi saat user di-update/dihapus.
+    
+    Args:
+        user_id: ObjectId string dari user
+    
+    Returns:
+        Salinan dict user jika ditemukan, None jika tidak ada
+    """
+    user = await _cache_user.dapatkan_atau_muat(user_id, lambda: cari_user_by_id(user_id))
+    return dict(user) if user else None
+
+async def cari_user_by_ids(user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Cari banyak user sekaligus (satu query $in), untuk join manual by id.
+    
+    Args:
+        user_ids: List ObjectId string user (boleh berulang)
+    
+    Returns:
+        Dict {user_id: user}; ID yang tidak ditemukan tidak ada di dict
+    """
+    try:
+        return await _loader_user.muat_banyak(user_ids)
+    except Exception as e:
+        logger.error(f"❌ Error finding users by ids: {e}")
+        return {}
+
+def invalidasi_cache_user(user_ids: List[str]) -> None:
+    """
+    Hapus user dari cache setelah write (update, delete, bulk action)
+    
+    Args:
+        user_ids: List ObjectId string user yang berubah
+    """
+    for user_id in user_ids:
+        _cache_user.hapus(user_id)
+
 async def ambil_semua_user(
     skip: int = 0,
     limit: int = 100,
@@ -246,6 +300,7 @@ async def update_user(
             {"_id": ObjectId(user_id)},
             {"$set": update_data}
         )
+        invalidasi_cache_user([user_id])
         
         if result.modified_count > 0:
             logger.info(f"✅ User updated: {user_id}")
@@ -296,6 +351,7 @@ async def hapus_user(user_id: str) -> bool:
         
         # Delete
         result = await users.delete_one({"_id": ObjectId(user_id)})
+        invalidasi_cache_user([user_id])
         
         if result.deleted_count > 0:
             logger.info(f"✅ User deleted: {user_id}")
@@ -4,6 +4,7 @@ Hanya dapat diakses oleh user dengan role "admin"
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query
+from app.config import settings
 from app.models.schemas import (
     ResponseStatistikDashboard,
     ResponseMahasiswaList,
@@ -16,10 +17,18 @@ from app.models.schemas import (
     RequestTambahSumberDaya,
     ResponseSumberDaya,
     RequestTambahTopik,
+    RequestGabungTopik,
     ResponseTopikPembelajaran,
     ResponseSystemHealth,
     ResponseTopikSulit,
-    ResponseRekomendasiKurikulum
+    ResponsePolaSekuens,
+    ResponseKookurensiTopik,
+    ResponseTemplateError,
+    ResponseRekomendasiKurikulum,
+    RequestExportKohort,
+    ResponseJobExport,
+    ResponseKlasterDuplikat,
+    ResponseStatusBackfill
 )
 from app.services.admin_service import (
     dapatkan_statistik_dashboard,
@@ -34,7 +43,33 @@ from app.services.admin_service import (
     dapatkan_rekomendasi_kurikulum,
     dapatkan_system_health
 )
+from app.services.export_service import (
+    mulai_export_kohort,
+    dapatkan_job_export,
+    daftar_job_export
+)
+from app.services.duplikat_service import (
+    dapatkan_klaster_duplikat,
+    mulai_backfill_minhash,
+    dapatkan_status_backfill
+)
+from app.services.graf_topik_service import graf_topik
+from app.services.kanonik_topik_service import gabungkan_topik, kanonik_topik, kanonikalisasi_ulang
+from app.services.katalog_service import indeks_sumber_daya
+from app.services.kookurensi_service import bangun_ulang_kookurensi, dapatkan_topik_bersamaan, export_npz
+from app.services.miskonsepsi_service import hitung_klaster_miskonsepsi
+from app.services.penguasaan_service import refit_bkt
+from app.services.pola_sekuens_service import ambil_pola_sekuens, tambang_pola_sekuens
+from app.services.rekomendasi_service import hitung_rekomendasi_semua
+from app.services.template_error_service import (
+    ambil_template_teratas,
+    mulai_backfill_template,
+    dapatkan_status_backfill_template
+)
 from app.utils.auth import verifikasi_admin
+from app.utils.graf_topik import SiklusPrasyarat
+from app.utils.minhash import AMBANG_MINIMAL
+from fastapi.responses import FileResponse, Response
 from typing import Optional
 
 router = APIRouter()
@@ -154,6 +189,164 @@ async def dapatkan_pola_global(
         )
 
 
+@router.post("/analytics/patterns-global/hitung-ulang")
+async def hitung_ulang_pola_global(admin = Depends(verifikasi_admin)):
+    """
+    Hitung ulang klaster miskonsepsi per tipe error sekarang (tanpa menunggu jadwal)
+    
+    **Requires**: Admin role
+    """
+    try:
+        jumlah = await hitung_klaster_miskonsepsi()
+        return {"message": "Klaster miskonsepsi berhasil dihitung ulang", "jumlah_tipe_error": jumlah}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Gagal menghitung klaster miskonsepsi: {str(e)}"
+        )
+
+
+@router.get("/analytics/pola-sekuens", response_model=list[ResponsePolaSekuens])
+async def dapatkan_pola_sekuens(
+    dimensi: str = Query(default="tipe_error", pattern="^(tipe_error|topik)$", description="Dimensi pola"),
+    limit: int = Query(default=20, ge=1, le=100, description="Maksimal jumlah pola"),
+    panjang_min: int = Query(default=2, ge=2, le=10, description="Panjang pola minimal"),
+    mengandung: Optional[str] = Query(default=None, description="Hanya pola yang memuat tipe error / topik ini"),
+    admin = Depends(verifikasi_admin)
+):
+    """
+    Dapatkan urutan tipe error / topik yang sering dialami mahasiswa secara berurutan
+    (hasil batch PrefixSpan atas riwayat seluruh mahasiswa)
+    
+    **Requires**: Admin role
+    """
+    try:
+        return await ambil_pola_sekuens(dimensi, limit, panjang_min, mengandung)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Gagal mengambil pola sekuens: {str(e)}"
+        )
+
+
+@router.post("/analytics/pola-sekuens/hitung-ulang")
+async def hitung_ulang_pola_sekuens(admin = Depends(verifikasi_admin)):
+    """
+    Tambang ulang pola sekuens error sekarang (tanpa menunggu jadwal)
+    
+    **Requires**: Admin role
+    """
+    try:
+        jumlah = await tambang_pola_sekuens()
+        return {"message": "Pola sekuens berhasil ditambang ulang", "jumlah_pola": jumlah}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Gagal menambang pola sekuens: {str(e)}"
+        )
+
+
+@router.get("/analytics/kookurensi-topik", response_model=ResponseKookurensiTopik)
+async def dapatkan_kookurensi_topik(
+    topik: str = Query(..., description="Topik acuan"),
+    k: int = Query(default=10, ge=1, le=50, description="Jumlah topik pasangan"),
+    admin = Depends(verifikasi_admin)
+):
+    """
+    Dapatkan top-k topik yang paling sering gagal bersamaan dengan topik tertentu
+    (dalam satu submisi error)
+    
+    **Requires**: Admin role
+    """
+    try:
+        return await dapatkan_topik_bersamaan(topik, k)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Gagal mengambil kookurensi topik: {str(e)}"
+        )
+
+
+@router.get("/analytics/kookurensi-topik/export")
+async def export_kookurensi_topik(admin = Depends(verifikasi_admin)):
+    """
+    Download matriks kookurensi topik (.npz NumPy, format COO) untuk analisis offline
+    
+    **Requires**: Admin role
+    """
+    try:
+        isi = await export_npz()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Gagal export kookurensi topik: {str(e)}"
+        )
+    return Response(
+        content=isi,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": "attachment; filename=kookurensi_topik.npz"}
+    )
+
+
+@router.post("/analytics/kookurensi-topik/bangun-ulang")
+async def bangun_ulang_kookurensi_topik(admin = Depends(verifikasi_admin)):
+    """
+    Hitung ulang seluruh matriks kookurensi topik dari riwayat submisi error
+    
+    **Requires**: Admin role
+    """
+    try:
+        jumlah = await bangun_ulang_kookurensi()
+        return {"message": "Kookurensi topik berhasil dibangun ulang", "jumlah_sel": jumlah}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Gagal membangun ulang kookurensi topik: {str(e)}"
+        )
+
+
+@router.get("/analytics/template-error", response_model=list[ResponseTemplateError])
+async def dapatkan_template_error(
+    limit: int = Query(default=20, ge=1, le=200),
+    admin = Depends(verifikasi_admin)
+):
+    """
+    Dapatkan template pesan error paling sering (tidak bergantung wording tipe_error dari LLM)
+    
+    **Requires**: Admin role
+    """
+    try:
+        template = await ambil_template_teratas(limit)
+        return [ResponseTemplateError(**t) for t in template]
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Gagal mengambil template error: {str(e)}"
+        )
+
+
+@router.post("/analytics/template-error/backfill", response_model=ResponseStatusBackfill, status_code=202)
+async def backfill_template_error(admin = Depends(verifikasi_admin)):
+    """
+    Mulai backfill id_template untuk submisi error lama (background)
+    
+    **Requires**: Admin role
+    """
+    return ResponseStatusBackfill(**mulai_backfill_template())
+
+
+@router.get("/analytics/template-error/backfill", response_model=ResponseStatusBackfill)
+async def status_backfill_template_error(admin = Depends(verifikasi_admin)):
+    """
+    Status backfill id_template
+    
+    **Requires**: Admin role
+    """
+    return ResponseStatusBackfill(**dapatkan_status_backfill_template())
+
+
 @router.get("/analytics/trends", response_model=list[ResponseAnalyticsTren])
 async def dapatkan_tren_analytics(
     jumlah_hari: int = Query(default=7, ge=1, le=30, description="Jumlah hari yang ditampilkan"),
@@ -232,6 +425,153 @@ async def bulk_action_mhs(
         )
 
 
+@router.post("/export", response_model=ResponseJobExport, status_code=202)
+async def buat_export_kohort(
+    request: RequestExportKohort,
+    admin = Depends(verifikasi_admin)
+):
+    """
+    Mulai export kohort (seluruh mahasiswa) sebagai background job
+    
+    **Requires**: Admin role
+    
+    Dataset: submisi, pola, progress. Format: csv (opsional gzip) atau parquet.
+    Filter: rentang tanggal, topik, role. Pantau progress via GET /export/{id_job}.
+    """
+    try:
+        return mulai_export_kohort(request, id_admin=admin.get("id"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export", response_model=list[ResponseJobExport])
+async def list_export_kohort(admin = Depends(verifikasi_admin)):
+    """
+    Daftar job export kohort yang masih tersimpan
+    
+    **Requires**: Admin role
+    """
+    return daftar_job_export()
+
+
+@router.get("/export/{id_job}", response_model=ResponseJobExport)
+async def status_export_kohort(id_job: str, admin = Depends(verifikasi_admin)):
+    """
+    Status & progress job export kohort
+    
+    **Requires**: Admin role
+    """
+    job = dapatkan_job_export(id_job)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job export tidak ditemukan")
+    return job.ke_response()
+
+
+@router.get("/export/{id_job}/download")
+async def download_export_kohort(id_job: str, admin = Depends(verifikasi_admin)):
+    """
+    Download artifact hasil export kohort (file di-stream per chunk)
+    
+    **Requires**: Admin role
+    """
+    job = dapatkan_job_export(id_job)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job export tidak ditemukan")
+    if job.status != "selesai" or not job.path_file:
+        raise HTTPException(status_code=409, detail=f"Export belum selesai (status: {job.status})")
+    
+    if job.permintaan.format == "parquet":
+        media_type = "application/vnd.apache.parquet"
+    elif job.permintaan.gzip:
+        media_type = "application/gzip"
+    else:
+        media_type = "text/csv"
+    
+    return FileResponse(job.path_file, media_type=media_type, filename=job.nama_file)
+
+
+@router.get("/exercises/{id_exercise}/duplikat", response_model=ResponseKlasterDuplikat)
+async def dapatkan_duplikat_exercise(
+    id_exercise: str,
+    ambang: Optional[float] = Query(default=None, ge=AMBANG_MINIMAL, le=1.0, description="Estimasi Jaccard minimal"),
+    admin = Depends(verifikasi_admin)
+):
+    """
+    Klaster submisi yang saling mirip (kemungkinan copy) untuk satu exercise.
+    Hanya klaster dengan minimal 2 mahasiswa berbeda yang ditampilkan.
+    
+    **Requires**: Admin role
+    """
+    ambang = ambang if ambang is not None else max(settings.duplikat_ambang_default, AMBANG_MINIMAL)
+    try:
+        klaster = await dapatkan_klaster_duplikat(id_exercise, ambang)
+        return ResponseKlasterDuplikat(
+            id_exercise=id_exercise,
+            ambang=ambang,
+            jumlah_klaster=len(klaster),
+            klaster=klaster
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Gagal mengambil klaster duplikat: {str(e)}"
+        )
+
+
+@router.post("/exercises/duplikat/backfill", response_model=ResponseStatusBackfill, status_code=202)
+async def backfill_duplikat(admin = Depends(verifikasi_admin)):
+    """
+    Hitung signature MinHash untuk submisi lama di background (process pool)
+    
+    **Requires**: Admin role
+    """
+    return ResponseStatusBackfill(**mulai_backfill_minhash())
+
+
+@router.get("/exercises/duplikat/backfill", response_model=ResponseStatusBackfill)
+async def status_backfill_duplikat(admin = Depends(verifikasi_admin)):
+    """
+    Status backfill signature MinHash
+    
+    **Requires**: Admin role
+    """
+    return ResponseStatusBackfill(**dapatkan_status_backfill())
+
+
+@router.post("/rekomendasi/hitung-ulang")
+async def hitung_ulang_rekomendasi(admin = Depends(verifikasi_admin)):
+    """
+    Hitung ulang ranking rekomendasi semua mahasiswa sekarang (tanpa menunggu jadwal)
+    
+    **Requires**: Admin role
+    """
+    try:
+        jumlah = await hitung_rekomendasi_semua()
+        return {"message": "Rekomendasi berhasil dihitung ulang", "jumlah_mahasiswa": jumlah}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Gagal menghitung rekomendasi: {str(e)}"
+        )
+
+
+@router.post("/penguasaan/refit")
+async def refit_penguasaan(admin = Depends(verifikasi_admin)):
+    """
+    Refit parameter BKT per topik & hitung ulang penguasaan semua mahasiswa sekarang
+    
+    **Requires**: Admin role
+    """
+    try:
+        jumlah = await refit_bkt()
+        return {"message": "Penguasaan berhasil dihitung ulang", "jumlah_topik": jumlah}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Gagal menghitung ulang penguasaan: {str(e)}"
+        )
+
+
 @router.get("/ai-metrics", response_model=ResponseMetrikAI)
 async def dapatkan_ai_metrics(admin = Depends(verifikasi_admin)):
     """
@@ -275,6 +615,8 @@ async def tambah_sumber_daya(
             }
         )
         
+        await indeks_sumber_daya.tandai_berubah()
+        
         return ResponseSumberDaya(
             id=sumber_daya.id,
             judul=sumber_daya.judul,
@@ -412,6 +754,11 @@ async def tambah_topik_pembelajaran(
     """
     from app.database import prisma
     
+    try:
+        await graf_topik.validasi(request.nama, request.prerequisite)
+    except SiklusPrasyarat as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         topik = await prisma.topikpembelajaran.create(
             data={
@@ -424,6 +771,8 @@ async def tambah_topik_pembelajaran(
                 "estimasiWaktu": request.estimasi_waktu
             }
         )
+        await graf_topik.tandai_berubah()
+        await kanonik_topik.tandai_berubah()
         
         return ResponseTopikPembelajaran(
             id=topik.id,
@@ -494,6 +843,69 @@ async def dapatkan_semua_topik(
         )
 
 
+@router.get("/topik/graf")
+async def dapatkan_graf_topik(admin = Depends(verifikasi_admin)):
+    """
+    Dapatkan urutan topologis topik berdasarkan prerequisite (+ siklus jika ada)
+    
+    **Requires**: Admin role
+    """
+    try:
+        graf = await graf_topik.pastikan_segar()
+        return {
+            "urutan_topologis": graf.urutan_topologis,
+            "siklus": graf.siklus,
+            "prasyarat_transitif": {t: graf.prasyarat_transitif(t) for t in graf.urutan_topologis}
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Gagal mengambil graf topik: {str(e)}"
+        )
+
+
+@router.post("/topik/gabung")
+async def gabung_topik(
+    request: RequestGabungTopik,
+    admin = Depends(verifikasi_admin)
+):
+    """
+    Gabungkan variasi topik (output LLM) ke satu topik pembelajaran.
+    Variasi disimpan sebagai alias untuk kanonikalisasi berikutnya dan data
+    historis (submisi error, progress belajar) langsung dipetakan ulang.
+    
+    **Requires**: Admin role
+    """
+    try:
+        hasil = await gabungkan_topik(request.sumber, request.tujuan)
+        return {"message": "Topik berhasil digabung", **hasil}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Gagal menggabung topik: {str(e)}"
+        )
+
+
+@router.post("/topik/kanonikalisasi-ulang")
+async def kanonikalisasi_ulang_topik(admin = Depends(verifikasi_admin)):
+    """
+    Petakan ulang seluruh topik historis ke nama topik pembelajaran
+    (dictionary + alias terbaru), lalu bangun ulang kookurensi topik
+    
+    **Requires**: Admin role
+    """
+    try:
+        hasil = await kanonikalisasi_ulang()
+        return {"message": "Kanonikalisasi topik selesai", **hasil}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Gagal kanonikalisasi topik: {str(e)}"
+        )
+
+
 @router.put("/topik/{id_topik}", response_model=ResponseTopikPembelajaran)
 async def update_topik_pembelajaran(
     id_topik: str,
@@ -507,6 +919,11 @@ async def update_topik_pembelajaran(
     """
     from app.database import prisma
     
+    try:
+        await graf_topik.validasi(request.nama, request.prerequisite, id_topik=id_topik)
+    except SiklusPrasyarat as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         topik = await prisma.topikpembelajaran.update(
             where={"id": id_topik},
@@ -523,6 +940,8 @@ async def update_topik_pembelajaran(
         
         if not topik:
             raise HTTPException(status_code=404, detail="Topik tidak ditemukan")
+        await graf_topik.tandai_berubah()
+        await kanonik_topik.tandai_berubah()
         
         return ResponseTopikPembelajaran(
             id=topik.id,
@@ -558,6 +977,8 @@ async def hapus_topik_pembelajaran(
     
     try:
         await prisma.topikpembelajaran.delete(where={"id": id_topik})
+        await graf_topik.tandai_berubah()
+        await kanonik_topik.tandai_berubah()
         return {"message": "Topik berhasil dihapus", "id": id_topik}
     except Exception as e:
         raise HTTPException(
@@ -2,7 +2,11 @@
 Auth Endpoints - Register, Login, Get Current User
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends
+import logging
+
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from app.config import settings
+from app.middleware.metrik_api import dapatkan_ip_klien
 from app.models.schemas import (
     RequestRegister, 
     RequestLogin, 
@@ -10,31 +14,42 @@ from app.models.schemas import (
     ResponseUser
 )
 from app.utils.auth import (
-    hash_password, 
-    verifikasi_password, 
+    hash_password_async, 
+    verifikasi_password_async, 
+    perlu_rehash,
     buat_access_token,
     dapatkan_user_sekarang
 )
 from app.repositories.user_repository import (
     buat_user,
     cari_user_by_email,
-    cari_user_by_id
+    cari_user_by_id_cached,
+    update_user
 )
+from app.utils.rate_limit import pembatas_auth
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=ResponseAuth, status_code=status.HTTP_201_CREATED)
-async def register(request: RequestRegister):
+async def register(request: RequestRegister, http_request: Request):
     """
     Register user baru
     
+    - Rate limit per IP (429 + Retry-After)
     - Validasi email belum terdaftar
     - Hash password
     - Simpan ke database
     - Return JWT token + user data
     """
     
+    # Rate limit sebelum query database & bcrypt
+    await pembatas_auth.periksa("register", [
+        ("ip", dapatkan_ip_klien(http_request.scope), settings.rate_limit_register_per_ip)
+    ])
+    
     # Cek apakah email sudah terdaftar
     user_ada = await cari_user_by_email(request.email)
     
@@ -44,8 +59,8 @@ async def register(request: RequestRegister):
             detail="Email sudah terdaftar"
         )
     
-    # Hash password
-    password_hash = hash_password(request.password)
+    # Hash password (di executor bcrypt, tidak memblokir event loop)
+    password_hash = await hash_password_async(request.password)
     
     # Buat user baru dengan Motor
     user_baru = await buat_user(
@@ -57,7 +72,11 @@ async def register(request: RequestRegister):
     )
     
     # Buat JWT token
-    access_token = buat_access_token(data={"sub": user_baru["id"]})
+    access_token = buat_access_token(data={
+        "sub": user_baru["id"],
+        "role": user_baru["role"],
+        "status": user_baru.get("status", "aktif")
+    })
     
     return ResponseAuth(
         access_token=access_token,
@@ -74,14 +93,22 @@ async def register(request: RequestRegister):
 
 
 @router.post("/login", response_model=ResponseAuth)
-async def login(request: RequestLogin):
+async def login(request: RequestLogin, http_request: Request):
     """
     Login user
     
+    - Rate limit per IP & per email (429 + Retry-After)
     - Validasi email & password
     - Return JWT token + user data
     """
     
+    # Rate limit sebelum query database & bcrypt
+    email = request.email.lower()
+    await pembatas_auth.periksa("login", [
+        ("ip", dapatkan_ip_klien(http_request.scope), settings.rate_limit_login_per_ip),
+        ("email", email, settings.rate_limit_login_per_email)
+    ])
+    
     # Cari user berdasarkan email
     user = await cari_user_by_email(request.email)
     
@@ -91,15 +118,31 @@ async def login(request: RequestLogin):
             detail="Email atau password salah"
         )
     
-    # Verifikasi password
-    if not verifikasi_password(request.password, user["passwordHash"]):
+    # Verifikasi password (di executor bcrypt, tidak memblokir event loop)
+    if not await verifikasi_password_async(request.password, user["passwordHash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email atau password salah"
         )
     
+    # Rehash transparan jika cost factor bcrypt sudah berubah (best-effort:
+    # kegagalan tidak boleh menggagalkan login yang passwordnya sudah benar)
+    if perlu_rehash(user["passwordHash"]):
+        try:
+            password_hash_baru = await hash_password_async(request.password)
+            await update_user(user["id"], {"passwordHash": password_hash_baru})
+        except Exception as e:
+            logger.warning(f"⚠️ Rehash password user {user['id']} gagal: {e}")
+    
+    # Login berhasil: riwayat gagal untuk email ini tidak dihitung lagi
+    await pembatas_auth.reset("login", "email", email)
+    
     # Buat JWT token
-    access_token = buat_access_token(data={"sub": user["id"]})
+    access_token = buat_access_token(data={
+        "sub": user["id"],
+        "role": user["role"],
+        "status": user.get("status", "aktif")
+    })
     
     return ResponseAuth(
         access_token=access_token,
@@ -123,7 +166,7 @@ async def dapatkan_profil_saya(user_id: str = Depends(dapatkan_user_sekarang)):
     Requires: Bearer token di header
     """
     
-    user = await cari_user_by_id(user_id)
+    user = await cari_user_by_id_cached(user_id)
     
     if not user:
         raise HTTPException(
@@ -15,7 +15,10 @@ from app.services.exercise_service import (
     submit_exercise_solution,
     dapatkan_submission_history
 )
+from app.services.katalog_service import indeks_exercise
+from app.services.penilaian_service import siapkan_sidik_jari_referensi
 from app.utils.auth import dapatkan_user_sekarang, verifikasi_admin
+from app.utils.sandbox import AntrianSandboxPenuh
 from typing import Optional, List
 
 router = APIRouter()
@@ -84,6 +87,8 @@ async def submit_exercise(
         return submission
     except ValueError as ve:
         raise HTTPException(status_code=404, detail=str(ve))
+    except AntrianSandboxPenuh as ap:
+        raise HTTPException(status_code=503, detail=str(ap), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -144,6 +149,9 @@ async def tambah_exercise(
             }
         )
         
+        await indeks_exercise.tandai_berubah()
+        await siapkan_sidik_jari_referensi(exercise.id, exercise.solusiReferensi)
+        
         return ResponseExercise(
             id=exercise.id,
             judul=exercise.judul,
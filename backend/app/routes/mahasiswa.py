@@ -2,8 +2,9 @@
 Mahasiswa Routes - Dashboard, Learning Resources
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query
-from fastapi.responses import Response
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
+import hashlib
 from app.models.schemas import (
     ResponseDashboardMahasiswa,
     ResponseSumberDaya
@@ -11,7 +12,7 @@ from app.models.schemas import (
 from app.services.mahasiswa_service import (
     dapatkan_dashboard_mahasiswa,
     dapatkan_sumber_daya_rekomendasi,
-    generate_export_csv,
+    stream_export_csv,
     generate_export_data
 )
 from app.utils.auth import dapatkan_user_sekarang
@@ -19,11 +20,19 @@ from app.utils.auth import dapatkan_user_sekarang
 router = APIRouter()
 
 
+def _cocok_etag(if_none_match: str, etag: str) -> bool:
+    """Cek header If-None-Match (bisa berisi beberapa ETag atau *)"""
+    kandidat = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in kandidat or etag in kandidat or etag.removeprefix("W/") in kandidat
+
+
 @router.get("/dashboard", response_model=ResponseDashboardMahasiswa)
-async def dapatkan_dashboard(user_id: str = Depends(dapatkan_user_sekarang)):
+async def dapatkan_dashboard(request: Request, user_id: str = Depends(dapatkan_user_sekarang)):
     """
     Dapatkan dashboard overview mahasiswa
     
+    Mendukung ETag/If-None-Match: jika dashboard tidak berubah, return 304 tanpa body.
+    
     Returns:
         - Total error & pola
         - Rata-rata penguasaan
@@ -33,12 +42,21 @@ async def dapatkan_dashboard(user_id: str = Depends(dapatkan_user_sekarang)):
     """
     try:
         dashboard = await dapatkan_dashboard_mahasiswa(user_id)
-        return dashboard
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Gagal mengambil dashboard: {str(e)}"
         )
+    
+    body = dashboard.model_dump_json().encode()
+    etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _cocok_etag(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/learning-resources", response_model=list[ResponseSumberDaya])
@@ -66,23 +84,28 @@ async def dapatkan_learning_resources(
 @router.get("/export/csv")
 async def export_progress_csv(
     user_id: str = Depends(dapatkan_user_sekarang),
-    periode: str = Query(default="bulan_ini", description="minggu_ini, bulan_ini, semua")
+    periode: str = Query(default="bulan_ini", description="minggu_ini, bulan_ini, semua"),
+    gzip: bool = Query(default=False, description="Kompres response dengan gzip")
 ):
     """
     Export progress report dalam format CSV
     
+    Di-stream per chunk dari cursor database (memori konstan, byte pertama langsung terkirim).
+    
     Returns:
         CSV file download
     """
     try:
-        csv_content = await generate_export_csv(user_id, periode)
+        headers = {
+            "Content-Disposition": f"attachment; filename=progress_report_{periode}.csv"
+        }
+        if gzip:
+            headers["Content-Encoding"] = "gzip"
         
-        return Response(
-            content=csv_content,
+        return StreamingResponse(
+            stream_export_csv(user_id, periode, gzip=gzip),
             media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename=progress_report_{periode}.csv"
-            }
+            headers=headers
         )
     except Exception as e:
         raise HTTPException(
@@ -7,8 +7,14 @@ from app.database import prisma
 from app.repositories.user_repository import (
     hitung_user,
     cari_user_by_id,
+    cari_user_by_ids,
     ambil_semua_user
 )
+from app.repositories.analitik_repository import agregasi_facet, ambil_count, ke_object_id
+from app.services.graf_topik_service import graf_topik
+from app.services.kookurensi_service import ambil_topik_bersamaan_batch
+from app.services.miskonsepsi_service import ambil_pola_global_tersimpan
+from app.services.rekomendasi_service import BATAS_PRASYARAT_DIKUASAI
 from app.models.schemas import (
     ResponseStatistikDashboard,
     TopErrorItem,
@@ -26,6 +32,7 @@ from app.models.schemas import (
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
 from collections import Counter
+import asyncio
 
 
 async def dapatkan_statistik_dashboard() -> ResponseStatistikDashboard:
@@ -106,9 +113,12 @@ async def dapatkan_statistik_dashboard() -> ResponseStatistikDashboard:
     # Sort dan ambil top 5
     top_mahasiswa_ids = sorted(mahasiswa_error_count.items(), key=lambda x: x[1], reverse=True)[:5]
     
+    # Data user untuk top 5 diambil sekaligus (satu query $in)
+    user_map = await cari_user_by_ids([mhs_id for mhs_id, _ in top_mahasiswa_ids])
+    
     mahasiswa_kesulitan = []
     for mhs_id, jumlah_error in top_mahasiswa_ids:
-        mhs = await cari_user_by_id(mhs_id)
+        mhs = user_map.get(mhs_id)
         if mhs:
             mahasiswa_kesulitan.append(
                 MahasiswaKesulitanItem(
@@ -221,53 +231,70 @@ async def dapatkan_detail_mahasiswa(id_mahasiswa: str) -> ResponseDetailMahasisw
     """
     Dapatkan detail lengkap mahasiswa untuk admin
     
+    Semua panel diambil dalam satu putaran paralel: user, $facet submisi_error,
+    $facet progress_belajar, dan $facet pola_error.
+    
     Args:
         id_mahasiswa: ID mahasiswa
     
     Returns:
         ResponseDetailMahasiswa dengan semua info
     """
-    
-    # Get user
-    user = await cari_user_by_id(id_mahasiswa)
+    filter_mahasiswa = {"id_mahasiswa": ke_object_id(id_mahasiswa)}
+    
+    user, facet_submisi, facet_progress, facet_pola = await asyncio.gather(
+        cari_user_by_id(id_mahasiswa),
+        agregasi_facet("submisi_error", filter_mahasiswa, {
+            "ringkasan": [
+                {"$group": {
+                    "_id": None,
+                    "jumlah": {"$sum": 1},
+                    "pertama": {"$min": "$created_at"},
+                    "terakhir": {"$max": "$created_at"}
+                }}
+            ],
+            "riwayat": [
+                {"$sort": {"created_at": -1}},
+                {"$limit": 10},
+                {"$project": {
+                    "kode": 1, "pesan_error": 1, "bahasa": 1,
+                    "tipe_error": 1, "level_bloom": 1, "created_at": 1
+                }}
+            ]
+        }),
+        agregasi_facet("progress_belajar", filter_mahasiswa, {
+            "ringkasan": [
+                {"$group": {"_id": None, "rata_rata": {"$avg": "$tingkat_penguasaan"}}}
+            ],
+            "terlemah": [
+                {"$sort": {"tingkat_penguasaan": 1}},
+                {"$limit": 5}
+            ]
+        }),
+        agregasi_facet("pola_error", filter_mahasiswa, {
+            "total": [{"$count": "jumlah"}],
+            "teratas": [
+                {"$sort": {"frekuensi": -1}},
+                {"$limit": 5}
+            ]
+        })
+    )
     
     if not user:
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Mahasiswa tidak ditemukan")
     
     # Statistik
-    total_submisi = await prisma.submisierror.count(
-        where={"idMahasiswa": id_mahasiswa}
-    )
+    ringkasan_submisi = facet_submisi["ringkasan"][0] if facet_submisi["ringkasan"] else {}
+    total_submisi = int(ringkasan_submisi.get("jumlah", 0))
+    total_pola_unik = ambil_count(facet_pola["total"])
     
-    total_pola_unik = await prisma.polaerror.count(
-        where={"idMahasiswa": id_mahasiswa}
-    )
-    
-    # Rata-rata penguasaan
-    progress_list = await prisma.progressbelajar.find_many(
-        where={"idMahasiswa": id_mahasiswa}
-    )
-    
-    if progress_list:
-        rata_rata = sum(p.tingkatPenguasaan for p in progress_list) / len(progress_list)
-    else:
-        rata_rata = 0.0
-    
-    # Error pertama dan terakhir
-    submisi_pertama = await prisma.submisierror.find_first(
-        where={"idMahasiswa": id_mahasiswa},
-        order={"createdAt": "asc"}
-    )
-    
-    submisi_terakhir = await prisma.submisierror.find_first(
-        where={"idMahasiswa": id_mahasiswa},
-        order={"createdAt": "desc"}
-    )
+    ringkasan_progress = facet_progress["ringkasan"]
+    rata_rata = float(ringkasan_progress[0].get("rata_rata") or 0.0) if ringkasan_progress else 0.0
     
     # Tren perbaikan (simplified)
     tren = "stabil"
-    if progress_list:
+    if ringkasan_progress:
         # Jika rata-rata > 70, tren membaik
         if rata_rata > 70:
             tren = "membaik"
@@ -279,67 +306,49 @@ async def dapatkan_detail_mahasiswa(id_mahasiswa: str) -> ResponseDetailMahasisw
         total_pola_unik=total_pola_unik,
         rata_rata_penguasaan=rata_rata,
         tren_perbaikan=tren,
-        error_pertama=submisi_pertama.createdAt if submisi_pertama else None,
-        error_terakhir=submisi_terakhir.createdAt if submisi_terakhir else None
+        error_pertama=ringkasan_submisi.get("pertama"),
+        error_terakhir=ringkasan_submisi.get("terakhir")
     )
     
     # Pola kesalahan terbanyak (top 5)
-    pola_list = await prisma.polaerror.find_many(
-        where={"idMahasiswa": id_mahasiswa},
-        order={"frekuensi": "desc"},
-        take=5
-    )
-    
     pola_terbanyak = [
         ResponsePolaError(
-            id=p.id,
-            jenis_kesalahan=p.jenisKesalahan,
-            frekuensi=p.frekuensi,
-            kejadian_pertama=p.kejadianPertama,
-            kejadian_terakhir=p.kejadianTerakhir,
-            deskripsi_miskonsepsi=p.deskripsiMiskonsepsi,
-            sumber_daya_direkomendasikan=p.sumberDayaDirekomendasikan
+            id=str(p["_id"]),
+            jenis_kesalahan=p["jenis_kesalahan"],
+            frekuensi=p.get("frekuensi", 1),
+            kejadian_pertama=p.get("kejadian_pertama"),
+            kejadian_terakhir=p.get("kejadian_terakhir"),
+            deskripsi_miskonsepsi=p.get("deskripsi_miskonsepsi"),
+            sumber_daya_direkomendasikan=p.get("sumber_daya_direkomendasikan", [])
         )
-        for p in pola_list
+        for p in facet_pola["teratas"]
     ]
     
     # Topik terlemah (tingkat penguasaan rendah)
-    topik_terlemah_list = await prisma.progressbelajar.find_many(
-        where={"idMahasiswa": id_mahasiswa},
-        order={"tingkatPenguasaan": "asc"},
-        take=5
-    )
-    
     topik_terlemah = [
         ResponseProgressBelajar(
-            id=p.id,
-            topik=p.topik,
-            tingkat_penguasaan=p.tingkatPenguasaan,
-            jumlah_error_di_topik=p.jumlahErrorDiTopik,
-            tanggal_error_terakhir=p.tanggalErrorTerakhir,
-            tren_perbaikan=p.trenPerbaikan
+            id=str(p["_id"]),
+            topik=p["topik"],
+            tingkat_penguasaan=p.get("tingkat_penguasaan", 0),
+            jumlah_error_di_topik=p.get("jumlah_error_di_topik", 0),
+            tanggal_error_terakhir=p.get("tanggal_error_terakhir"),
+            tren_perbaikan=p.get("tren_perbaikan")
         )
-        for p in topik_terlemah_list
+        for p in facet_progress["terlemah"]
     ]
     
     # Riwayat terbaru (10 terakhir)
-    riwayat_list = await prisma.submisierror.find_many(
-        where={"idMahasiswa": id_mahasiswa},
-        order={"createdAt": "desc"},
-        take=10
-    )
-    
     riwayat = [
         ResponseRiwayat(
-            id=r.id,
-            kode=r.kode,
-            pesan_error=r.pesanError,
-            bahasa=r.bahasa,
-            tipe_error=r.tipeError,
-            level_bloom=r.levelBloom,
-            created_at=r.createdAt
+            id=str(r["_id"]),
+            kode=r["kode"],
+            pesan_error=r["pesan_error"],
+            bahasa=r.get("bahasa", "python"),
+            tipe_error=r.get("tipe_error"),
+            level_bloom=r.get("level_bloom"),
+            created_at=r["created_at"]
         )
-        for r in riwayat_list
+        for r in facet_submisi["riwayat"]
     ]
     
     return ResponseDetailMahasiswa(
@@ -370,7 +379,26 @@ async def dapatkan_pola_kesalahan_global(limit: int = 20) -> List[ResponsePolaGl
     Returns:
         List pola kesalahan global
     """
+    # Total mahasiswa
+    total_mahasiswa = await hitung_user(role="mahasiswa")
+    if total_mahasiswa == 0:
+        total_mahasiswa = 1  # Avoid division by zero
+    
+    # Hasil batch klaster miskonsepsi (lihat miskonsepsi_service)
+    tersimpan = await ambil_pola_global_tersimpan(limit)
+    if tersimpan is not None:
+        return [
+            ResponsePolaGlobal(
+                jenis_kesalahan=dok["_id"],
+                total_kemunculan=dok["total_kemunculan"],
+                jumlah_mahasiswa_terpengaruh=dok["jumlah_mahasiswa"],
+                persentase_mahasiswa=round(dok["jumlah_mahasiswa"] / total_mahasiswa * 100, 2),
+                miskonsepsi_umum=dok.get("miskonsepsi_umum", [])
+            )
+            for dok in tersimpan
+        ]
     
+    # Fallback sebelum job pertama selesai: hitung langsung dari submisi
     # Get all submisi errors
     from typing import Any, cast
     
@@ -391,19 +419,14 @@ async def dapatkan_pola_kesalahan_global(limit: int = 20) -> List[ResponsePolaGl
             error_data[tipe] = {
                 "total": 0,
                 "mahasiswa_ids": set(),
-                "miskonsepsi": []
+                "miskonsepsi": Counter()
             }
         
         error_data[tipe]["total"] += 1
         error_data[tipe]["mahasiswa_ids"].add(submisi.idMahasiswa)
         
         if submisi.kesenjanganKonsep:
-            error_data[tipe]["miskonsepsi"].append(submisi.kesenjanganKonsep)
-    
-    # Total mahasiswa
-    total_mahasiswa = await hitung_user(role="mahasiswa")
-    if total_mahasiswa == 0:
-        total_mahasiswa = 1  # Avoid division by zero
+            error_data[tipe]["miskonsepsi"][submisi.kesenjanganKonsep.strip()] += 1
     
     # Build response
     pola_global = []
@@ -411,8 +434,8 @@ async def dapatkan_pola_kesalahan_global(limit: int = 20) -> List[ResponsePolaGl
         jumlah_mhs_terpengaruh = len(data["mahasiswa_ids"])
         persentase = (jumlah_mhs_terpengaruh / total_mahasiswa) * 100
         
-        # Ambil miskonsepsi unik (top 3)
-        miskonsepsi_unik = list(set(data["miskonsepsi"]))[:3]
+        # Miskonsepsi paling sering (top 3)
+        miskonsepsi_unik = [teks for teks, _ in data["miskonsepsi"].most_common(3)]
         
         pola_global.append(
             ResponsePolaGlobal(
@@ -524,6 +547,7 @@ async def bulk_action_mahasiswa(id_list: List[str], action: str):
     from fastapi import HTTPException
     from app.database import dapatkan_collection
     from bson import ObjectId
+    from app.repositories.user_repository import invalidasi_cache_user
     
     users_collection = dapatkan_collection("User")
     
@@ -535,69 +559,117 @@ async def bulk_action_mahasiswa(id_list: List[str], action: str):
             {"_id": {"$in": object_ids}},
             {"$set": {"status": "suspended"}}
         )
-        return {"count": result.modified_count}
+        jumlah = result.modified_count
     elif action == "activate":
         result = await users_collection.update_many(
             {"_id": {"$in": object_ids}},
             {"$set": {"status": "aktif"}}
         )
-        return {"count": result.modified_count}
+        jumlah = result.modified_count
     elif action == "delete":
         result = await users_collection.delete_many(
             {"_id": {"$in": object_ids}}
         )
-        return {"count": result.deleted_count}
+        jumlah = result.deleted_count
     else:
         raise HTTPException(status_code=400, detail="Action tidak valid")
+    
+    # Invalidasi cache user setelah write agar dependency auth membaca status terbaru
+    invalidasi_cache_user(id_list)
+    return {"count": jumlah}
 
 
 async def dapatkan_metrik_ai() -> Dict:
     """
-    Dapatkan statistik penggunaan AI
+    Dapatkan statistik penggunaan AI, total dan per rute router model
+    (satu $group di MongoDB, bukan memuat semua dokumen metrik)
+    
+    Satu request analisis bisa tercatat sebagai dua percobaan (model kecil lalu
+    fallback ke model besar). Request = percobaan dengan fallback false; token,
+    biaya dan waktu dijumlahkan dari semua percobaan. Paling banyak satu percobaan
+    per request yang berhasil, jadi success_rate = percobaan berhasil / request.
     
     Returns:
         Dict dengan metrics AI
     """
+    from app.database import dapatkan_collection
     
-    # Total requests
-    total_requests = await prisma.metrikai.count()
-    
+    per_rute = await dapatkan_collection("metrik_ai").aggregate([
+        {"$group": {
+            "_id": {"$ifNull": ["$rute", "-"]},
+            "jumlah": {"$sum": 1},
+            "fallback": {"$sum": {"$cond": [{"$ifNull": ["$fallback", False]}, 1, 0]}},
+            "token_input": {"$sum": "$token_input"},
+            "token_output": {"$sum": "$token_output"},
+            "total_token": {"$sum": "$total_token"},
+            "biaya": {"$sum": "$biaya"},
+            "waktu": {"$sum": "$waktu_respons"},
+            "berhasil": {"$sum": {"$cond": ["$status_berhasil", 1, 0]}}
+        }},
+        {"$sort": {"_id": 1}}
+    ]).to_list(length=None)
+    
+    total_percobaan = sum(r["jumlah"] for r in per_rute)
+    total_fallback = sum(r["fallback"] for r in per_rute)
+    total_requests = total_percobaan - total_fallback
     if total_requests == 0:
         return {
             "total_requests": 0,
+            "total_percobaan": total_percobaan,
+            "total_fallback": total_fallback,
             "total_token_input": 0,
             "total_token_output": 0,
             "total_token": 0,
             "total_biaya": 0.0,
             "rata_rata_waktu_respons": 0.0,
-            "success_rate": 0.0
+            "success_rate": 0.0,
+            "per_rute": []
         }
     
-    # Aggregate metrics
-    all_metrics = await prisma.metrikai.find_many()
-    
-    total_token_input = sum(m.tokenInput for m in all_metrics)
-    total_token_output = sum(m.tokenOutput for m in all_metrics)
-    total_token = sum(m.totalToken for m in all_metrics)
-    total_biaya = sum(m.biaya for m in all_metrics)
-    
-    total_waktu = sum(m.waktuRespons for m in all_metrics)
-    rata_rata_waktu = total_waktu / total_requests
-    
-    success_count = sum(1 for m in all_metrics if m.statusBerhasil)
-    success_rate = (success_count / total_requests) * 100
-    
     return {
         "total_requests": total_requests,
-        "total_token_input": total_token_input,
-        "total_token_output": total_token_output,
-        "total_token": total_token,
-        "total_biaya": round(total_biaya, 4),
-        "rata_rata_waktu_respons": round(rata_rata_waktu, 2),
-        "success_rate": round(success_rate, 2)
+        "total_percobaan": total_percobaan,
+        "total_fallback": total_fallback,
+        "total_token_input": sum(r["token_input"] for r in per_rute),
+        "total_token_output": sum(r["token_output"] for r in per_rute),
+        "total_token": sum(r["total_token"] for r in per_rute),
+        "total_biaya": round(sum(r["biaya"] for r in per_rute), 4),
+        "rata_rata_waktu_respons": round(sum(r["waktu"] for r in per_rute) / total_requests, 2),
+        "success_rate": round(min(sum(r["berhasil"] for r in per_rute) / total_requests, 1.0) * 100, 2),
+        "per_rute": [
+            {
+                "rute": r["_id"],
+                "total_requests": r["jumlah"] - r["fallback"],
+                "jumlah_percobaan": r["jumlah"],
+                "total_token": r["total_token"],
+                "total_biaya": round(r["biaya"], 4),
+                "rata_rata_waktu_respons": round(r["waktu"] / r["jumlah"], 2),
+                "success_rate": round(r["berhasil"] / r["jumlah"] * 100, 2),
+                "jumlah_fallback": r["fallback"]
+            }
+            for r in per_rute
+        ]
     }
 
 
+async def _statistik_topik() -> List[Dict]:
+    """
+    Statistik per topik dari progress_belajar dalam satu $group di MongoDB
+    (progress unik per (mahasiswa, topik), jadi jumlah dokumen = jumlah mahasiswa),
+    terurut total error terbanyak
+    """
+    from app.database import dapatkan_collection
+    return await dapatkan_collection("progress_belajar").aggregate([
+        {"$group": {
+            "_id": "$topik",
+            "total_error": {"$sum": "$jumlah_error_di_topik"},
+            "jumlah_mahasiswa": {"$sum": 1},
+            "rata_rata_penguasaan": {"$avg": "$tingkat_penguasaan"}
+        }},
+        {"$sort": {"total_error": -1, "_id": 1}}
+    ]).to_list(length=None)
+
+
 async def dapatkan_topik_sulit(limit: int = 10) -> List[Dict]:
     """
     Dapatkan topik-topik paling sulit berdasarkan jumlah error
@@ -608,97 +680,80 @@ async def dapatkan_topik_sulit(limit: int = 10) -> List[Dict]:
     Returns:
         List topik dengan statistik kesulitan
     """
-    
-    # Ambil semua progress belajar (tanpa include karena relation di-comment)
-    from typing import Any, cast
-    all_progress = await prisma.progressbelajar.find_many()
-    
-    # Group by topik
-    topik_stats: Dict[str, Dict] = {}
-    
-    for progress in all_progress:
-        topik = progress.topik
-        if topik not in topik_stats:
-            topik_stats[topik] = {
-                "total_error": 0,
-                "mahasiswa_ids": set(),
-                "total_penguasaan": 0,
-                "count": 0
-            }
-        
-        topik_stats[topik]["total_error"] += progress.jumlahErrorDiTopik
-        topik_stats[topik]["mahasiswa_ids"].add(progress.idMahasiswa)
-        topik_stats[topik]["total_penguasaan"] += progress.tingkatPenguasaan
-        topik_stats[topik]["count"] += 1
-    
-    # Total mahasiswa
-    total_mahasiswa = await hitung_user(role="mahasiswa")
+    statistik, total_mahasiswa = await asyncio.gather(_statistik_topik(), hitung_user(role="mahasiswa"))
     if total_mahasiswa == 0:
         total_mahasiswa = 1
     
-    # Build response
-    result = []
-    for topik, stats in sorted(topik_stats.items(), key=lambda x: x[1]["total_error"], reverse=True)[:limit]:
-        jumlah_mhs = len(stats["mahasiswa_ids"])
-        persentase = (jumlah_mhs / total_mahasiswa) * 100
-        rata_penguasaan = stats["total_penguasaan"] / stats["count"] if stats["count"] > 0 else 0
-        
-        result.append({
-            "topik": topik,
+    return [
+        {
+            "topik": stats["_id"],
             "total_error": stats["total_error"],
-            "jumlah_mahasiswa_kesulitan": jumlah_mhs,
-            "persentase_mahasiswa": round(persentase, 2),
-            "rata_rata_penguasaan": round(rata_penguasaan, 2)
-        })
-    
-    return result
+            "jumlah_mahasiswa_kesulitan": stats["jumlah_mahasiswa"],
+            "persentase_mahasiswa": round((stats["jumlah_mahasiswa"] / total_mahasiswa) * 100, 2),
+            "rata_rata_penguasaan": round(stats["rata_rata_penguasaan"] or 0, 2)
+        }
+        for stats in statistik[:limit]
+    ]
 
 
 async def dapatkan_rekomendasi_kurikulum() -> Dict:
     """
     Generate rekomendasi kurikulum berdasarkan data analytics
     
+    Satu agregasi statistik per topik; urutan & cek prasyarat memakai graf
+    topik in-memory (urutan topologis + closure bitset, lihat graf_topik_service).
+    
     Returns:
         Dict dengan rekomendasi kurikulum
     """
+    statistik, graf = await asyncio.gather(_statistik_topik(), graf_topik.pastikan_segar())
+    rata_penguasaan = {stats["_id"]: stats["rata_rata_penguasaan"] or 0 for stats in statistik}
     
-    # Ambil topik sulit
-    topik_sulit = await dapatkan_topik_sulit(20)
+    # Topik dengan penguasaan rendah (prioritas) & yang sudah dikuasai
+    topik_prioritas = [t for t, rata in rata_penguasaan.items() if rata < 50]
+    topik_mudah = [t for t, rata in rata_penguasaan.items() if rata > 75]
     
-    # Ambil semua progress
-    all_progress = await prisma.progressbelajar.find_many()
-    
-    # Topik dengan penguasaan rendah (prioritas)
-    topik_prioritas = []
-    topik_mudah = []
+    # Gap pembelajaran (topik dengan error tinggi tapi penguasaan rendah)
+    gap_pembelajaran = [
+        stats["_id"] for stats in statistik[:10] if rata_penguasaan[stats["_id"]] < 60
+    ]
     
-    topik_penguasaan: Dict[str, List[int]] = {}
-    for progress in all_progress:
-        if progress.topik not in topik_penguasaan:
-            topik_penguasaan[progress.topik] = []
-        topik_penguasaan[progress.topik].append(progress.tingkatPenguasaan)
+    # Topik yang sering gagal bersamaan (matriks kookurensi, satu query)
+    bersamaan = await ambil_topik_bersamaan_batch(topik_prioritas[:10], 3)
+    topik_sering_bersamaan = {t: [p for p, _ in daftar] for t, daftar in bersamaan.items() if daftar}
     
-    for topik, penguasaan_list in topik_penguasaan.items():
-        rata = sum(penguasaan_list) / len(penguasaan_list)
-        if rata < 50:
-            topik_prioritas.append(topik)
-        elif rata > 75:
-            topik_mudah.append(topik)
+    # Prasyarat dianggap terpenuhi jika rata-rata kohort >= batas (topik tanpa data = terpenuhi)
+    bitset_dikuasai = graf.bitset(
+        t for t in graf.topik
+        if rata_penguasaan.get(t, BATAS_PRASYARAT_DIKUASAI) >= BATAS_PRASYARAT_DIKUASAI
+    )
     
-    # Gap pembelajaran (topik dengan error tinggi tapi penguasaan rendah)
-    gap_pembelajaran = []
-    for ts in topik_sulit[:10]:
-        if ts["rata_rata_penguasaan"] < 60:
-            gap_pembelajaran.append(ts["topik"])
+    # Kandidat urutan: prioritas & gap, topik bermasalah yang sering muncul bersamaan
+    # diletakkan berdekatan
+    kandidat = set(topik_prioritas) | set(gap_pembelajaran)
+    urutan_kandidat: List[str] = []
+    for topik in topik_prioritas[:5] + gap_pembelajaran[:3]:
+        for t in [topik] + [p for p in topik_sering_bersamaan.get(topik, []) if p in kandidat]:
+            if t not in urutan_kandidat:
+                urutan_kandidat.append(t)
+    
+    topik_terblokir = {
+        t: belum for t in urutan_kandidat
+        if (belum := graf.prasyarat_belum_dikuasai(t, bitset_dikuasai))
+    }
     
-    # Saran urutan (dari dasar ke lanjutan)
-    saran_urutan = topik_prioritas[:5] + gap_pembelajaran[:3]
+    # Saran urutan: prasyarat yang belum dikuasai dipelajari sebelum topik yang membutuhkannya
+    saran_urutan = graf.urutkan_stabil(
+        urutan_kandidat + [p for daftar in topik_terblokir.values() for p in daftar]
+    )
     
     return {
         "topik_prioritas": topik_prioritas[:10],
         "topik_mudah": topik_mudah[:10],
         "gap_pembelajaran": gap_pembelajaran,
-        "saran_urutan": saran_urutan
+        "saran_urutan": saran_urutan,
+        "topik_sering_bersamaan": topik_sering_bersamaan,
+        "topik_terblokir": topik_terblokir
     }
 
 
@@ -709,30 +764,37 @@ async def dapatkan_system_health() -> Dict:
     Returns:
         Dict dengan system health metrics
     """
-    import time
-    
-    # Test database connection
-    db_start = time.time()
-    try:
-        await hitung_user()  # Test Motor connection
-        db_time = (time.time() - db_start) * 1000
-        db_status = "healthy" if db_time < 100 else "slow"
-    except Exception:
-        db_status = "unhealthy"
-        db_time = 0
+    from app.services.health_service import cek_motor
     
-    # API metrics (24 jam terakhir)
-    awal = datetime.now() - timedelta(days=1)
+    # Test database connection (ping bertimeout, bukan count yang menelan error)
+    hasil_ping = await cek_motor()
+    if hasil_ping["status"] != "ok":
+        db_status = "unhealthy"
+    else:
+        db_status = "healthy" if hasil_ping["latensi_ms"] < 100 else "slow"
     
-    api_metrics = await prisma.metrikapi.find_many(
-        where={"createdAt": {"gte": awal}}
-    )
+    # API metrics (24 jam terakhir) - satu $group di MongoDB, bukan memuat semua dokumen.
+    # Setiap entri mewakili 1/rate request asli (lihat sampling di middleware metrik API);
+    # middleware menulis created_at dengan utcnow(), jadi batas waktunya juga UTC.
+    from app.database import dapatkan_collection
     
-    if api_metrics:
-        total_requests = len(api_metrics)
-        avg_response = sum(m.waktuRespons for m in api_metrics) / total_requests
-        error_count = sum(1 for m in api_metrics if m.statusCode >= 400)
-        error_rate = (error_count / total_requests) * 100
+    awal = datetime.utcnow() - timedelta(days=1)
+    bobot = {"$ifNull": ["$bobot_sampel", 1.0]}
+    ringkasan = await dapatkan_collection("metrik_api").aggregate([
+        {"$match": {"created_at": {"$gte": awal}}},
+        {"$group": {
+            "_id": None,
+            "bobot": {"$sum": bobot},
+            "waktu_berbobot": {"$sum": {"$multiply": ["$waktu_respons", bobot]}},
+            "error_berbobot": {"$sum": {"$cond": [{"$gte": ["$status_code", 400]}, bobot, 0]}}
+        }}
+    ]).to_list(length=1)
+    
+    total_bobot = ringkasan[0]["bobot"] if ringkasan else 0
+    if total_bobot > 0:
+        total_requests = int(round(total_bobot))
+        avg_response = ringkasan[0]["waktu_berbobot"] / total_bobot
+        error_rate = (ringkasan[0]["error_berbobot"] / total_bobot) * 100
     else:
         total_requests = 0
         avg_response = 0
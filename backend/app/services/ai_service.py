@@ -10,13 +10,19 @@ Priority:
 
 from langchain_openai import AzureChatOpenAI
 from langchain_community.llms import AzureMLOnlineEndpoint
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
 from pydantic import SecretStr
 from app.config import settings
-from typing import Any
+from typing import Any, Optional, Tuple
 import sys
 
+# Rute model (lihat router_model_service): kecil = cepat & murah, besar = kasus sulit / fallback
+RUTE_KECIL = "kecil"
+RUTE_BESAR = "besar"
 
-def dapatkan_llm_github_models() -> AzureChatOpenAI:
+
+def dapatkan_llm_github_models(model: Optional[str] = None) -> AzureChatOpenAI:
     """
     Gunakan GitHub Models untuk AI inferensi GRATIS
     
@@ -31,6 +37,9 @@ def dapatkan_llm_github_models() -> AzureChatOpenAI:
     2. Pilih scope "public_repo" (read access)
     3. Set GITHUB_TOKEN di .env
     
+    Args:
+        model: Nama model (default: GITHUB_MODEL_NAME)
+    
     Raises:
         ValueError: Jika GITHUB_TOKEN tidak diset
     """
@@ -45,7 +54,7 @@ def dapatkan_llm_github_models() -> AzureChatOpenAI:
     api_key = SecretStr(settings.github_token)
     
     return AzureChatOpenAI(
-        model=settings.github_model_name,  # Default: gpt-4o-mini
+        model=model or settings.github_model_name,  # Default: gpt-4o-mini
         api_key=api_key,
         azure_endpoint="https://models.inference.ai.azure.com",
         api_version="2024-02-01",
@@ -83,7 +92,7 @@ def dapatkan_llm_llama() -> Any:
     )
 
 
-def dapatkan_llm_azure_openai() -> AzureChatOpenAI:
+def dapatkan_llm_azure_openai(model: Optional[str] = None) -> AzureChatOpenAI:
     """
     Gunakan Azure OpenAI untuk production (pay-per-use)
     
@@ -94,6 +103,9 @@ def dapatkan_llm_azure_openai() -> AzureChatOpenAI:
     
     Setup: Create Azure OpenAI resource di Azure Portal
     
+    Args:
+        model: Nama model (default: AZURE_OPENAI_MODEL)
+    
     Raises:
         ValueError: Jika Azure OpenAI tidak dikonfigurasi
     """
@@ -107,7 +119,7 @@ def dapatkan_llm_azure_openai() -> AzureChatOpenAI:
     api_key = SecretStr(settings.azure_openai_api_key)
     
     return AzureChatOpenAI(
-        model="gpt-4o-mini",
+        model=model or settings.azure_openai_model,
         api_key=api_key,
         azure_endpoint=settings.azure_openai_endpoint,
         api_version="2024-02-01",
@@ -115,7 +127,7 @@ def dapatkan_llm_azure_openai() -> AzureChatOpenAI:
     )
 
 
-def dapatkan_llm() -> Any:
+def dapatkan_llm(rute: str = RUTE_KECIL) -> Any:
     """
     Auto-select LLM berdasarkan environment variables dengan error handling
     
@@ -124,6 +136,10 @@ def dapatkan_llm() -> Any:
     2. Llama 3.1 70B (jika USE_LLAMA=true) - Expensive
     3. Azure OpenAI (jika USE_AZURE_OPENAI=true) - Alternative paid
     
+    Args:
+        rute: RUTE_KECIL atau RUTE_BESAR; menentukan model untuk GitHub Models &
+            Azure OpenAI (Llama hanya punya satu deployment)
+    
     Returns:
         LLM instance yang siap digunakan
         
@@ -131,15 +147,16 @@ def dapatkan_llm() -> Any:
         ValueError: Jika tidak ada provider yang valid dikonfigurasi
     """
     try:
+        _, model = dapatkan_info_provider(rute)
         if settings.use_github_models:
-            print("Menggunakan GitHub Models (GRATIS)", file=sys.stderr)
-            return dapatkan_llm_github_models()
+            print(f"Menggunakan GitHub Models (GRATIS) - {model}", file=sys.stderr)
+            return dapatkan_llm_github_models(model)
         elif settings.use_llama:
             print("Menggunakan Llama 3.1 70B (EXPENSIVE!)", file=sys.stderr)
             return dapatkan_llm_llama()
         elif settings.use_azure_openai:
-            print("Menggunakan Azure OpenAI (Pay-per-use)", file=sys.stderr)
-            return dapatkan_llm_azure_openai()
+            print(f"Menggunakan Azure OpenAI (Pay-per-use) - {model}", file=sys.stderr)
+            return dapatkan_llm_azure_openai(model)
         else:
             raise ValueError(
                 "Tidak ada AI provider yang diaktifkan!\n"
@@ -154,3 +171,46 @@ def dapatkan_llm() -> Any:
     except Exception as e:
         print(f"Unexpected error saat inisialisasi LLM: {str(e)}", file=sys.stderr)
         raise ValueError(f"Gagal menginisialisasi AI provider: {str(e)}") from e
+
+
+def dapatkan_info_provider(rute: str = RUTE_KECIL) -> Tuple[str, str]:
+    """
+    Dapatkan nama provider dan model aktif untuk satu rute (untuk label metrik)
+    
+    Returns:
+        Tuple (provider, model)
+    """
+    besar = rute == RUTE_BESAR
+    if settings.use_github_models:
+        return "github_models", settings.github_model_besar if besar else settings.github_model_name
+    elif settings.use_llama:
+        return "llama", "llama-3-1-70b-instruct"
+    elif settings.use_azure_openai:
+        return "azure_openai", settings.azure_openai_model_besar if besar else settings.azure_openai_model
+    return "tidak_ada", "-"
+
+
+class CallbackMetrikLLM(BaseCallbackHandler):
+    """
+    LangChain callback untuk mengumpulkan pemakaian token dari respons LLM.
+    Dipasang per-invoke lewat config={"callbacks": [...]}.
+    """
+    
+    def __init__(self) -> None:
+        self.token_input = 0
+        self.token_output = 0
+    
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        # Format OpenAI: llm_output["token_usage"]
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage:
+            self.token_input += usage.get("prompt_tokens", 0) or 0
+            self.token_output += usage.get("completion_tokens", 0) or 0
+            return
+        
+        # Fallback: usage_metadata di message (chat model)
+        for generasi_list in response.generations:
+            for generasi in generasi_list:
+                metadata = getattr(getattr(generasi, "message", None), "usage_metadata", None) or {}
+                self.token_input += metadata.get("input_tokens", 0) or 0
+                self.token_output += metadata.get("output_tokens", 0) or 0
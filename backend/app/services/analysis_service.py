@@ -4,11 +4,21 @@ Core Objective #1: Semantic Error Analysis
 """
 
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.exceptions import OutputParserException
 from langchain_core.output_parsers import PydanticOutputParser
-from app.services.ai_service import dapatkan_llm
+from app.services.ai_service import dapatkan_llm, dapatkan_info_provider, CallbackMetrikLLM, RUTE_BESAR
 from app.models.schemas import HasilAnalisis
 from app.database import prisma
-from typing import Optional
+from app.services.kanonik_topik_service import kanonikalkan_topik
+from app.services.kookurensi_service import catat_kookurensi
+from app.services.mahasiswa_service import perbarui_dashboard_setelah_analisis
+from app.services.penguasaan_service import perbarui_penguasaan
+from app.services.router_model_service import catat_metrik_ai, estimasi_kompleksitas
+from app.services.template_error_service import miner_template_error
+from app.utils.observabilitas import catat_llm, catat_rute_llm
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import time
 
 
 async def analisis_error_semantik(
@@ -92,22 +102,83 @@ PENTING:
 Berikan analisis mendalam yang fokus pada MENGAPA error ini terjadi dari sudut pandang pemahaman konsep.""")
     ])
     
-    # 5. Buat chain
-    llm = dapatkan_llm()
-    chain = prompt | llm | parser
-    
-    # 6. Invoke chain untuk mendapatkan hasil analisis
-    hasil = await chain.ainvoke({
+    # 5. Pilih model lewat router kompleksitas (kasus mudah -> model kecil yang lebih cepat)
+    tingkat_kemahiran = mahasiswa.tingkatKemahiran if mahasiswa else "pemula"
+    keputusan = estimasi_kompleksitas(kode, pesan_error, bahasa, tingkat_kemahiran)
+    input_chain = {
         "kode": kode,
         "pesan_error": pesan_error,
         "bahasa": bahasa,
-        "tingkat_kemahiran": mahasiswa.tingkatKemahiran if mahasiswa else "pemula",
+        "tingkat_kemahiran": tingkat_kemahiran,
         "konteks_riwayat": konteks_riwayat,
         "format_instructions": parser.get_format_instructions()
-    })
+    }
+    percobaan: List[Dict[str, Any]] = []
+    
+    async def _analisis_dengan(rute: str, fallback: bool) -> HasilAnalisis:
+        """Satu panggilan chain dengan model rute; latensi & token dicatat ke metrik"""
+        chain = prompt | dapatkan_llm(rute) | parser
+        provider, nama_model = dapatkan_info_provider(rute)
+        callback_metrik = CallbackMetrikLLM()
+        mulai_llm = time.perf_counter()
+        berhasil = False
+        try:
+            hasil_chain = await chain.ainvoke(input_chain, config={"callbacks": [callback_metrik]})
+            berhasil = True
+            return hasil_chain
+        finally:
+            durasi = time.perf_counter() - mulai_llm
+            catat_llm(
+                provider,
+                nama_model,
+                durasi,
+                token_input=callback_metrik.token_input,
+                token_output=callback_metrik.token_output,
+                berhasil=berhasil
+            )
+            catat_rute_llm(rute, fallback)
+            percobaan.append({
+                "provider": provider,
+                "model": nama_model,
+                "rute": rute,
+                "skor": keputusan.skor,
+                "fallback": fallback,
+                "token_input": callback_metrik.token_input,
+                "token_output": callback_metrik.token_output,
+                "durasi": durasi,
+                "berhasil": berhasil
+            })
+    
+    # 6. Invoke chain; output model kecil yang gagal di-parse diulang dengan model besar
+    try:
+        try:
+            hasil = await _analisis_dengan(keputusan.rute, fallback=False)
+        except OutputParserException:
+            if keputusan.rute == RUTE_BESAR:
+                raise
+            hasil = await _analisis_dengan(RUTE_BESAR, fallback=True)
+    except Exception:
+        try:
+            await catat_metrik_ai(percobaan)
+        except Exception as e:
+            print(f"Warning: Simpan metrik AI failed: {e}")
+        raise
+    
+    # Petakan topik bebas dari LLM ke nama TopikPembelajaran (lihat kanonik_topik_service)
+    try:
+        hasil.topik_terkait = await kanonikalkan_topik(hasil.topik_terkait)
+    except Exception as e:
+        print(f"Warning: Kanonikalisasi topik failed: {e}")
+    
+    # Template pesan error (Drain) sebagai kunci grouping yang stabil
+    id_template = None
+    try:
+        id_template = await miner_template_error.tetapkan_template(pesan_error)
+    except Exception as e:
+        print(f"Warning: Template error mining failed: {e}")
     
     # 7. Simpan hasil analisis ke database
-    await prisma.submisierror.create(
+    submisi = await prisma.submisierror.create(
         data={
             "idMahasiswa": id_mahasiswa,
             "kode": kode,
@@ -121,9 +192,22 @@ Berikan analisis mendalam yang fokus pada MENGAPA error ini terjadi dari sudut p
             "saranPerbaikan": hasil.saran_perbaikan,
             "topikTerkait": hasil.topik_terkait,
             "saranLatihan": hasil.saran_latihan,
+            "idTemplate": id_template,
         }
     )
     
+    # Metrik per percobaan LLM (rute, latensi, token, biaya, fallback)
+    try:
+        await catat_metrik_ai(percobaan, id_submisi=submisi.id)
+    except Exception as e:
+        print(f"Warning: Simpan metrik AI failed: {e}")
+    
+    # Matriks kookurensi topik (incremental, lihat kookurensi_service)
+    try:
+        await catat_kookurensi(hasil.topik_terkait)
+    except Exception as e:
+        print(f"Warning: Update kookurensi topik failed: {e}")
+    
     # 8. Pattern Mining: Cek apakah ada pola kesalahan berulang (≥3 kali)
     jumlah_error_serupa = await prisma.submisierror.count(
         where={
@@ -169,56 +253,31 @@ Berikan analisis mendalam yang fokus pada MENGAPA error ini terjadi dari sudut p
             )
         except Exception as e:
             print(f"Warning: Upsert pola error failed: {e}")
-        
-        # Update progress belajar untuk setiap topik terkait
-        for topik in hasil.topik_terkait:
-            await perbarui_progress_belajar(id_mahasiswa, topik)
+    
+    # 9. Update penguasaan (BKT) setiap topik terkait: error = observasi salah
+    for topik in hasil.topik_terkait:
+        await perbarui_progress_belajar(id_mahasiswa, topik, submisi.createdAt)
+    
+    # 10. Update snapshot dashboard mahasiswa secara incremental
+    await perbarui_dashboard_setelah_analisis(
+        id_mahasiswa,
+        hasil.tipe_error,
+        submisi.createdAt,
+        progress_berubah=bool(hasil.topik_terkait) or jumlah_error_serupa >= 3
+    )
     
     return hasil
 
 
-async def perbarui_progress_belajar(id_mahasiswa: str, topik: str) -> None:
+async def perbarui_progress_belajar(id_mahasiswa: str, topik: str, waktu: Optional[datetime] = None) -> None:
     """
     Perbarui progress belajar mahasiswa untuk topik tertentu
     Core Objective #4: Personalized Learning
-    """
-    from typing import Any, cast
     
-    # Hitung jumlah error di topik ini
-    jumlah_error = await prisma.submisierror.count(
-        where=cast(Any, {
-            "idMahasiswa": id_mahasiswa,
-            "topikTerkait": {
-                "array_contains": topik
-            }
-        })
-    )
-    
-    # Tentukan tingkat penguasaan (inverse dari jumlah error)
-    # Semakin banyak error, semakin rendah penguasaan
-    tingkat_penguasaan = max(0, 100 - (jumlah_error * 10))
-    
-    # Update atau create progress
+    Tingkat penguasaan diperbarui incremental dengan Bayesian Knowledge Tracing
+    (lihat penguasaan_service), bukan dihitung ulang dari jumlah seluruh error.
+    """
     try:
-        await prisma.progressbelajar.upsert(
-            where=cast(Any, {
-                "idMahasiswa_topik": {
-                    "idMahasiswa": id_mahasiswa,
-                    "topik": topik
-                }
-            }),
-            data={
-                "create": {
-                    "idMahasiswa": id_mahasiswa,
-                    "topik": topik,
-                    "tingkatPenguasaan": tingkat_penguasaan,
-                    "jumlahErrorDiTopik": jumlah_error,
-                },
-                "update": {
-                    "tingkatPenguasaan": tingkat_penguasaan,
-                    "jumlahErrorDiTopik": jumlah_error,
-                }
-            }
-        )
+        await perbarui_penguasaan(id_mahasiswa, topik, benar=False, waktu=waktu)
     except Exception as e:
-        print(f"Warning: Upsert progress belajar failed: {e}")
+        print(f"Warning: Update progress belajar failed: {e}")
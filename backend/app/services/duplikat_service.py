@@ -0,0 +1,270 @@
+"""
+Service Duplikat - deteksi near-duplicate / plagiarisme ExerciseSubmission (MinHash LSH)
+
+Signature MinHash & band LSH disimpan di setiap submisi saat insert (lihat
+app.utils.minhash). Mencari pasangan mirip tidak lagi O(n²):
+1. $unwind lsh_band + $group di MongoDB -> bucket yang berisi >= 2 submisi
+2. Hanya pasangan di bucket yang sama diverifikasi dengan estimasi Jaccard
+3. Pasangan lolos ambang (beda mahasiswa) digabung dengan union-find menjadi klaster
+
+Data lama tanpa signature diisi oleh backfill_minhash() (process pool).
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.database import dapatkan_collection
+from app.repositories.user_repository import cari_user_by_ids
+from app.utils.minhash import estimasi_jaccard, sidik_minhash_batch
+
+logger = logging.getLogger(__name__)
+
+SUBMISSION_COLLECTION = "exercise_submissions"
+
+# Bucket lebih besar dari ini diverifikasi berantai (anggota ke-i vs ke-i-1), bukan pairwise
+BATAS_BUCKET_PAIRWISE = 64
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self._induk: Dict[Any, Any] = {}
+
+    def cari(self, x: Any) -> Any:
+        self._induk.setdefault(x, x)
+        while self._induk[x] != x:
+            self._induk[x] = self._induk[self._induk[x]]
+            x = self._induk[x]
+        return x
+
+    def gabung(self, a: Any, b: Any) -> None:
+        akar_a, akar_b = self.cari(a), self.cari(b)
+        if akar_a != akar_b:
+            self._induk[akar_b] = akar_a
+
+
+def _pasangan_kandidat(bucket_list: List[List[Any]]) -> Set[Tuple[Any, Any]]:
+    """Pasangan submisi yang berbagi minimal satu bucket LSH"""
+    pasangan: Set[Tuple[Any, Any]] = set()
+    for anggota in bucket_list:
+        anggota = sorted(anggota, key=str)
+        if len(anggota) <= BATAS_BUCKET_PAIRWISE:
+            for i in range(len(anggota)):
+                for j in range(i + 1, len(anggota)):
+                    pasangan.add((anggota[i], anggota[j]))
+        else:
+            pasangan.update(zip(anggota, anggota[1:]))
+    return pasangan
+
+
+async def dapatkan_klaster_duplikat(id_exercise: str, ambang: float) -> List[Dict[str, Any]]:
+    """
+    Klaster submisi yang mirip untuk satu exercise
+
+    Args:
+        id_exercise: ID exercise
+        ambang: Estimasi Jaccard minimal agar dua submisi dianggap duplikat (0-1)
+
+    Returns:
+        List klaster (terbesar dulu), masing-masing berisi >= 2 mahasiswa berbeda
+    """
+    if not ObjectId.is_valid(id_exercise):
+        return []
+    collection = dapatkan_collection(SUBMISSION_COLLECTION)
+
+    # 1. Bucket LSH berisi >= 2 submisi (dikerjakan di database)
+    pipeline = [
+        {"$match": {"id_exercise": ObjectId(id_exercise), "lsh_band.0": {"$exists": True}}},
+        {"$project": {"lsh_band": 1}},
+        {"$unwind": "$lsh_band"},
+        {"$group": {"_id": "$lsh_band", "anggota": {"$push": "$_id"}}},
+        {"$match": {"anggota.1": {"$exists": True}}},
+    ]
+    bucket_list = [doc["anggota"] async for doc in collection.aggregate(pipeline, allowDiskUse=True)]
+    pasangan = _pasangan_kandidat(bucket_list)
+    if not pasangan:
+        return []
+
+    # 2. Verifikasi kandidat dengan signature lengkap
+    id_kandidat = list({id_sub for pair in pasangan for id_sub in pair})
+    submisi: Dict[Any, Dict[str, Any]] = {}
+    cursor = collection.find(
+        {"_id": {"$in": id_kandidat}},
+        projection={"id_mahasiswa": 1, "minhash": 1, "nilai_score": 1, "created_at": 1}
+    )
+    async for doc in cursor:
+        submisi[doc["_id"]] = doc
+
+    uf = _UnionFind()
+    kemiripan_min: Dict[Any, float] = {}
+    for a, b in pasangan:
+        doc_a, doc_b = submisi.get(a), submisi.get(b)
+        if not doc_a or not doc_b or doc_a.get("id_mahasiswa") == doc_b.get("id_mahasiswa"):
+            continue
+        jaccard = estimasi_jaccard(doc_a.get("minhash", []), doc_b.get("minhash", []))
+        if jaccard >= ambang:
+            uf.gabung(a, b)
+            kemiripan_min[a] = min(kemiripan_min.get(a, 1.0), jaccard)
+            kemiripan_min[b] = min(kemiripan_min.get(b, 1.0), jaccard)
+
+    # 3. Susun klaster
+    klaster: Dict[Any, List[Any]] = {}
+    for id_sub in kemiripan_min:
+        klaster.setdefault(uf.cari(id_sub), []).append(id_sub)
+
+    user_map = await cari_user_by_ids([
+        str(submisi[id_sub]["id_mahasiswa"]) for anggota in klaster.values() for id_sub in anggota
+    ])
+
+    hasil: List[Dict[str, Any]] = []
+    for anggota in klaster.values():
+        mahasiswa = {str(submisi[id_sub]["id_mahasiswa"]) for id_sub in anggota}
+        if len(mahasiswa) < 2:
+            continue
+        anggota.sort(key=lambda id_sub: submisi[id_sub].get("created_at") or datetime.min)
+        hasil.append({
+            "jumlah_submisi": len(anggota),
+            "jumlah_mahasiswa": len(mahasiswa),
+            "kemiripan_minimum": round(min(kemiripan_min[id_sub] for id_sub in anggota), 4),
+            "anggota": [
+                {
+                    "id_submission": str(id_sub),
+                    "id_mahasiswa": str(submisi[id_sub]["id_mahasiswa"]),
+                    "nama_mahasiswa": user_map.get(str(submisi[id_sub]["id_mahasiswa"]), {}).get("nama"),
+                    "nilai_score": submisi[id_sub].get("nilai_score"),
+                    "created_at": submisi[id_sub].get("created_at"),
+                }
+                for id_sub in anggota
+            ],
+        })
+
+    hasil.sort(key=lambda k: (-k["jumlah_mahasiswa"], -k["jumlah_submisi"]))
+    return hasil
+
+
+# ==================== BACKFILL ====================
+
+_status_backfill: Dict[str, Any] = {"berjalan": False, "diproses": 0, "mulai": None, "selesai": None, "error": None}
+_task_backfill: Optional[asyncio.Task] = None
+
+
+async def backfill_minhash(ukuran_batch: Optional[int] = None, workers: Optional[int] = None) -> int:
+    """
+    Hitung signature MinHash untuk submisi lama yang belum punya field minhash
+
+    Batch dibaca berurutan by _id; perhitungan signature (CPU-bound) dijalankan di
+    process pool, maksimal 2 batch per worker sedang diproses sekaligus.
+
+    Returns:
+        Jumlah submisi yang diperbarui
+    """
+    ukuran_batch = ukuran_batch or settings.duplikat_backfill_ukuran_batch
+    workers = workers or settings.duplikat_backfill_workers or os.cpu_count() or 1
+    collection = dapatkan_collection(SUBMISSION_COLLECTION)
+    loop = asyncio.get_running_loop()
+    mulai = time.perf_counter()
+    total = 0
+
+    async def _simpan(id_list: List[Any], future: "asyncio.Future[List[Tuple[List[int], List[str]]]]") -> int:
+        hasil = await future
+        operasi = [
+            UpdateOne({"_id": id_sub}, {"$set": {"minhash": signature, "lsh_band": band}})
+            for id_sub, (signature, band) in zip(id_list, hasil)
+        ]
+        if operasi:
+            await collection.bulk_write(operasi, ordered=False)
+        return len(operasi)
+
+    # spawn: aman dipakai dari proses yang sudah punya thread (event loop, Motor)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        berjalan: Set[asyncio.Task] = set()
+        terakhir: Optional[Any] = None
+        while True:
+            filter_batch: Dict[str, Any] = {"minhash": {"$exists": False}}
+            if terakhir is not None:
+                filter_batch["_id"] = {"$gt": terakhir}
+            batch = await collection.find(
+                filter_batch, projection={"kode_submisi": 1}
+            ).sort("_id", 1).limit(ukuran_batch).to_list(length=ukuran_batch)
+            if not batch:
+                break
+            terakhir = batch[-1]["_id"]
+
+            id_list = [doc["_id"] for doc in batch]
+            future = loop.run_in_executor(pool, sidik_minhash_batch, [doc.get("kode_submisi") or "" for doc in batch])
+            berjalan.add(asyncio.create_task(_simpan(id_list, future)))
+
+            if len(berjalan) >= workers * 2:
+                selesai, berjalan = await asyncio.wait(berjalan, return_when=asyncio.FIRST_COMPLETED)
+                for task in selesai:
+                    total += task.result()
+                _status_backfill["diproses"] = total
+
+        if berjalan:
+            for jumlah in await asyncio.gather(*berjalan):
+                total += jumlah
+
+    logger.info(f"✅ Backfill MinHash: {total} submisi dalam {time.perf_counter() - mulai:.1f}s ({workers} worker)")
+    return total
+
+
+async def _jalankan_backfill() -> None:
+    try:
+        _status_backfill["diproses"] = await backfill_minhash()
+    except asyncio.CancelledError:
+        _status_backfill["error"] = "Dibatalkan"
+        raise
+    except Exception as e:
+        logger.warning(f"⚠️ Backfill MinHash gagal: {e}")
+        _status_backfill["error"] = str(e)
+    finally:
+        _status_backfill["berjalan"] = False
+        _status_backfill["selesai"] = datetime.utcnow()
+
+
+def mulai_backfill_minhash() -> Dict[str, Any]:
+    """Mulai backfill di background (jika belum berjalan) dan kembalikan statusnya"""
+    global _task_backfill
+    if not _status_backfill["berjalan"]:
+        _status_backfill.update({
+            "berjalan": True, "diproses": 0, "mulai": datetime.utcnow(), "selesai": None, "error": None
+        })
+        _task_backfill = asyncio.create_task(_jalankan_backfill())
+    return dict(_status_backfill)
+
+
+def dapatkan_status_backfill() -> Dict[str, Any]:
+    return dict(_status_backfill)
+
+
+async def batalkan_backfill() -> None:
+    """Batalkan backfill yang sedang berjalan (dipanggil saat shutdown)"""
+    if _task_backfill is not None and not _task_backfill.done():
+        _task_backfill.cancel()
+        try:
+            await _task_backfill
+        except asyncio.CancelledError:
+            pass
+
+
+if __name__ == "__main__":
+    # Backfill manual: python -m app.services.duplikat_service (dari direktori backend/)
+    from app.database import putuskan_database, sambungkan_database
+
+    async def _main() -> None:
+        await sambungkan_database()
+        try:
+            print(f"✅ {await backfill_minhash()} submisi diperbarui")
+        finally:
+            await putuskan_database()
+
+    asyncio.run(_main())
@@ -3,13 +3,28 @@ Exercise Service - Business logic untuk Practice Exercises
 """
 
 from app.database import prisma
-from typing import List, Dict, Any
+from app.services.katalog_service import indeks_exercise
+from app.services.mahasiswa_service import perbarui_dashboard_setelah_progress
+from app.services.penguasaan_service import perbarui_penguasaan
+from app.services.penilaian_service import nilai_submisi
+from app.services.rekomendasi_service import ambil_rekomendasi_tersimpan
+from app.utils.cache import CacheTTL
+from app.utils.loader import LoaderBatch
+from app.utils.minhash import sidik_minhash
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
+# Metadata exercise (judul & topik) untuk join manual di history submission
+loader_exercise = LoaderBatch(
+    "exercises",
+    projection={"judul": 1, "topik": 1},
+    cache=CacheTTL("exercise_meta", ukuran_maks=5000, ttl_detik=300.0)
+)
+
 
 async def dapatkan_exercises_by_topik(topik: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
-    Dapatkan exercises berdasarkan topik
+    Dapatkan exercises berdasarkan topik (dari index katalog in-memory)
     
     Args:
         topik: Topik yang ingin dilatih
@@ -18,30 +33,8 @@ async def dapatkan_exercises_by_topik(topik: str, limit: int = 10) -> List[Dict[
     Returns:
         List exercises
     """
-    exercises = await prisma.exercise.find_many(
-        where={"topik": topik},
-        take=limit,
-        order={"dibuat": "desc"}
-    )
-    
-    return [
-        {
-            "id": ex.id,
-            "judul": ex.judul,
-            "deskripsi": ex.deskripsi,
-            "topik": ex.topik,
-            "tingkat_kesulitan": ex.tingkatKesulitan,
-            "instruksi": ex.instruksi,
-            "kode_pemula": ex.kodePemula,
-            "solusi_referensi": ex.solusiReferensi,
-            "test_cases": ex.testCases,
-            "poin_belajar": ex.poinBelajar,
-            "estimasi_waktu": ex.estimasiWaktu,
-            "dibuat": ex.dibuat,
-            "diperbarui": ex.diperbarui
-        }
-        for ex in exercises
-    ]
+    await indeks_exercise.pastikan_segar()
+    return indeks_exercise.cari([topik], limit)
 
 
 async def dapatkan_exercises_rekomendasi(id_mahasiswa: str, limit: int = 5) -> List[Dict[str, Any]]:
@@ -55,6 +48,11 @@ async def dapatkan_exercises_rekomendasi(id_mahasiswa: str, limit: int = 5) -> L
     Returns:
         List recommended exercises
     """
+    # Ranking hasil batch (satu find_one); fallback ke topik terlemah jika belum dihitung
+    tersimpan = await ambil_rekomendasi_tersimpan(id_mahasiswa, indeks_exercise, "exercise", limit)
+    if tersimpan:
+        return tersimpan
+    
     # Ambil topik-topik terlemah mahasiswa
     progress = await prisma.progressbelajar.find_many(
         where={"idMahasiswa": id_mahasiswa},
@@ -62,42 +60,38 @@ async def dapatkan_exercises_rekomendasi(id_mahasiswa: str, limit: int = 5) -> L
         take=3  # Top 3 topik terlemah
     )
     
+    await indeks_exercise.pastikan_segar()
+    
     if not progress:
         # Jika belum ada progress, ambil exercise pemula
-        exercises = await prisma.exercise.find_many(
-            where={"tingkatKesulitan": "pemula"},
-            take=limit,
-            order={"dibuat": "desc"}
-        )
+        return indeks_exercise.terbaru(limit, kesulitan=["pemula"])
+    
+    # Ambil exercises dari topik-topik terlemah (terlemah diprioritaskan)
+    topik_lemah = [p.topik for p in progress]
+    return indeks_exercise.cari(topik_lemah, limit)
+
+
+def _nilai_kemiripan_panjang(kode_submisi: str, solusi_referensi: str) -> Tuple[bool, Optional[int], str]:
+    """
+    Penilaian fallback jika solusi referensi bukan kode Python valid dan exercise
+    tidak punya test case yang bisa dieksekusi: bandingkan panjang kode
+
+    Returns:
+        Tuple (status_selesai, nilai_score, feedback)
+    """
+    if not kode_submisi.strip():
+        return False, None, "⚠️ Solusi kosong. Silakan tulis kode Anda."
+
+    similarity_ratio = min(len(kode_submisi), len(solusi_referensi)) / max(len(kode_submisi), len(solusi_referensi))
+    nilai_score = int(similarity_ratio * 100)
+
+    if nilai_score >= 80:
+        feedback = "✅ Solusi Anda sangat baik! Kode mirip dengan solusi referensi."
+    elif nilai_score >= 60:
+        feedback = "👍 Solusi Anda cukup baik, tapi bisa ditingkatkan lagi."
     else:
-        # Ambil exercises dari topik-topik terlemah
-        topik_lemah = [p.topik for p in progress]
-        exercises = await prisma.exercise.find_many(
-            where={
-                "topik": {"in": topik_lemah}
-            },
-            take=limit,
-            order={"dibuat": "desc"}
-        )
-    
-    return [
-        {
-            "id": ex.id,
-            "judul": ex.judul,
-            "deskripsi": ex.deskripsi,
-            "topik": ex.topik,
-            "tingkat_kesulitan": ex.tingkatKesulitan,
-            "instruksi": ex.instruksi,
-            "kode_pemula": ex.kodePemula,
-            "solusi_referensi": ex.solusiReferensi,
-            "test_cases": ex.testCases,
-            "poin_belajar": ex.poinBelajar,
-            "estimasi_waktu": ex.estimasiWaktu,
-            "dibuat": ex.dibuat,
-            "diperbarui": ex.diperbarui
-        }
-        for ex in exercises
-    ]
+        feedback = "💡 Solusi Anda perlu perbaikan. Coba bandingkan dengan solusi referensi."
+    return True, nilai_score, feedback
 
 
 async def submit_exercise_solution(
@@ -106,7 +100,8 @@ async def submit_exercise_solution(
     kode_submisi: str
 ) -> Dict[str, Any]:
     """
-    Submit solusi exercise dan berikan feedback sederhana
+    Submit solusi exercise: nilai struktur AST terhadap solusi referensi dan jalankan
+    test case di sandbox jika diperlukan
     
     Args:
         id_mahasiswa: ID mahasiswa
@@ -114,7 +109,11 @@ async def submit_exercise_solution(
         kode_submisi: Kode solusi mahasiswa
         
     Returns:
-        Submission data dengan feedback
+        Submission data dengan feedback (+ hasil_test per test case jika dievaluasi)
+
+    Raises:
+        ValueError: Exercise tidak ditemukan
+        AntrianSandboxPenuh: Antrian penilaian penuh
     """
     # Ambil exercise untuk compare dengan solusi referensi
     exercise = await prisma.exercise.find_unique(where={"id": id_exercise})
@@ -122,25 +121,20 @@ async def submit_exercise_solution(
     if not exercise:
         raise ValueError("Exercise tidak ditemukan")
     
-    # Feedback sederhana (bisa di-enhance dengan AI nanti)
-    status_selesai = len(kode_submisi.strip()) > 0
-    nilai_score = None
-    feedback = None
-    
-    if status_selesai:
-        # Simple scoring: Check if solution has similar length to reference
-        # (ini hanya placeholder, bisa di-improve dengan proper code evaluation)
-        similarity_ratio = min(len(kode_submisi), len(exercise.solusiReferensi)) / max(len(kode_submisi), len(exercise.solusiReferensi))
-        nilai_score = int(similarity_ratio * 100)
-        
-        if nilai_score >= 80:
-            feedback = "✅ Solusi Anda sangat baik! Kode mirip dengan solusi referensi."
-        elif nilai_score >= 60:
-            feedback = "👍 Solusi Anda cukup baik, tapi bisa ditingkatkan lagi."
-        else:
-            feedback = "💡 Solusi Anda perlu perbaikan. Coba bandingkan dengan solusi referensi."
+    # Evaluasi struktur AST + test case di sandbox (lihat penilaian_service)
+    penilaian = None
+    if kode_submisi.strip():
+        penilaian = await nilai_submisi(id_exercise, kode_submisi, exercise.testCases, exercise.solusiReferensi)
+
+    if penilaian is not None:
+        status_selesai = penilaian["status_selesai"]
+        nilai_score = penilaian["nilai_score"]
+        feedback = penilaian["feedback"]
     else:
-        feedback = "⚠️ Solusi kosong. Silakan tulis kode Anda."
+        status_selesai, nilai_score, feedback = _nilai_kemiripan_panjang(kode_submisi, exercise.solusiReferensi)
+    
+    # Signature MinHash untuk deteksi duplikat (lihat duplikat_service)
+    minhash, lsh_band = sidik_minhash(kode_submisi)
     
     # Simpan submission
     submission = await prisma.exercisesubmission.create(
@@ -150,10 +144,20 @@ async def submit_exercise_solution(
             "kodeSubmisi": kode_submisi,
             "statusSelesai": status_selesai,
             "nilaiScore": nilai_score,
-            "feedback": feedback
+            "feedback": feedback,
+            "minhash": minhash,
+            "lshBand": lsh_band
         }
     )
     
+    # Update penguasaan (BKT) topik exercise: lulus = observasi benar
+    if kode_submisi.strip() and exercise.topik:
+        try:
+            await perbarui_penguasaan(id_mahasiswa, exercise.topik, benar=status_selesai, waktu=submission.createdAt)
+            await perbarui_dashboard_setelah_progress(id_mahasiswa)
+        except Exception as e:
+            print(f"Warning: Update penguasaan failed: {e}")
+    
     return {
         "id": submission.id,
         "id_mahasiswa": submission.idMahasiswa,
@@ -162,7 +166,9 @@ async def submit_exercise_solution(
         "status_selesai": submission.statusSelesai,
         "nilai_score": submission.nilaiScore,
         "feedback": submission.feedback,
-        "created_at": submission.createdAt
+        "created_at": submission.createdAt,
+        "hasil_test": penilaian["hasil_test"] if penilaian else None,
+        "kemiripan_struktur": penilaian["kemiripan_struktur"] if penilaian else None
     }
 
 
@@ -184,19 +190,18 @@ async def dapatkan_submission_history(id_mahasiswa: str, limit: int = 20) -> Lis
         order={"createdAt": "desc"}
     )
     
-    # Build response dengan manual fetch exercise
+    # Metadata exercise untuk semua submission diambil sekaligus (satu query $in)
+    exercise_map = await loader_exercise.muat_banyak(sub.idExercise for sub in submissions)
+    
     result = []
     for sub in submissions:
-        # Fetch exercise data manually jika perlu
-        exercise = await prisma.exercise.find_unique(
-            where={"id": sub.idExercise}
-        ) if sub.idExercise else None
+        exercise = exercise_map.get(sub.idExercise) if sub.idExercise else None
         
         result.append({
             "id": sub.id,
             "id_exercise": sub.idExercise,
-            "exercise_judul": exercise.judul if exercise else "Unknown",
-            "exercise_topik": exercise.topik if exercise else "Unknown",
+            "exercise_judul": exercise.get("judul", "Unknown") if exercise else "Unknown",
+            "exercise_topik": exercise.get("topik", "Unknown") if exercise else "Unknown",
             "status_selesai": sub.statusSelesai,
             "nilai_score": sub.nilaiScore,
             "feedback": sub.feedback,
@@ -0,0 +1,373 @@
+"""
+Service untuk Export Kohort (Admin)
+Export submisi/pola/progress seluruh kelas sebagai background job
+
+- Satu cursor Motor per job (projection + batch), tidak ada query per mahasiswa
+- CSV ditulis lewat stream_csv (opsional gzip), Parquet per row group (pyarrow, opsional)
+- Progress job bisa dipantau, hasil akhir berupa file yang bisa di-download
+
+Catatan: registry job disimpan di memori proses. Pada deployment multi-worker,
+status & download harus diarahkan ke worker yang sama (sticky session), atau
+jalankan export di satu worker khusus.
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.database import dapatkan_collection
+from app.models.schemas import RequestExportKohort, ResponseJobExport
+from app.utils.csv_stream import stream_csv
+
+logger = logging.getLogger(__name__)
+
+# Definisi dataset: collection, field tanggal untuk filter, field topik untuk filter,
+# dan kolom output (nama, field dokumen, tipe). Kolom email/nama/role diisi dari User.
+KOLOM_USER: List[Tuple[str, str, str]] = [
+    ("id_mahasiswa", "id_mahasiswa", "str"),
+    ("email", "email", "str"),
+    ("nama", "nama", "str"),
+    ("role", "role", "str"),
+]
+
+DATASET_EXPORT: Dict[str, Dict[str, Any]] = {
+    "submisi": {
+        "collection": "submisi_error",
+        "field_tanggal": "created_at",
+        "field_topik": "topik_terkait",
+        "kolom": KOLOM_USER + [
+            ("created_at", "created_at", "waktu"),
+            ("bahasa", "bahasa", "str"),
+            ("tipe_error", "tipe_error", "str"),
+            ("penyebab_utama", "penyebab_utama", "str"),
+            ("kesenjangan_konsep", "kesenjangan_konsep", "str"),
+            ("level_bloom", "level_bloom", "str"),
+            ("topik_terkait", "topik_terkait", "list"),
+        ],
+    },
+    "pola": {
+        "collection": "pola_error",
+        "field_tanggal": "updated_at",
+        "field_topik": "sumber_daya_direkomendasikan",
+        "kolom": KOLOM_USER + [
+            ("jenis_kesalahan", "jenis_kesalahan", "str"),
+            ("frekuensi", "frekuensi", "int"),
+            ("kejadian_pertama", "kejadian_pertama", "waktu"),
+            ("kejadian_terakhir", "kejadian_terakhir", "waktu"),
+            ("deskripsi_miskonsepsi", "deskripsi_miskonsepsi", "str"),
+            ("updated_at", "updated_at", "waktu"),
+        ],
+    },
+    "progress": {
+        "collection": "progress_belajar",
+        "field_tanggal": "updated_at",
+        "field_topik": "topik",
+        "kolom": KOLOM_USER + [
+            ("topik", "topik", "str"),
+            ("tingkat_penguasaan", "tingkat_penguasaan", "int"),
+            ("jumlah_error_di_topik", "jumlah_error_di_topik", "int"),
+            ("tanggal_error_terakhir", "tanggal_error_terakhir", "waktu"),
+            ("tren_perbaikan", "tren_perbaikan", "str"),
+            ("updated_at", "updated_at", "waktu"),
+        ],
+    },
+}
+
+FORMAT_EXPORT = ("csv", "parquet")
+
+
+class JobExport:
+    """State satu job export kohort"""
+
+    def __init__(self, permintaan: RequestExportKohort, id_admin: Optional[str]):
+        self.id_job = uuid.uuid4().hex
+        self.permintaan = permintaan
+        self.id_admin = id_admin
+        self.status = "menunggu"
+        self.baris_diproses = 0
+        self.total_baris: Optional[int] = None
+        self.dibuat = datetime.now(timezone.utc)  # Aware: dibandingkan dengan time.time() saat pembersihan
+        self.selesai: Optional[datetime] = None
+        self.pesan_error: Optional[str] = None
+        self.path_file: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def nama_file(self) -> str:
+        ekstensi = "parquet" if self.permintaan.format == "parquet" else "csv"
+        if ekstensi == "csv" and self.permintaan.gzip:
+            ekstensi = "csv.gz"
+        return f"export_{self.permintaan.dataset}_{self.dibuat.strftime('%Y%m%d_%H%M%S')}.{ekstensi}"
+
+    def ke_response(self) -> ResponseJobExport:
+        if self.status == "selesai":
+            persentase = 100.0
+        elif self.total_baris:
+            persentase = min(99.9, self.baris_diproses / self.total_baris * 100)
+        else:
+            persentase = 0.0
+
+        return ResponseJobExport(
+            id_job=self.id_job,
+            status=self.status,
+            dataset=self.permintaan.dataset,
+            format=self.permintaan.format,
+            baris_diproses=self.baris_diproses,
+            total_baris=self.total_baris,
+            persentase=round(persentase, 1),
+            dibuat=self.dibuat,
+            selesai=self.selesai,
+            pesan_error=self.pesan_error,
+            url_download=f"/api/admin/export/{self.id_job}/download" if self.status == "selesai" else None
+        )
+
+
+_job_export: "OrderedDict[str, JobExport]" = OrderedDict()
+_semafor_export: Optional[asyncio.Semaphore] = None
+
+
+def _direktori_export() -> str:
+    direktori = settings.export_direktori or os.path.join(tempfile.gettempdir(), "pahamkode-export")
+    os.makedirs(direktori, exist_ok=True)
+    return direktori
+
+
+def _bersihkan_job_lama() -> None:
+    """Hapus job (beserta file artifact) yang lebih tua dari EXPORT_UMUR_ARTIFACT"""
+    batas = time.time() - settings.export_umur_artifact
+    for id_job in list(_job_export):
+        job = _job_export[id_job]
+        if job.status in ("menunggu", "berjalan") or job.dibuat.timestamp() > batas:
+            continue
+        if job.path_file and os.path.exists(job.path_file):
+            try:
+                os.remove(job.path_file)
+            except OSError as e:
+                logger.warning(f"⚠️ Gagal menghapus artifact export {job.path_file}: {e}")
+        del _job_export[id_job]
+
+
+def _muat_pyarrow() -> Any:
+    """Import pyarrow (opsional); None jika tidak terinstall"""
+    try:
+        return importlib.import_module("pyarrow")
+    except ImportError:
+        return None
+
+
+def _validasi_permintaan(permintaan: RequestExportKohort) -> None:
+    if permintaan.dataset not in DATASET_EXPORT:
+        raise ValueError(f"Dataset tidak valid: {permintaan.dataset}. Pilihan: {', '.join(DATASET_EXPORT)}")
+    if permintaan.format not in FORMAT_EXPORT:
+        raise ValueError(f"Format tidak valid: {permintaan.format}. Pilihan: {', '.join(FORMAT_EXPORT)}")
+    if permintaan.format == "parquet" and _muat_pyarrow() is None:
+        raise ValueError("Format parquet membutuhkan pyarrow (pip install pyarrow)")
+
+
+async def _peta_user(role: Optional[str]) -> Dict[Any, Dict[str, Any]]:
+    """Ambil email/nama/role semua user (opsional difilter role) sebagai lookup in-memory"""
+    filter_user: Dict[str, Any] = {"role": role} if role else {}
+    cursor = dapatkan_collection("User").find(
+        filter_user,
+        projection={"email": 1, "nama": 1, "role": 1},
+        batch_size=1000
+    )
+    return {doc["_id"]: doc async for doc in cursor}
+
+
+def _bangun_filter(
+    dataset: Dict[str, Any],
+    permintaan: RequestExportKohort,
+    peta_user: Dict[Any, Dict[str, Any]]
+) -> Dict[str, Any]:
+    filter_dokumen: Dict[str, Any] = {}
+    if permintaan.role:
+        filter_dokumen["id_mahasiswa"] = {"$in": list(peta_user)}
+
+    rentang: Dict[str, Any] = {}
+    if permintaan.tanggal_mulai:
+        rentang["$gte"] = permintaan.tanggal_mulai
+    if permintaan.tanggal_selesai:
+        rentang["$lt"] = permintaan.tanggal_selesai
+    if rentang:
+        filter_dokumen[dataset["field_tanggal"]] = rentang
+
+    if permintaan.topik:
+        # Field array (topik_terkait) juga cocok dengan kesetaraan elemen
+        filter_dokumen[dataset["field_topik"]] = permintaan.topik
+
+    return filter_dokumen
+
+
+async def _baris_dokumen(
+    job: JobExport,
+    dataset: Dict[str, Any],
+    filter_dokumen: Dict[str, Any],
+    peta_user: Dict[Any, Dict[str, Any]]
+) -> AsyncIterator[Dict[str, Any]]:
+    """Baca dokumen dari satu cursor dan gabungkan dengan data user"""
+    projection = {field: 1 for _, field, _ in dataset["kolom"] if field not in ("email", "nama", "role")}
+    cursor = dapatkan_collection(dataset["collection"]).find(
+        filter_dokumen,
+        projection=projection,
+        batch_size=1000
+    )
+    try:
+        async for doc in cursor:
+            user = peta_user.get(doc.get("id_mahasiswa"), {})
+            doc["email"] = user.get("email")
+            doc["nama"] = user.get("nama")
+            doc["role"] = user.get("role")
+            job.baris_diproses += 1
+            yield doc
+    finally:
+        await cursor.close()
+
+
+def _nilai_csv(nilai: Any, tipe: str) -> Any:
+    if nilai is None:
+        return ""
+    if tipe == "waktu":
+        return nilai.strftime("%Y-%m-%d %H:%M:%S")
+    if tipe == "list":
+        return "; ".join(str(v) for v in nilai)
+    return str(nilai) if tipe == "str" else nilai
+
+
+async def _tulis_csv(job: JobExport, dataset: Dict[str, Any], dokumen: AsyncIterator[Dict[str, Any]]) -> None:
+    kolom = dataset["kolom"]
+
+    async def baris() -> AsyncIterator[List[Any]]:
+        async for doc in dokumen:
+            yield [_nilai_csv(doc.get(field), tipe) for _, field, tipe in kolom]
+
+    with open(job.path_file, "wb") as f:  # type: ignore[arg-type]
+        async for chunk in stream_csv([nama for nama, _, _ in kolom], baris(), gzip=job.permintaan.gzip):
+            await asyncio.to_thread(f.write, chunk)
+
+
+async def _tulis_parquet(job: JobExport, dataset: Dict[str, Any], dokumen: AsyncIterator[Dict[str, Any]]) -> None:
+    pa = _muat_pyarrow()
+    pq = importlib.import_module("pyarrow.parquet")
+
+    tipe_arrow = {
+        "str": pa.string(),
+        "int": pa.int64(),
+        "waktu": pa.timestamp("ms"),
+        "list": pa.list_(pa.string()),
+    }
+    kolom = dataset["kolom"]
+    skema = pa.schema([(nama, tipe_arrow[tipe]) for nama, _, tipe in kolom])
+    nama_kolom = [nama for nama, _, _ in kolom]
+
+    def nilai_parquet(nilai: Any, tipe: str) -> Any:
+        if nilai is None:
+            return None
+        return str(nilai) if tipe == "str" else nilai
+
+    writer = pq.ParquetWriter(job.path_file, skema, compression="snappy")
+    try:
+        kolom_buffer: List[List[Any]] = [[] for _ in kolom]
+        async for doc in dokumen:
+            for i, (_, field, tipe) in enumerate(kolom):
+                kolom_buffer[i].append(nilai_parquet(doc.get(field), tipe))
+            if len(kolom_buffer[0]) >= settings.export_ukuran_row_group:
+                tabel = pa.Table.from_pydict(dict(zip(nama_kolom, kolom_buffer)), schema=skema)
+                await asyncio.to_thread(writer.write_table, tabel)
+                kolom_buffer = [[] for _ in kolom]
+
+        if kolom_buffer[0]:
+            tabel = pa.Table.from_pydict(dict(zip(nama_kolom, kolom_buffer)), schema=skema)
+            await asyncio.to_thread(writer.write_table, tabel)
+    finally:
+        await asyncio.to_thread(writer.close)
+
+
+async def _jalankan_job(job: JobExport) -> None:
+    global _semafor_export
+    if _semafor_export is None:
+        _semafor_export = asyncio.Semaphore(settings.export_maks_job_paralel)
+
+    async with _semafor_export:
+        job.status = "berjalan"
+        mulai = time.perf_counter()
+        try:
+            dataset = DATASET_EXPORT[job.permintaan.dataset]
+            peta_user = await _peta_user(job.permintaan.role)
+            filter_dokumen = _bangun_filter(dataset, job.permintaan, peta_user)
+            job.total_baris = await dapatkan_collection(dataset["collection"]).count_documents(filter_dokumen)
+
+            ekstensi = "parquet" if job.permintaan.format == "parquet" else "csv"
+            job.path_file = os.path.join(_direktori_export(), f"{job.id_job}.{ekstensi}")
+
+            dokumen = _baris_dokumen(job, dataset, filter_dokumen, peta_user)
+            if job.permintaan.format == "parquet":
+                await _tulis_parquet(job, dataset, dokumen)
+            else:
+                await _tulis_csv(job, dataset, dokumen)
+
+            job.status = "selesai"
+            logger.info(
+                f"✅ Export {job.permintaan.dataset} ({job.permintaan.format}) selesai: "
+                f"{job.baris_diproses} baris dalam {time.perf_counter() - mulai:.1f}s"
+            )
+        except (Exception, asyncio.CancelledError) as e:
+            job.status = "gagal"
+            job.pesan_error = "Dibatalkan (server shutdown)" if isinstance(e, asyncio.CancelledError) else str(e)[:500]
+            logger.warning(f"⚠️ Export {job.id_job} gagal: {job.pesan_error}")
+            if job.path_file and os.path.exists(job.path_file):
+                os.remove(job.path_file)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            job.selesai = datetime.now(timezone.utc)
+
+
+def mulai_export_kohort(permintaan: RequestExportKohort, id_admin: Optional[str] = None) -> ResponseJobExport:
+    """
+    Buat dan jalankan job export kohort di background
+
+    Args:
+        permintaan: Dataset, format & filter export
+        id_admin: ID admin yang meminta export
+
+    Returns:
+        Status awal job
+
+    Raises:
+        ValueError: Jika dataset/format tidak valid atau pyarrow tidak tersedia
+    """
+    _validasi_permintaan(permintaan)
+    _bersihkan_job_lama()
+
+    job = JobExport(permintaan, id_admin)
+    _job_export[job.id_job] = job
+    job.task = asyncio.create_task(_jalankan_job(job))
+    return job.ke_response()
+
+
+def dapatkan_job_export(id_job: str) -> Optional[JobExport]:
+    """Ambil job export berdasarkan ID (None jika tidak ada / sudah dibersihkan)"""
+    return _job_export.get(id_job)
+
+
+def daftar_job_export() -> List[ResponseJobExport]:
+    """Daftar semua job export yang masih tersimpan (terbaru dulu)"""
+    return [job.ke_response() for job in reversed(_job_export.values())]
+
+
+async def batalkan_semua_export() -> None:
+    """Batalkan job yang masih berjalan (dipanggil saat shutdown)"""
+    tasks = [job.task for job in _job_export.values() if job.task and not job.task.done()]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,68 @@
+"""
+Service Graf Topik - DAG prasyarat TopikPembelajaran di memori (app.utils.graf_topik)
+
+Graf dibangun sekali dari collection topik_pembelajaran lalu dipakai sebagai lookup
+(urutan topologis, closure bitset) oleh rekomendasi kurikulum. Kesegaran mengikuti
+pola index katalog: admin create/update/delete topik memanggil tandai_berubah()
+-> versi di "meta_katalog" dinaikkan, worker lain memuat ulang saat versi berbeda.
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Sequence
+
+from app.database import dapatkan_collection
+from app.services.katalog_service import CacheBerversi
+from app.utils.graf_topik import GrafTopik, validasi_prasyarat
+
+logger = logging.getLogger(__name__)
+
+NAMA_META_GRAF = "graf_topik"
+
+
+class IndeksGrafTopik(CacheBerversi[GrafTopik]):
+    """Graf prasyarat topik yang di-cache per worker"""
+
+    def __init__(self) -> None:
+        super().__init__(NAMA_META_GRAF, GrafTopik({}))
+        self._prasyarat: Dict[str, List[str]] = {}
+        self._nama_per_id: Dict[str, str] = {}
+
+    async def muat_ulang(self) -> GrafTopik:
+        """Muat seluruh topik dan bangun ulang graf (urutan topologis + closure)"""
+        mulai = time.perf_counter()
+        prasyarat: Dict[str, List[str]] = {}
+        nama_per_id: Dict[str, str] = {}
+        async for doc in dapatkan_collection("topik_pembelajaran").find({}, projection={"nama": 1, "prerequisite": 1}):
+            prasyarat[doc["nama"]] = list(doc.get("prerequisite") or [])
+            nama_per_id[str(doc["_id"])] = doc["nama"]
+
+        graf = GrafTopik(prasyarat)
+        if graf.siklus:
+            logger.warning(f"⚠️ Prerequisite topik membentuk siklus: {' -> '.join(graf.siklus)}")
+
+        self._prasyarat, self._nama_per_id = prasyarat, nama_per_id
+        logger.info(f"📊 Graf topik: {len(graf)} topik ({(time.perf_counter() - mulai) * 1000:.0f} ms)")
+        return graf
+
+    async def validasi(self, nama: str, prerequisite: Sequence[str], id_topik: Optional[str] = None) -> None:
+        """
+        Pastikan prerequisite baru tidak membentuk siklus
+
+        Args:
+            nama: Nama topik (baru)
+            prerequisite: Prerequisite yang akan disimpan
+            id_topik: ID topik yang diupdate (nama lamanya diganti), None untuk topik baru
+
+        Raises:
+            SiklusPrasyarat: Jika perubahan membentuk siklus
+        """
+        await self.pastikan_segar()
+        prasyarat = dict(self._prasyarat)
+        nama_lama = self._nama_per_id.get(id_topik) if id_topik else None
+        if nama_lama is not None:
+            prasyarat.pop(nama_lama, None)
+        validasi_prasyarat(prasyarat, nama, prerequisite)
+
+
+graf_topik = IndeksGrafTopik()
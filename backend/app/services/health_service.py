@@ -0,0 +1,126 @@
+"""
+Service untuk Health & Readiness Probes
+Dipakai oleh /livez, /readyz, /health dan dashboard admin (system health)
+
+Prinsip:
+- Tidak menjalankan query count yang mahal: database dicek dengan ping bertimeout
+- Status LLM diambil dari hasil panggilan terakhir (cache), tidak memanggil provider
+- Saturasi pool & lag event loop dibaca dari metrik in-process
+"""
+
+import asyncio
+import time
+from typing import Any, Dict
+
+from app.config import settings
+from app.database import dapatkan_motor_client, prisma
+from app.services.ai_service import dapatkan_info_provider
+from app.utils.observabilitas import (
+    listener_pool_motor,
+    monitor_event_loop,
+    status_llm_terakhir
+)
+
+
+async def cek_motor() -> Dict[str, Any]:
+    """
+    Ping Motor dengan timeout pendek
+
+    Returns:
+        Dict dengan status ("ok", "timeout", "gagal") dan latensi_ms
+    """
+    mulai = time.perf_counter()
+    try:
+        client = dapatkan_motor_client()
+        await asyncio.wait_for(client.admin.command("ping"), timeout=settings.health_timeout_ping)
+        return {
+            "status": "ok",
+            "latensi_ms": round((time.perf_counter() - mulai) * 1000, 2)
+        }
+    except asyncio.TimeoutError:
+        return {"status": "timeout", "latensi_ms": settings.health_timeout_ping * 1000}
+    except Exception as e:
+        return {"status": "gagal", "pesan": str(e)[:200]}
+
+
+def cek_prisma() -> Dict[str, Any]:
+    """Cek apakah Prisma client tersambung (tanpa query)"""
+    try:
+        return {"status": "ok" if prisma.is_connected() else "terputus"}
+    except Exception as e:
+        return {"status": "gagal", "pesan": str(e)[:200]}
+
+
+def cek_pool() -> Dict[str, Any]:
+    """Saturasi pool koneksi Motor (koneksi dipakai / maxPoolSize)"""
+    dipakai = listener_pool_motor.koneksi_dipakai
+    maksimal = settings.motor_max_pool_size
+    saturasi = dipakai / maksimal if maksimal > 0 else 0.0
+    return {
+        "status": "ok" if saturasi < settings.health_batas_saturasi_pool else "jenuh",
+        "koneksi_dipakai": dipakai,
+        "maks_pool": maksimal,
+        "saturasi": round(saturasi, 3)
+    }
+
+
+def cek_event_loop() -> Dict[str, Any]:
+    """Lag event loop terakhir yang diukur monitor background"""
+    lag = monitor_event_loop.lag_terakhir
+    return {
+        "status": "ok" if lag < settings.health_batas_lag_event_loop else "lambat",
+        "lag_detik": round(lag, 4)
+    }
+
+
+def cek_llm() -> Dict[str, Any]:
+    """
+    Status provider LLM dari hasil panggilan terakhir (tanpa request ke provider)
+    """
+    provider, model = dapatkan_info_provider()
+    terakhir = status_llm_terakhir.get(provider)
+
+    if not terakhir or time.time() - terakhir["waktu"] > settings.health_umur_status_llm:
+        return {"status": "tidak_diketahui", "provider": provider, "model": model}
+
+    return {
+        "status": "ok" if terakhir["berhasil"] else "gagal",
+        "provider": provider,
+        "model": terakhir["model"],
+        "durasi_detik": terakhir["durasi_detik"],
+        "detik_lalu": round(time.time() - terakhir["waktu"], 1)
+    }
+
+
+async def cek_kesiapan() -> Dict[str, Any]:
+    """
+    Readiness probe: apakah instance ini layak menerima traffic
+
+    Instance dianggap "degraded" jika Motor tidak siap, pool hampir penuh, atau
+    event loop tertahan. Prisma opsional (lihat app.database): statusnya hanya
+    dilaporkan, kecuali HEALTH_WAJIB_PRISMA=true. Status LLM juga hanya dilaporkan
+    (provider dipakai bersama oleh semua instance, jadi tidak ada gunanya
+    memindahkan traffic karenanya).
+
+    Returns:
+        Dict dengan status "siap" atau "degraded", daftar komponen wajib yang
+        tidak ok ("gagal") dan detail tiap komponen
+    """
+    komponen = {
+        "motor": await cek_motor(),
+        "prisma": cek_prisma(),
+        "pool": cek_pool(),
+        "event_loop": cek_event_loop(),
+        "llm": cek_llm()
+    }
+
+    wajib = ["motor", "pool", "event_loop"]
+    if settings.health_wajib_prisma:
+        wajib.append("prisma")
+    gagal = [nama for nama in wajib if komponen[nama]["status"] != "ok"]
+
+    return {
+        "status": "degraded" if gagal else "siap",
+        "gagal": gagal,
+        "komponen": komponen
+    }
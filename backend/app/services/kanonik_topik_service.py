@@ -0,0 +1,248 @@
+"""
+Service Kanonik Topik - petakan topik_terkait bebas dari LLM ke TopikPembelajaran.nama
+
+Tanpa kanonikalisasi, "Looping", "perulangan" dan "for loop" masing-masing membuat
+baris ProgressBelajar, entri kookurensi dan update penguasaan sendiri.
+
+- Index (app.utils.kanonik_topik) dibangun dari nama TopikPembelajaran + collection
+  "alias_topik" ({_id: alias ternormalisasi, kanonik}) dan di-cache per worker;
+  kesegaran mengikuti versi di "meta_katalog" seperti index katalog
+- Alias dipelajari dari merge admin (gabungkan_topik)
+- kanonikalisasi_ulang(): job bulk untuk data historis (submisi_error.topik_terkait
+  & progress_belajar), diikuti pembangunan ulang matriks kookurensi
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
+from pymongo import DeleteMany, UpdateOne
+
+from app.config import settings
+from app.database import dapatkan_collection
+from app.services.katalog_service import CacheBerversi
+from app.services.kookurensi_service import bangun_ulang_kookurensi
+from app.utils.kanonik_topik import IndeksKanonik, normalisasi_topik
+
+logger = logging.getLogger(__name__)
+
+ALIAS_TOPIK_COLLECTION = "alias_topik"
+NAMA_META_KANONIK = "kanonik_topik"
+
+
+class CacheKanonikTopik(CacheBerversi[IndeksKanonik]):
+    """Index kanonikalisasi topik yang di-cache per worker"""
+
+    def __init__(self) -> None:
+        super().__init__(NAMA_META_KANONIK, IndeksKanonik([], {}, settings.kanonik_topik_ambang))
+
+    async def muat_ulang(self) -> IndeksKanonik:
+        mulai = time.perf_counter()
+        nama = [
+            doc["nama"]
+            async for doc in dapatkan_collection("topik_pembelajaran").find({}, projection={"_id": 0, "nama": 1})
+        ]
+        alias = {
+            doc["_id"]: doc["kanonik"]
+            async for doc in dapatkan_collection(ALIAS_TOPIK_COLLECTION).find({})
+        }
+        logger.info(
+            f"📊 Index kanonik topik: {len(nama)} topik, {len(alias)} alias "
+            f"({(time.perf_counter() - mulai) * 1000:.0f} ms)"
+        )
+        return IndeksKanonik(nama, alias, settings.kanonik_topik_ambang)
+
+
+kanonik_topik = CacheKanonikTopik()
+
+
+def _petakan(indeks: IndeksKanonik, topik: str) -> str:
+    hasil = indeks.cocokkan(topik)
+    return hasil[0] if hasil else topik.strip()
+
+
+async def kanonikalkan_topik(topik_list: Sequence[str]) -> List[str]:
+    """
+    Petakan topik ke nama kanonik (topik tanpa padanan dipertahankan), tanpa duplikat,
+    urutan dipertahankan
+
+    Args:
+        topik_list: topik_terkait dari LLM
+
+    Returns:
+        List topik kanonik
+    """
+    indeks = await kanonik_topik.pastikan_segar()
+    return list(dict.fromkeys(t for t in (_petakan(indeks, topik) for topik in topik_list) if t))
+
+
+async def gabungkan_topik(sumber: Sequence[str], tujuan: str) -> Dict[str, Any]:
+    """
+    Merge admin: simpan variasi topik sebagai alias topik tujuan lalu
+    kanonikalkan ulang data historis untuk variasi tersebut
+
+    Args:
+        sumber: Variasi topik yang digabung
+        tujuan: Nama TopikPembelajaran tujuan
+
+    Returns:
+        Ringkasan hasil (jumlah alias, submisi & progress yang diperbarui)
+
+    Raises:
+        ValueError: Topik tujuan tidak terdaftar di TopikPembelajaran
+    """
+    if not await dapatkan_collection("topik_pembelajaran").find_one({"nama": tujuan}, projection={"_id": 1}):
+        raise ValueError("Topik tujuan tidak ditemukan")
+
+    sekarang = datetime.utcnow()
+    operasi = [
+        UpdateOne(
+            {"_id": kunci},
+            {"$set": {"kanonik": tujuan, "contoh": teks, "diperbarui": sekarang}, "$setOnInsert": {"dibuat": sekarang}},
+            upsert=True
+        )
+        for teks in sumber
+        if (kunci := normalisasi_topik(teks)) and kunci != normalisasi_topik(tujuan)
+    ]
+    if operasi:
+        await dapatkan_collection(ALIAS_TOPIK_COLLECTION).bulk_write(operasi, ordered=False)
+    await kanonik_topik.tandai_berubah()
+
+    # Variasi penulisan di data historis ("looping", "Looping ") ikut dipetakan
+    kunci_sumber = {normalisasi_topik(teks) for teks in sumber} | {normalisasi_topik(tujuan)}
+    pemetaan = {t: tujuan for t in await _topik_historis() if normalisasi_topik(t) in kunci_sumber}
+    hasil = await _terapkan_pemetaan(pemetaan)
+    if hasil["submisi_diperbarui"]:
+        await bangun_ulang_kookurensi()
+    return {"jumlah_alias": len(operasi), **hasil}
+
+
+async def _topik_historis() -> List[str]:
+    """Semua topik berbeda di submisi_error & progress_belajar"""
+    topik_submisi, topik_progress = await asyncio.gather(
+        dapatkan_collection("submisi_error").distinct("topik_terkait"),
+        dapatkan_collection("progress_belajar").distinct("topik")
+    )
+    return sorted({t for t in topik_submisi + topik_progress if isinstance(t, str)})
+
+
+def _gabung_state_progress(dokumen: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Gabungkan beberapa progress (mahasiswa sama, topik jadi sama) menjadi satu.
+    P(menguasai) dirata-rata berbobot jumlah observasi (pendekatan; refit BKT
+    berikutnya menghitung ulang dari riwayat yang sudah kanonik).
+    """
+    bobot = [max(doc.get("jumlah_observasi") or 0, 1) for doc in dokumen]
+    p_list = [
+        doc["probabilitas_menguasai"] if doc.get("probabilitas_menguasai") is not None
+        else (doc.get("tingkat_penguasaan") or 0) / 100
+        for doc in dokumen
+    ]
+    p = sum(b * x for b, x in zip(bobot, p_list)) / sum(bobot)
+    tanggal_error = [doc["tanggal_error_terakhir"] for doc in dokumen if doc.get("tanggal_error_terakhir")]
+    return {
+        "probabilitas_menguasai": p,
+        "tingkat_penguasaan": round(p * 100),
+        "jumlah_observasi": sum(doc.get("jumlah_observasi") or 0 for doc in dokumen),
+        "jumlah_error_di_topik": sum(doc.get("jumlah_error_di_topik") or 0 for doc in dokumen),
+        "tanggal_error_terakhir": max(tanggal_error) if tanggal_error else None,
+        "updated_at": datetime.utcnow()
+    }
+
+
+async def _terapkan_pemetaan(pemetaan: Dict[str, str]) -> Dict[str, int]:
+    """Ganti topik lama -> kanonik di submisi_error & gabungkan progress_belajar"""
+    pemetaan = {lama: baru for lama, baru in pemetaan.items() if lama != baru}
+    if not pemetaan:
+        return {"submisi_diperbarui": 0, "progress_digabung": 0}
+
+    # 1. submisi_error: ganti elemen array & buang duplikat, urutan dipertahankan
+    submisi = dapatkan_collection("submisi_error")
+    submisi_diperbarui = 0
+    for lama, baru in pemetaan.items():
+        hasil = await submisi.update_many(
+            {"topik_terkait": lama},
+            [{"$set": {"topik_terkait": {"$reduce": {
+                "input": {"$map": {
+                    "input": "$topik_terkait",
+                    "as": "t",
+                    "in": {"$cond": [{"$eq": ["$$t", lama]}, baru, "$$t"]}
+                }},
+                "initialValue": [],
+                "in": {"$cond": [
+                    {"$in": ["$$this", "$$value"]},
+                    "$$value",
+                    {"$concatArrays": ["$$value", ["$$this"]]}
+                ]}
+            }}}}]
+        )
+        submisi_diperbarui += hasil.modified_count
+
+    # 2. progress_belajar: satu dokumen per (mahasiswa, topik kanonik)
+    progress = dapatkan_collection("progress_belajar")
+    per_kunci: Dict[Tuple[Any, str], List[Dict[str, Any]]] = {}
+    async for doc in progress.find({"topik": {"$in": list(pemetaan)}}):
+        per_kunci.setdefault((doc["id_mahasiswa"], pemetaan[doc["topik"]]), []).append(doc)
+
+    operasi: List[Any] = []
+    id_dihapus: List[Any] = []
+    for (id_mahasiswa, kanonik), dokumen in per_kunci.items():
+        existing = await progress.find_one({"id_mahasiswa": id_mahasiswa, "topik": kanonik})
+        if existing:
+            dokumen = dokumen + [existing]
+        operasi.append(UpdateOne(
+            {"id_mahasiswa": id_mahasiswa, "topik": kanonik},
+            {
+                "$set": _gabung_state_progress(dokumen),
+                "$setOnInsert": {"created_at": min(doc.get("created_at") or datetime.utcnow() for doc in dokumen)}
+            },
+            upsert=True
+        ))
+        id_dihapus.extend(doc["_id"] for doc in dokumen if doc["topik"] != kanonik)
+    if operasi:
+        # Upsert kanonik dulu baru hapus variasi (ordered) agar tidak ada progress yang hilang
+        await progress.bulk_write(operasi + [DeleteMany({"_id": {"$in": id_dihapus}})], ordered=True)
+
+    return {"submisi_diperbarui": submisi_diperbarui, "progress_digabung": len(id_dihapus)}
+
+
+async def kanonikalisasi_ulang() -> Dict[str, int]:
+    """
+    Job bulk: kanonikalkan ulang semua topik historis dengan index terbaru
+
+    Returns:
+        Ringkasan (topik dipetakan, submisi diperbarui, progress digabung)
+    """
+    mulai = time.perf_counter()
+    indeks = await kanonik_topik.pastikan_segar()
+    pemetaan: Dict[str, str] = {}
+    for topik in await _topik_historis():
+        kanonik = _petakan(indeks, topik)
+        if kanonik and kanonik != topik:
+            pemetaan[topik] = kanonik
+
+    hasil = await _terapkan_pemetaan(pemetaan)
+    if pemetaan:
+        await bangun_ulang_kookurensi()
+
+    logger.info(
+        f"✅ Kanonikalisasi topik: {len(pemetaan)} topik dipetakan, {hasil['submisi_diperbarui']} submisi, "
+        f"{hasil['progress_digabung']} progress digabung dalam {time.perf_counter() - mulai:.1f}s"
+    )
+    return {"topik_dipetakan": len(pemetaan), **hasil}
+
+
+if __name__ == "__main__":
+    # Kanonikalisasi manual: python -m app.services.kanonik_topik_service (dari direktori backend/)
+    from app.database import putuskan_database, sambungkan_database
+
+    async def _main() -> None:
+        await sambungkan_database()
+        try:
+            print(f"✅ {await kanonikalisasi_ulang()}")
+        finally:
+            await putuskan_database()
+
+    asyncio.run(_main())
@@ -0,0 +1,273 @@
+"""
+Service Katalog - inverted index in-memory untuk sumber daya & exercise
+
+Katalog jarang berubah tapi dibaca di setiap dashboard/rekomendasi, jadi seluruh
+katalog dimuat sekali ke memori dan diindeks: topik -> tingkat kesulitan -> item
+(terurut terbaru dulu). Rekomendasi menjadi ranked merge in-process tanpa query.
+
+Kesegaran index:
+- Admin create/update memanggil tandai_berubah() -> versi di collection
+  "meta_katalog" dinaikkan dan index di worker ini dimuat ulang
+- Worker lain mengecek versi tersebut paling sering setiap KATALOG_INTERVAL_CEK detik
+- Mekanisme ini (CacheBerversi) juga dipakai cache lain per worker: graf topik,
+  index kanonik topik dan pohon template error
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, TypeVar
+
+from pymongo import ReturnDocument
+
+from app.config import settings
+from app.database import dapatkan_collection
+
+logger = logging.getLogger(__name__)
+
+META_KATALOG_COLLECTION = "meta_katalog"
+
+T = TypeVar("T")
+
+def _dokumen_ke_sumber_daya(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(doc["_id"]),
+        "judul": doc.get("judul"),
+        "deskripsi": doc.get("deskripsi"),
+        "tipe": doc.get("tipe"),
+        "url": doc.get("url"),
+        "konten": doc.get("konten"),
+        "topik_terkait": doc.get("topik_terkait", []),
+        "tingkat_kesulitan": doc.get("tingkat_kesulitan", "pemula"),
+        "durasi": doc.get("durasi"),
+        "dibuat": doc.get("dibuat"),
+        "diperbarui": doc.get("diperbarui")
+    }
+
+
+def _dokumen_ke_exercise(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(doc["_id"]),
+        "judul": doc.get("judul"),
+        "deskripsi": doc.get("deskripsi"),
+        "topik": doc.get("topik"),
+        "tingkat_kesulitan": doc.get("tingkat_kesulitan", "pemula"),
+        "instruksi": doc.get("instruksi"),
+        "kode_pemula": doc.get("kode_pemula"),
+        "solusi_referensi": doc.get("solusi_referensi"),
+        "test_cases": doc.get("test_cases", []),
+        "poin_belajar": doc.get("poin_belajar", []),
+        "estimasi_waktu": doc.get("estimasi_waktu"),
+        "dibuat": doc.get("dibuat"),
+        "diperbarui": doc.get("diperbarui")
+    }
+
+
+class CacheBerversi(Generic[T]):
+    """
+    Basis cache per worker yang kesegarannya mengikuti versi dokumen di meta_katalog
+
+    Subclass cukup mengimplementasikan muat_ulang(): bangun data dari database lalu
+    kembalikan nilai yang di-cache (disimpan di self.nilai).
+    """
+
+    def __init__(self, nama: str, nilai_awal: T):
+        self.nama = nama
+        self.nilai = nilai_awal
+        self._versi = -1
+        self._dimuat = False
+        self._cek_terakhir = 0.0
+        self._kunci = asyncio.Lock()
+
+    async def muat_ulang(self) -> T:
+        raise NotImplementedError
+
+    async def _baca_versi(self) -> int:
+        meta = await dapatkan_collection(META_KATALOG_COLLECTION).find_one({"_id": self.nama})
+        return int(meta.get("versi", 0)) if meta else 0
+
+    async def _segarkan(self) -> None:
+        # Versi dibaca sebelum memuat: perubahan selama memuat tetap terdeteksi di cek berikutnya
+        versi = await self._baca_versi()
+        self.nilai = await self.muat_ulang()
+        self._versi = versi
+        self._dimuat = True
+        self._cek_terakhir = time.monotonic()
+
+    def _masih_segar(self) -> bool:
+        return self._dimuat and time.monotonic() - self._cek_terakhir < settings.katalog_interval_cek
+
+    async def pastikan_segar(self) -> T:
+        """
+        Muat cache jika belum ada, atau muat ulang jika versi di meta_katalog berubah.
+        Versi hanya dicek setiap KATALOG_INTERVAL_CEK detik.
+        """
+        if self._masih_segar():
+            return self.nilai
+
+        async with self._kunci:
+            if self._masih_segar():
+                return self.nilai
+            if not self._dimuat or await self._baca_versi() != self._versi:
+                await self._segarkan()
+            else:
+                self._cek_terakhir = time.monotonic()
+        return self.nilai
+
+    async def tandai_berubah(self) -> None:
+        """
+        Panggil setelah data sumber berubah: naikkan versi (agar worker lain memuat
+        ulang) lalu muat ulang cache di worker ini
+        """
+        try:
+            await dapatkan_collection(META_KATALOG_COLLECTION).update_one(
+                {"_id": self.nama},
+                {"$inc": {"versi": 1}, "$set": {"diperbarui": datetime.utcnow()}},
+                upsert=True
+            )
+            async with self._kunci:
+                await self._segarkan()
+        except Exception as e:
+            logger.warning(f"⚠️ Gagal memperbarui cache {self.nama}: {e}")
+
+    async def naikkan_versi(self) -> None:
+        """
+        Naikkan versi tanpa memuat ulang, untuk cache yang sudah diubah langsung di
+        memori oleh worker ini
+        """
+        meta = await dapatkan_collection(META_KATALOG_COLLECTION).find_one_and_update(
+            {"_id": self.nama},
+            {"$inc": {"versi": 1}, "$set": {"diperbarui": datetime.utcnow()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        # Hanya perubahan sendiri sejak versi terakhir -> cache lokal sudah terbaru
+        if meta and meta["versi"] == self._versi + 1:
+            self._versi = meta["versi"]
+
+
+class IndeksKatalog(CacheBerversi[None]):
+    """
+    Inverted index topik -> {tingkat_kesulitan -> [id item, terbaru dulu]}
+    """
+
+    def __init__(
+        self,
+        nama: str,
+        nama_collection: str,
+        ambil_topik: Callable[[Dict[str, Any]], Sequence[str]],
+        konversi: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ):
+        super().__init__(nama, None)
+        self._nama_collection = nama_collection
+        self._ambil_topik = ambil_topik
+        self._konversi = konversi
+
+        self._item: Dict[str, Dict[str, Any]] = {}
+        self._urutan: Dict[str, int] = {}  # id -> peringkat terbaru (0 = paling baru)
+        self._per_topik: Dict[str, Dict[str, List[str]]] = {}
+        self._per_kesulitan: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._item)
+
+    async def muat_ulang(self) -> None:
+        """Muat seluruh katalog dari database dan bangun ulang index"""
+        mulai = time.perf_counter()
+
+        cursor = dapatkan_collection(self._nama_collection).find({}).sort("dibuat", -1)
+        item: Dict[str, Dict[str, Any]] = {}
+        urutan: Dict[str, int] = {}
+        per_topik: Dict[str, Dict[str, List[str]]] = {}
+        per_kesulitan: Dict[str, List[str]] = {}
+
+        async for doc in cursor:
+            data = self._konversi(doc)
+            id_item = data["id"]
+            kesulitan = data["tingkat_kesulitan"]
+            item[id_item] = data
+            urutan[id_item] = len(urutan)
+            per_kesulitan.setdefault(kesulitan, []).append(id_item)
+            for topik in set(self._ambil_topik(data)):
+                per_topik.setdefault(topik, {}).setdefault(kesulitan, []).append(id_item)
+
+        # Tukar sekaligus agar pembaca tidak pernah melihat index setengah jadi
+        self._item, self._urutan = item, urutan
+        self._per_topik, self._per_kesulitan = per_topik, per_kesulitan
+
+        logger.info(
+            f"📊 Index katalog {self.nama}: {len(item)} item, {len(per_topik)} topik "
+            f"({(time.perf_counter() - mulai) * 1000:.0f} ms)"
+        )
+
+    def cari(
+        self,
+        topik_list: Sequence[str],
+        limit: int,
+        kesulitan: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranked merge item untuk daftar topik (tanpa query database)
+
+        Urutan: item yang cocok dengan lebih banyak topik dulu, lalu yang cocok dengan
+        topik di urutan lebih awal (topik_list diurutkan dari yang paling prioritas),
+        lalu yang paling baru.
+
+        Args:
+            topik_list: Topik yang dicari, urut prioritas
+            limit: Maksimal item
+            kesulitan: Filter tingkat kesulitan (None = semua)
+
+        Returns:
+            List item (salinan dict)
+        """
+        jumlah_cocok: Dict[str, int] = {}
+        peringkat_topik: Dict[str, int] = {}
+
+        for posisi, topik in enumerate(topik_list):
+            per_kesulitan = self._per_topik.get(topik)
+            if not per_kesulitan:
+                continue
+            bucket = per_kesulitan.values() if kesulitan is None else (per_kesulitan.get(t, ()) for t in kesulitan)
+            for ids in bucket:
+                for id_item in ids:
+                    jumlah_cocok[id_item] = jumlah_cocok.get(id_item, 0) + 1
+                    peringkat_topik.setdefault(id_item, posisi)
+
+        terpilih = heapq.nsmallest(
+            limit,
+            jumlah_cocok,
+            key=lambda id_item: (-jumlah_cocok[id_item], peringkat_topik[id_item], self._urutan[id_item])
+        )
+        return [dict(self._item[id_item]) for id_item in terpilih]
+
+    def semua(self) -> List[Dict[str, Any]]:
+        """Semua item (terbaru dulu), tanpa salinan - jangan dimodifikasi"""
+        return [self._item[id_item] for id_item in sorted(self._urutan, key=self._urutan.__getitem__)]
+
+    def ambil(self, id_list: Sequence[str]) -> List[Dict[str, Any]]:
+        """Ambil item berdasarkan ID sesuai urutan input (ID yang sudah tidak ada dilewati)"""
+        return [dict(self._item[id_item]) for id_item in id_list if id_item in self._item]
+
+    def terbaru(self, limit: int, kesulitan: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Item terbaru (opsional per tingkat kesulitan), untuk fallback tanpa topik"""
+        if kesulitan is None:
+            terpilih = sorted(self._urutan, key=self._urutan.__getitem__)[:limit]
+        else:
+            gabungan = (id_item for tingkat in kesulitan for id_item in self._per_kesulitan.get(tingkat, ()))
+            terpilih = heapq.nsmallest(limit, gabungan, key=self._urutan.__getitem__)
+        return [dict(self._item[id_item]) for id_item in terpilih]
+
+
+indeks_sumber_daya = IndeksKatalog(
+    "sumber_daya", "sumber_daya",
+    lambda item: item["topik_terkait"] or [],
+    _dokumen_ke_sumber_daya
+)
+indeks_exercise = IndeksKatalog(
+    "exercises", "exercises",
+    lambda item: [item["topik"]] if item["topik"] else [],
+    _dokumen_ke_exercise
+)
@@ -0,0 +1,196 @@
+"""
+Service Kookurensi Topik - matriks sparse topik yang sering muncul bersama pada satu SubmisiError
+
+Disimpan di collection "kookurensi_topik", satu dokumen per sel tidak-nol:
+{_id, topik, pasangan, jumlah}. Matriks disimpan simetris (a,b) & (b,a) agar
+top-k untuk satu topik cukup satu query ber-index (topik, jumlah); diagonal
+(topik == pasangan) = jumlah submisi yang memuat topik tersebut.
+
+- catat_kookurensi(): update incremental saat submisi error baru tersimpan
+  ($inc + upsert untuk setiap pasangan topik submisi, satu bulk_write)
+- bangun_ulang_kookurensi(): hitung ulang penuh di MongoDB ($unwind x2 + $group),
+  untuk data lama / koreksi drift
+- export_npz(): matriks COO (topik, baris, kolom, jumlah) untuk analisis offline
+"""
+
+import asyncio
+import io
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from pymongo import ReplaceOne, UpdateOne
+
+from app.database import dapatkan_collection
+
+logger = logging.getLogger(__name__)
+
+KOOKURENSI_COLLECTION = "kookurensi_topik"
+
+_PEMISAH_KUNCI = "\u001f"
+
+_index_dibuat = False
+
+
+def _kunci(topik: str, pasangan: str) -> str:
+    return f"{topik}{_PEMISAH_KUNCI}{pasangan}"
+
+
+async def _pastikan_index() -> None:
+    global _index_dibuat
+    if not _index_dibuat:
+        await dapatkan_collection(KOOKURENSI_COLLECTION).create_index([("topik", 1), ("jumlah", -1)])
+        _index_dibuat = True
+
+
+async def catat_kookurensi(topik_terkait: Sequence[str]) -> None:
+    """
+    Tambahkan satu submisi ke matriks kookurensi
+
+    Args:
+        topik_terkait: topik_terkait submisi error (duplikat diabaikan)
+    """
+    topik_unik = sorted({t for t in topik_terkait if t})
+    if not topik_unik:
+        return
+    await _pastikan_index()
+    sekarang = datetime.utcnow()
+    operasi = [
+        UpdateOne(
+            {"_id": _kunci(a, b)},
+            {"$inc": {"jumlah": 1}, "$setOnInsert": {"topik": a, "pasangan": b, "dibangun": sekarang}},
+            upsert=True
+        )
+        for a in topik_unik for b in topik_unik
+    ]
+    await dapatkan_collection(KOOKURENSI_COLLECTION).bulk_write(operasi, ordered=False)
+
+
+async def dapatkan_topik_bersamaan(topik: str, k: int) -> Dict[str, Any]:
+    """
+    Top-k topik yang paling sering muncul bersama topik tertentu
+
+    Args:
+        topik: Topik acuan
+        k: Jumlah pasangan
+
+    Returns:
+        Dict jumlah submisi topik + list pasangan (jumlah bersama, P(pasangan | topik), Jaccard)
+
+    Raises:
+        ValueError: Topik belum pernah muncul di submisi error
+    """
+    collection = dapatkan_collection(KOOKURENSI_COLLECTION)
+    diagonal = await collection.find_one({"_id": _kunci(topik, topik)})
+    if not diagonal:
+        raise ValueError("Topik belum pernah muncul di submisi error")
+
+    pasangan = await collection.find(
+        {"topik": topik, "pasangan": {"$ne": topik}}
+    ).sort("jumlah", -1).limit(k).to_list(length=k)
+    total_pasangan = {
+        doc["topik"]: doc["jumlah"]
+        async for doc in collection.find({"_id": {"$in": [_kunci(p["pasangan"], p["pasangan"]) for p in pasangan]}})
+    }
+
+    jumlah_topik = diagonal["jumlah"]
+    return {
+        "topik": topik,
+        "jumlah_submisi": jumlah_topik,
+        "pasangan": [
+            {
+                "topik": p["pasangan"],
+                "jumlah_bersama": p["jumlah"],
+                "probabilitas_bersyarat": round(p["jumlah"] / jumlah_topik, 4),
+                "jaccard": round(p["jumlah"] / max(jumlah_topik + total_pasangan.get(p["pasangan"], 0) - p["jumlah"], 1), 4)
+            }
+            for p in pasangan
+        ]
+    }
+
+
+async def ambil_topik_bersamaan_batch(topik_list: Sequence[str], k: int) -> Dict[str, List[Tuple[str, int]]]:
+    """Top-k pasangan untuk banyak topik sekaligus (satu query), dipakai rekomendasi kurikulum"""
+    if not topik_list:
+        return {}
+    hasil: Dict[str, List[Tuple[str, int]]] = {t: [] for t in topik_list}
+    cursor = dapatkan_collection(KOOKURENSI_COLLECTION).find(
+        {"topik": {"$in": list(topik_list)}},
+        projection={"_id": 0, "topik": 1, "pasangan": 1, "jumlah": 1}
+    ).sort("jumlah", -1)
+    async for doc in cursor:
+        daftar = hasil[doc["topik"]]
+        if doc["pasangan"] != doc["topik"] and len(daftar) < k:
+            daftar.append((doc["pasangan"], doc["jumlah"]))
+    return hasil
+
+
+async def bangun_ulang_kookurensi() -> int:
+    """
+    Hitung ulang seluruh matriks dari submisi_error (agregasi di MongoDB)
+
+    Catatan: submisi yang masuk selama pembangunan ulang bisa terhitung ganda /
+    terlewat; jalankan saat trafik rendah.
+
+    Returns:
+        Jumlah sel tidak-nol
+    """
+    mulai = time.perf_counter()
+    await _pastikan_index()
+    pipeline = [
+        {"$match": {"topik_terkait.0": {"$exists": True}}},
+        {"$project": {"_id": 0, "topik": {"$setUnion": ["$topik_terkait", []]}}},
+        {"$project": {"topik": 1, "pasangan": "$topik"}},
+        {"$unwind": "$topik"},
+        {"$unwind": "$pasangan"},
+        {"$group": {"_id": {"topik": "$topik", "pasangan": "$pasangan"}, "jumlah": {"$sum": 1}}},
+    ]
+    collection = dapatkan_collection(KOOKURENSI_COLLECTION)
+    sekarang = datetime.utcnow()
+    operasi: List[ReplaceOne] = []
+    total = 0
+    async for doc in dapatkan_collection("submisi_error").aggregate(pipeline, allowDiskUse=True):
+        a, b = doc["_id"]["topik"], doc["_id"]["pasangan"]
+        operasi.append(ReplaceOne(
+            {"_id": _kunci(a, b)},
+            {"topik": a, "pasangan": b, "jumlah": doc["jumlah"], "dibangun": sekarang},
+            upsert=True
+        ))
+        if len(operasi) >= 1000:
+            await collection.bulk_write(operasi, ordered=False)
+            total += len(operasi)
+            operasi = []
+    if operasi:
+        await collection.bulk_write(operasi, ordered=False)
+        total += len(operasi)
+    # Sel yang tidak lagi muncul
+    await collection.delete_many({"dibangun": {"$lt": sekarang}})
+
+    logger.info(f"📊 Kookurensi topik: {total} sel dibangun ulang dalam {time.perf_counter() - mulai:.1f}s")
+    return total
+
+
+async def export_npz() -> bytes:
+    """
+    Export matriks kookurensi sebagai file .npz (np.load):
+    topik (nama, indeks = baris/kolom), baris, kolom, jumlah (format COO simetris,
+    bisa langsung dipakai scipy.sparse.coo_matrix((jumlah, (baris, kolom))))
+    """
+    cursor = dapatkan_collection(KOOKURENSI_COLLECTION).find(
+        {}, projection={"_id": 0, "topik": 1, "pasangan": 1, "jumlah": 1}
+    )
+    sel = [(doc["topik"], doc["pasangan"], doc["jumlah"]) async for doc in cursor]
+
+    def _bangun() -> bytes:
+        topik = np.array(sorted({t for a, b, _ in sel for t in (a, b)}), dtype=str)
+        indeks = {t: i for i, t in enumerate(topik.tolist())}
+        baris = np.fromiter((indeks[a] for a, _, _ in sel), dtype=np.int32, count=len(sel))
+        kolom = np.fromiter((indeks[b] for _, b, _ in sel), dtype=np.int32, count=len(sel))
+        jumlah = np.fromiter((n for _, _, n in sel), dtype=np.int64, count=len(sel))
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, topik=topik, baris=baris, kolom=kolom, jumlah=jumlah)
+        return buffer.getvalue()
+
+    return await asyncio.to_thread(_bangun)
@@ -3,48 +3,139 @@ Service untuk Mahasiswa Features
 Dashboard, Learning Resources, Export
 """
 
-from app.database import prisma
+from app.database import prisma, dapatkan_collection
 from app.models.schemas import (
     ResponseDashboardMahasiswa,
     AktivitasItem,
     ResponseSumberDaya
 )
-from typing import List, Dict, Any, Optional
+from app.repositories.analitik_repository import agregasi_facet, ambil_count, ke_object_id
+from app.repositories.dashboard_repository import (
+    JUMLAH_AKTIVITAS,
+    ambil_snapshot,
+    catat_analisis_baru,
+    perbarui_ringkasan_progress,
+    simpan_snapshot,
+    tandai_basi
+)
+from app.services.katalog_service import indeks_sumber_daya
+from app.services.rekomendasi_service import ambil_rekomendasi_tersimpan
+from app.utils.csv_stream import stream_csv
+from typing import AsyncIterator, List, Dict, Any, Optional
 from datetime import datetime, timedelta
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _awal_minggu_ini() -> datetime:
+    """Senin 00:00 minggu berjalan (batas hitungan error_minggu_ini)"""
+    awal_minggu = datetime.now() - timedelta(days=datetime.now().weekday())
+    return awal_minggu.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _item_aktivitas(tipe_error: Optional[str], waktu: datetime) -> Dict[str, Any]:
+    """Bentuk item aktivitas terbaru yang disimpan di snapshot"""
+    return {
+        "tipe": "analisis_error",
+        "deskripsi": f"Analisis error: {tipe_error or 'Unknown'}",
+        "waktu": waktu
+    }
+
+
+async def _hitung_ringkasan_progress(id_mahasiswa: str) -> Dict[str, Any]:
+    """
+    Hitung field dashboard yang berasal dari progress_belajar & pola_error
+    ($facet progress + count pola, berjalan bersamaan)
+    """
+    filter_mahasiswa = {"id_mahasiswa": ke_object_id(id_mahasiswa)}
+    facet_progress, total_pola_unik = await asyncio.gather(
+        agregasi_facet("progress_belajar", filter_mahasiswa, {
+            "ringkasan": [
+                {"$group": {
+                    "_id": None,
+                    "rata_rata": {"$avg": "$tingkat_penguasaan"},
+                    "dikuasai": {"$sum": {"$cond": [{"$gte": ["$tingkat_penguasaan", 70]}, 1, 0]}}
+                }}
+            ],
+            "lemah": [
+                {"$match": {"tingkat_penguasaan": {"$lt": 50}}},
+                {"$sort": {"tingkat_penguasaan": 1}},
+                {"$limit": 3},
+                {"$project": {"_id": 0, "topik": 1}}
+            ]
+        }),
+        dapatkan_collection("pola_error").count_documents(filter_mahasiswa)
+    )
+
+    ringkasan = facet_progress["ringkasan"][0] if facet_progress["ringkasan"] else {}
+    return {
+        "total_pola_unik": total_pola_unik,
+        "rata_rata_penguasaan": float(ringkasan.get("rata_rata") or 0.0),
+        "topik_dikuasai": int(ringkasan.get("dikuasai", 0)),
+        "topik_rekomendasi": [p["topik"] for p in facet_progress["lemah"]]
+    }
+
+
+async def _bangun_snapshot_dashboard(id_mahasiswa: str, awal_minggu: datetime) -> Dict[str, Any]:
+    """
+    Hitung ulang seluruh isi dashboard dari data mentah:
+    satu $facet submisi_error + ringkasan progress, berjalan bersamaan
+    """
+    facet_submisi, ringkasan_progress = await asyncio.gather(
+        agregasi_facet("submisi_error", {"id_mahasiswa": ke_object_id(id_mahasiswa)}, {
+            "total": [{"$count": "jumlah"}],
+            "minggu_ini": [
+                {"$match": {"created_at": {"$gte": awal_minggu}}},
+                {"$count": "jumlah"}
+            ],
+            "terbaru": [
+                {"$sort": {"created_at": -1}},
+                {"$limit": JUMLAH_AKTIVITAS},
+                {"$project": {"_id": 0, "tipe_error": 1, "created_at": 1}}
+            ]
+        }),
+        _hitung_ringkasan_progress(id_mahasiswa)
+    )
+
+    return {
+        "awal_minggu": awal_minggu,
+        "total_error": ambil_count(facet_submisi["total"]),
+        "error_minggu_ini": ambil_count(facet_submisi["minggu_ini"]),
+        "aktivitas_terbaru": [
+            _item_aktivitas(s.get("tipe_error"), s["created_at"])
+            for s in facet_submisi["terbaru"]
+        ],
+        **ringkasan_progress
+    }
 
 
 async def dapatkan_dashboard_mahasiswa(id_mahasiswa: str) -> ResponseDashboardMahasiswa:
     """
     Dapatkan statistik dashboard untuk mahasiswa
     
+    Dibaca dari snapshot (satu find_one). Snapshot dibangun ulang dengan agregasi
+    $facet jika belum ada, ditandai basi, atau sudah berganti minggu.
+    
     Args:
         id_mahasiswa: ID mahasiswa
     
     Returns:
         ResponseDashboardMahasiswa dengan semua metrics
     """
+    awal_minggu = _awal_minggu_ini()
+    snapshot = await ambil_snapshot(id_mahasiswa)
     
-    # 1. Total error
-    total_error = await prisma.submisierror.count(
-        where={"idMahasiswa": id_mahasiswa}
-    )
-    
-    # 2. Total pola unik
-    total_pola_unik = await prisma.polaerror.count(
-        where={"idMahasiswa": id_mahasiswa}
-    )
-    
-    # 3. Rata-rata penguasaan
-    progress_list = await prisma.progressbelajar.find_many(
-        where={"idMahasiswa": id_mahasiswa}
-    )
-    
-    if progress_list:
-        rata_rata_penguasaan = sum(p.tingkatPenguasaan for p in progress_list) / len(progress_list)
+    if snapshot is None or snapshot.get("basi", True) or snapshot.get("awal_minggu") != awal_minggu:
+        data = await _bangun_snapshot_dashboard(id_mahasiswa, awal_minggu)
+        await simpan_snapshot(id_mahasiswa, data, snapshot.get("versi") if snapshot else None)
     else:
-        rata_rata_penguasaan = 0.0
+        data = snapshot
+    
+    rata_rata_penguasaan = data["rata_rata_penguasaan"]
     
-    # 4. Tren perbaikan
+    # Tren perbaikan
     if rata_rata_penguasaan > 70:
         tren = "membaik"
     elif rata_rata_penguasaan < 40:
@@ -52,71 +143,66 @@ async def dapatkan_dashboard_mahasiswa(id_mahasiswa: str) -> ResponseDashboardMa
     else:
         tren = "stabil"
     
-    # 5. Error minggu ini
-    awal_minggu = datetime.now() - timedelta(days=datetime.now().weekday())
-    awal_minggu = awal_minggu.replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    error_minggu_ini = await prisma.submisierror.count(
-        where={
-            "idMahasiswa": id_mahasiswa,
-            "createdAt": {"gte": awal_minggu}
-        }
-    )
-    
-    # 6. Topik dikuasai (penguasaan > 70)
-    topik_dikuasai = await prisma.progressbelajar.count(
-        where={
-            "idMahasiswa": id_mahasiswa,
-            "tingkatPenguasaan": {"gte": 70}
-        }
-    )
-    
-    # 7. Aktivitas terbaru (5 terakhir)
-    submisi_terbaru = await prisma.submisierror.find_many(
-        where={"idMahasiswa": id_mahasiswa},
-        order={"createdAt": "desc"},
-        take=5
-    )
-    
-    aktivitas_terbaru = []
-    for submisi in submisi_terbaru:
-        aktivitas_terbaru.append(
-            AktivitasItem(
-                tipe="analisis_error",
-                deskripsi=f"Analisis error: {submisi.tipeError or 'Unknown'}",
-                waktu=submisi.createdAt
-            )
-        )
-    
-    # 8. Topik rekomendasi (topik dengan penguasaan rendah)
-    topik_lemah = await prisma.progressbelajar.find_many(
-        where={
-            "idMahasiswa": id_mahasiswa,
-            "tingkatPenguasaan": {"lt": 50}
-        },
-        order={"tingkatPenguasaan": "asc"},
-        take=3
-    )
-    
-    topik_rekomendasi = [p.topik for p in topik_lemah]
-    
     return ResponseDashboardMahasiswa(
-        total_error=total_error,
-        total_pola_unik=total_pola_unik,
+        total_error=data["total_error"],
+        total_pola_unik=data["total_pola_unik"],
         rata_rata_penguasaan=rata_rata_penguasaan,
         tren_perbaikan=tren,
-        error_minggu_ini=error_minggu_ini,
-        topik_dikuasai=topik_dikuasai,
-        aktivitas_terbaru=aktivitas_terbaru,
-        topik_rekomendasi=topik_rekomendasi
+        error_minggu_ini=data["error_minggu_ini"],
+        topik_dikuasai=data["topik_dikuasai"],
+        aktivitas_terbaru=[AktivitasItem(**item) for item in data["aktivitas_terbaru"]],
+        topik_rekomendasi=data["topik_rekomendasi"]
     )
 
 
+async def perbarui_dashboard_setelah_analisis(
+    id_mahasiswa: str,
+    tipe_error: Optional[str],
+    waktu: datetime,
+    progress_berubah: bool = False
+) -> None:
+    """
+    Update snapshot dashboard secara incremental setelah analisis tersimpan
+    
+    Args:
+        id_mahasiswa: ID mahasiswa
+        tipe_error: Tipe error hasil analisis
+        waktu: createdAt submisi error
+        progress_berubah: True jika progress_belajar/pola_error ikut diperbarui
+    """
+    try:
+        await catat_analisis_baru(id_mahasiswa, _item_aktivitas(tipe_error, waktu), _awal_minggu_ini())
+        if progress_berubah:
+            await perbarui_ringkasan_progress(id_mahasiswa, await _hitung_ringkasan_progress(id_mahasiswa))
+    except Exception as e:
+        # Snapshot gagal di-update: tandai basi agar tidak menyajikan data lama
+        logger.warning(f"⚠️ Update snapshot dashboard gagal: {e}")
+        try:
+            await tandai_basi(id_mahasiswa)
+        except Exception:
+            pass
+
+
+async def perbarui_dashboard_setelah_progress(id_mahasiswa: str) -> None:
+    """Hitung ulang ringkasan progress di snapshot dashboard (mis. setelah submisi exercise)"""
+    try:
+        await perbarui_ringkasan_progress(id_mahasiswa, await _hitung_ringkasan_progress(id_mahasiswa))
+    except Exception as e:
+        logger.warning(f"⚠️ Update snapshot dashboard gagal: {e}")
+        try:
+            await tandai_basi(id_mahasiswa)
+        except Exception:
+            pass
+
+
 async def dapatkan_sumber_daya_rekomendasi(id_mahasiswa: str, limit: int = 10) -> List[ResponseSumberDaya]:
     """
     Dapatkan sumber daya pembelajaran yang direkomendasikan untuk mahasiswa
     berdasarkan topik yang lemah
     
+    Dibaca dari ranking hasil batch rekomendasi; jika belum ada, katalog dibaca dari
+    index in-memory (tanpa query sumber_daya) dengan topik terlemah diprioritaskan.
+    
     Args:
         id_mahasiswa: ID mahasiswa
         limit: Maksimal jumlah sumber daya
@@ -125,117 +211,109 @@ async def dapatkan_sumber_daya_rekomendasi(id_mahasiswa: str, limit: int = 10) -
         List sumber daya yang direkomendasikan
     """
     
-    # Ambil topik-topik lemah mahasiswa
+    # Ranking hasil batch (satu find_one); fallback ke topik lemah jika belum dihitung
+    tersimpan = await ambil_rekomendasi_tersimpan(id_mahasiswa, indeks_sumber_daya, "sumber_daya", limit)
+    if tersimpan:
+        return [ResponseSumberDaya(**sd) for sd in tersimpan]
+    
+    # Ambil topik-topik lemah mahasiswa (terlemah dulu)
     topik_lemah = await prisma.progressbelajar.find_many(
         where={
             "idMahasiswa": id_mahasiswa,
             "tingkatPenguasaan": {"lt": 70}
         },
+        order={"tingkatPenguasaan": "asc"},
         take=1000  # Ambil semua topik lemah
     )
     
     topik_list = [t.topik for t in topik_lemah]
     
-    # Jika tidak ada topik lemah, ambil semua sumber daya untuk pemula
-    from typing import Any, cast
+    await indeks_sumber_daya.pastikan_segar()
     
+    # Jika tidak ada topik lemah, ambil semua sumber daya untuk pemula
     if not topik_list:
-        sumber_daya_list = await prisma.sumberdaya.find_many(
-            where=cast(Any, {"tingkatKesulitan": "pemula"}),
-            take=limit,
-            order={"dibuat": "desc"}
-        )
+        sumber_daya_list = indeks_sumber_daya.terbaru(limit, kesulitan=["pemula"])
     else:
         # Ambil sumber daya yang topiknya sesuai
-        sumber_daya_list = await prisma.sumberdaya.find_many(
-            where=cast(Any, {
-                "topikTerkait": {"hasSome": topik_list}
-            }),
-            take=limit,
-            order={"dibuat": "desc"}
-        )
-    
-    return [
-        ResponseSumberDaya(
-            id=sd.id,
-            judul=sd.judul,
-            deskripsi=sd.deskripsi,
-            tipe=sd.tipe,
-            url=sd.url,
-            konten=sd.konten,
-            topik_terkait=sd.topikTerkait,
-            tingkat_kesulitan=sd.tingkatKesulitan,
-            durasi=sd.durasi,
-            dibuat=sd.dibuat,
-            diperbarui=sd.diperbarui
-        )
-        for sd in sumber_daya_list
-    ]
+        sumber_daya_list = indeks_sumber_daya.cari(topik_list, limit)
+    
+    return [ResponseSumberDaya(**sd) for sd in sumber_daya_list]
+
+
+HEADER_EXPORT_CSV = [
+    "Tanggal",
+    "Bahasa",
+    "Tipe Error",
+    "Penyebab Utama",
+    "Kesenjangan Konsep",
+    "Level Bloom",
+    "Topik Terkait"
+]
+
+
+async def _baris_export_csv(id_mahasiswa: str, awal: Optional[datetime]) -> AsyncIterator[List[Any]]:
+    """Baca submisi_error lewat cursor Motor (projection + batch) dan hasilkan baris CSV"""
+    filter_submisi: Dict[str, Any] = {"id_mahasiswa": ke_object_id(id_mahasiswa)}
+    if awal:
+        filter_submisi["created_at"] = {"$gte": awal}
+    
+    cursor = dapatkan_collection("submisi_error").find(
+        filter_submisi,
+        projection={
+            "_id": 0,
+            "created_at": 1,
+            "bahasa": 1,
+            "tipe_error": 1,
+            "penyebab_utama": 1,
+            "kesenjangan_konsep": 1,
+            "level_bloom": 1,
+            "topik_terkait": 1
+        },
+        sort=[("created_at", -1)],
+        batch_size=500
+    )
+    
+    try:
+        async for submisi in cursor:
+            topik_terkait = submisi.get("topik_terkait")
+            yield [
+                submisi["created_at"].strftime("%Y-%m-%d %H:%M:%S"),
+                submisi.get("bahasa", "python"),
+                submisi.get("tipe_error") or "-",
+                submisi.get("penyebab_utama") or "-",
+                submisi.get("kesenjangan_konsep") or "-",
+                submisi.get("level_bloom") or "-",
+                ", ".join(topik_terkait) if topik_terkait else "-"
+            ]
+    finally:
+        # Klien memutus download di tengah jalan: tutup cursor di server
+        await cursor.close()
 
 
-async def generate_export_csv(id_mahasiswa: str, periode: str = "bulan_ini") -> str:
+def stream_export_csv(id_mahasiswa: str, periode: str = "bulan_ini", gzip: bool = False) -> AsyncIterator[bytes]:
     """
-    Generate CSV export untuk progress report mahasiswa
+    Stream CSV export untuk progress report mahasiswa
+    
+    Memori konstan berapa pun panjang riwayat: dokumen dibaca per batch dari cursor
+    dan ditulis ke buffer kecil yang di-flush per chunk.
     
     Args:
         id_mahasiswa: ID mahasiswa
         periode: minggu_ini, bulan_ini, semua
+        gzip: Kompres output dengan gzip
     
     Returns:
-        CSV content sebagai string
+        Async iterator chunk bytes CSV (untuk StreamingResponse)
     """
-    import csv
-    import io
-    from datetime import datetime, timedelta
-    
     # Filter by periode
     if periode == "minggu_ini":
-        awal = datetime.now() - timedelta(days=7)
+        awal: Optional[datetime] = datetime.now() - timedelta(days=7)
     elif periode == "bulan_ini":
         awal = datetime.now() - timedelta(days=30)
     else:
         awal = None
     
-    # Get data
-    from typing import Any, cast
-    
-    where_clause: Dict[str, Any] = {"idMahasiswa": id_mahasiswa}
-    if awal:
-        where_clause["createdAt"] = {"gte": awal}
-    
-    submisi_list = await prisma.submisierror.find_many(
-        where=cast(Any, where_clause),
-        order={"createdAt": "desc"}
-    )
-    
-    # Create CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Header
-    writer.writerow([
-        "Tanggal",
-        "Bahasa",
-        "Tipe Error",
-        "Penyebab Utama",
-        "Kesenjangan Konsep",
-        "Level Bloom",
-        "Topik Terkait"
-    ])
-    
-    # Data rows
-    for submisi in submisi_list:
-        writer.writerow([
-            submisi.createdAt.strftime("%Y-%m-%d %H:%M:%S"),
-            submisi.bahasa,
-            submisi.tipeError or "-",
-            submisi.penyebabUtama or "-",
-            submisi.kesenjanganKonsep or "-",
-            submisi.levelBloom or "-",
-            ", ".join(submisi.topikTerkait) if submisi.topikTerkait else "-"
-        ])
-    
-    return output.getvalue()
+    return stream_csv(HEADER_EXPORT_CSV, _baris_export_csv(id_mahasiswa, awal), gzip=gzip)
 
 
 async def generate_export_data(id_mahasiswa: str, periode: str = "bulan_ini") -> Dict[str, Any]:
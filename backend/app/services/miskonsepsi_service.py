@@ -0,0 +1,215 @@
+"""
+Service Miskonsepsi - klastering offline teks kesenjanganKonsep per tipe error
+
+Job berkala:
+1. $group di MongoDB: total kemunculan & jumlah mahasiswa per tipe_error
+2. Teks kesenjangan_konsep terbaru per tipe divektorisasi (hashing TF-IDF) lalu
+   dikelompokkan dengan mini-batch k-means (app.utils.klaster_teks); k dipilih dengan
+   silhouette, klaster yang centroid-nya mirip digabung
+3. Per tipe disimpan satu dokumen di collection "klaster_miskonsepsi": ukuran klaster,
+   teks representatif (terdekat ke centroid), centroid (bobot teratas) dan
+   miskonsepsi_umum (representatif klaster terbesar, tanpa kalimat yang hampir sama)
+   yang langsung dibaca endpoint
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo import ReplaceOne
+
+from app.config import settings
+from app.database import dapatkan_collection
+from app.utils.klaster_teks import kmeans_k_adaptif, vektorisasi_tfidf
+from app.utils.penjadwal import PenjadwalPeriodik
+
+logger = logging.getLogger(__name__)
+
+KLASTER_MISKONSEPSI_COLLECTION = "klaster_miskonsepsi"
+
+REPRESENTATIF_PER_KLASTER = 3
+JUMLAH_MISKONSEPSI_UMUM = 3
+# Bobot centroid teratas yang disimpan (indeks fitur hash + bobot)
+BOBOT_CENTROID_DISIMPAN = 32
+# miskonsepsi_umum dengan cosine TF-IDF >= ambang ini dianggap kalimat yang sama
+AMBANG_DUPLIKAT_MISKONSEPSI = 0.6
+
+
+def _gabung_klaster_mirip(centroid: np.ndarray, label: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gabungkan klaster dengan cosine centroid >= KLASTER_MISKONSEPSI_AMBANG_GABUNG
+    (k-means tetap bisa memecah varian kalimat yang sama); centroid baru = rata-rata
+    berbobot ukuran
+    """
+    k = centroid.shape[0]
+    induk = list(range(k))
+
+    def cari(x: int) -> int:
+        while induk[x] != x:
+            induk[x] = induk[induk[x]]
+            x = induk[x]
+        return x
+
+    kemiripan = centroid @ centroid.T
+    for a, b in zip(*np.nonzero(np.triu(kemiripan >= settings.klaster_miskonsepsi_ambang_gabung, k=1))):
+        induk[cari(int(b))] = cari(int(a))
+
+    akar = np.array([cari(j) for j in range(k)])
+    _, label_baru_centroid = np.unique(akar, return_inverse=True)
+    ukuran = np.bincount(label, minlength=k).astype(np.float32)
+    gabungan = np.zeros((label_baru_centroid.max() + 1, centroid.shape[1]), dtype=np.float32)
+    np.add.at(gabungan, label_baru_centroid, centroid * ukuran[:, None])
+    gabungan /= np.maximum(np.linalg.norm(gabungan, axis=1, keepdims=True), 1e-12)
+    return gabungan, label_baru_centroid[label]
+
+
+def _klaster_teks_tipe(teks_list: List[str]) -> List[Dict[str, Any]]:
+    """Klaster teks satu tipe error, terbesar dulu (dijalankan di thread)"""
+    if not teks_list:
+        return []
+    if len(teks_list) == 1:
+        return [{"ukuran": 1, "representatif": teks_list[:1], "centroid": {"indeks": [], "bobot": []}}]
+
+    X = vektorisasi_tfidf(teks_list)
+    # Rata-rata minimal 2 teks per klaster; k final dipilih dengan silhouette
+    maks_k = min(settings.klaster_miskonsepsi_maks_k, len(teks_list) // 2)
+    centroid, label, _ = kmeans_k_adaptif(X, maks_k)
+    centroid, label = _gabung_klaster_mirip(centroid, label)
+    kemiripan = X.kali_dense(centroid)[np.arange(len(teks_list)), label]
+
+    hasil: List[Dict[str, Any]] = []
+    for j in range(centroid.shape[0]):
+        anggota = np.flatnonzero(label == j)
+        if anggota.size == 0:
+            continue
+        # Teks unik terdekat ke centroid
+        representatif: List[str] = []
+        for i in anggota[np.argsort(-kemiripan[anggota], kind="stable")]:
+            teks = teks_list[i].strip()
+            if teks not in representatif:
+                representatif.append(teks)
+            if len(representatif) >= REPRESENTATIF_PER_KLASTER:
+                break
+        teratas = np.argsort(-centroid[j])[:BOBOT_CENTROID_DISIMPAN]
+        teratas = teratas[centroid[j, teratas] > 0]
+        hasil.append({
+            "ukuran": int(anggota.size),
+            "representatif": representatif,
+            "centroid": {
+                "indeks": teratas.astype(int).tolist(),
+                "bobot": np.round(centroid[j, teratas], 5).astype(float).tolist()
+            }
+        })
+    hasil.sort(key=lambda klaster: -klaster["ukuran"])
+    return hasil
+
+
+def _miskonsepsi_umum(klaster: List[Dict[str, Any]]) -> List[str]:
+    """
+    Representatif klaster terbesar dulu; kalimat yang cosine TF-IDF-nya dengan
+    kalimat terpilih >= AMBANG_DUPLIKAT_MISKONSEPSI dilewati
+    """
+    kandidat = [k["representatif"][0] for k in klaster if k["representatif"]]
+    if len(kandidat) < 2:
+        return kandidat[:JUMLAH_MISKONSEPSI_UMUM]
+
+    X = vektorisasi_tfidf(kandidat)
+    dense = np.zeros((len(kandidat), X.jumlah_kolom), dtype=np.float32)
+    for i in range(len(kandidat)):
+        awal, akhir = X.indptr[i], X.indptr[i + 1]
+        dense[i, X.indices[awal:akhir]] = X.data[awal:akhir]
+    kemiripan = dense @ dense.T
+
+    terpilih: List[int] = []
+    for i in range(len(kandidat)):
+        if all(kemiripan[i, j] < AMBANG_DUPLIKAT_MISKONSEPSI for j in terpilih):
+            terpilih.append(i)
+            if len(terpilih) >= JUMLAH_MISKONSEPSI_UMUM:
+                break
+    return [kandidat[i] for i in terpilih]
+
+
+async def hitung_klaster_miskonsepsi() -> int:
+    """
+    Batch job: hitung ulang statistik & klaster miskonsepsi semua tipe error
+
+    Returns:
+        Jumlah tipe error yang disimpan
+    """
+    mulai = time.perf_counter()
+    submisi = dapatkan_collection("submisi_error")
+
+    statistik = await submisi.aggregate([
+        {"$match": {"tipe_error": {"$ne": None}}},
+        {"$group": {"_id": "$tipe_error", "total": {"$sum": 1}, "mahasiswa": {"$addToSet": "$id_mahasiswa"}}},
+        {"$project": {"total": 1, "jumlah_mahasiswa": {"$size": "$mahasiswa"}}},
+    ], allowDiskUse=True).to_list(length=None)
+
+    teks_per_tipe: Dict[str, List[str]] = {}
+    for item in statistik:
+        cursor = submisi.find(
+            {"tipe_error": item["_id"], "kesenjangan_konsep": {"$nin": [None, ""]}},
+            projection={"_id": 0, "kesenjangan_konsep": 1}
+        ).sort("created_at", -1).limit(settings.klaster_miskonsepsi_maks_teks)
+        teks_per_tipe[item["_id"]] = [doc["kesenjangan_konsep"] async for doc in cursor]
+
+    def _klaster_semua() -> Dict[str, Tuple[List[Dict[str, Any]], List[str]]]:
+        hasil = {}
+        for tipe, teks in teks_per_tipe.items():
+            klaster = _klaster_teks_tipe(teks)
+            hasil[tipe] = (klaster, _miskonsepsi_umum(klaster))
+        return hasil
+
+    klaster_per_tipe = await asyncio.to_thread(_klaster_semua)
+
+    sekarang = datetime.utcnow()
+    operasi = []
+    for item in statistik:
+        klaster, miskonsepsi_umum = klaster_per_tipe.get(item["_id"], ([], []))
+        operasi.append(ReplaceOne(
+            {"_id": item["_id"]},
+            {
+                "total_kemunculan": item["total"],
+                "jumlah_mahasiswa": item["jumlah_mahasiswa"],
+                "klaster": klaster,
+                "miskonsepsi_umum": miskonsepsi_umum,
+                "dihitung": sekarang
+            },
+            upsert=True
+        ))
+
+    collection = dapatkan_collection(KLASTER_MISKONSEPSI_COLLECTION)
+    if operasi:
+        await collection.bulk_write(operasi, ordered=False)
+    # Tipe error yang sudah tidak ada lagi
+    await collection.delete_many({"dihitung": {"$lt": sekarang}})
+
+    logger.info(
+        f"📊 Klaster miskonsepsi: {len(statistik)} tipe error, "
+        f"{sum(len(t) for t in teks_per_tipe.values())} teks dalam {time.perf_counter() - mulai:.1f}s"
+    )
+    return len(statistik)
+
+
+async def ambil_pola_global_tersimpan(limit: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Pola kesalahan global hasil batch (terurut total kemunculan)
+
+    Returns:
+        List dokumen klaster_miskonsepsi, atau None jika job belum pernah jalan
+    """
+    dokumen = await dapatkan_collection(KLASTER_MISKONSEPSI_COLLECTION).find(
+        {}, projection={"klaster": 0}
+    ).sort("total_kemunculan", -1).limit(limit).to_list(length=limit)
+    return dokumen or None
+
+
+penjadwal_miskonsepsi = PenjadwalPeriodik(
+    "klaster_miskonsepsi",
+    settings.klaster_miskonsepsi_interval,
+    hitung_klaster_miskonsepsi,
+    jeda_awal_detik=60.0
+)
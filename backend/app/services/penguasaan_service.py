@@ -0,0 +1,308 @@
+"""
+Service Penguasaan - knowledge tracing (BKT) untuk ProgressBelajar
+
+Online: setiap observasi baru (error hasil analisis = salah, submisi exercise =
+benar/salah) memperbarui P(menguasai) satu dokumen (mahasiswa, topik) dalam O(1)
+dari state sebelumnya (compare-and-set pada probabilitas_menguasai, tanpa count
+ulang seluruh riwayat). tingkat_penguasaan = round(100 x P).
+
+Batch: refit_bkt() membaca seluruh riwayat sekali, memilih parameter BKT terbaik
+per topik (grid search log-likelihood, vektorisasi NumPy di app.utils.bkt) lalu
+menghitung ulang state semua mahasiswa dengan parameter tersebut. Parameter
+disimpan di collection "parameter_bkt" dan dipakai update online berikutnya.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+from app.database import dapatkan_collection
+from app.repositories.analitik_repository import ke_object_id
+from app.utils.bkt import ParameterBKT, grid_parameter, jalankan_grid_bkt, perbarui_bkt
+from app.utils.cache import CacheTTL
+from app.utils.penjadwal import PenjadwalPeriodik
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_COLLECTION = "progress_belajar"
+PARAMETER_BKT_COLLECTION = "parameter_bkt"
+
+MAKS_PERCOBAAN_CAS = 5
+# Perubahan P(menguasai) di bawah ini dianggap stagnan
+AMBANG_TREN = 0.01
+UKURAN_BULK_WRITE = 1000
+
+_cache_parameter = CacheTTL("parameter_bkt", ukuran_maks=2048, ttl_detik=3600.0)
+
+
+def parameter_default() -> ParameterBKT:
+    return ParameterBKT(
+        p_awal=settings.bkt_p_awal,
+        p_transit=settings.bkt_p_transit,
+        p_slip=settings.bkt_p_slip,
+        p_tebak=settings.bkt_p_tebak
+    )
+
+
+async def dapatkan_parameter_topik(topik: str) -> ParameterBKT:
+    """Parameter BKT hasil refit untuk topik (default dari config jika belum ada)"""
+    async def _muat() -> ParameterBKT:
+        doc = await dapatkan_collection(PARAMETER_BKT_COLLECTION).find_one({"_id": topik})
+        if not doc:
+            return parameter_default()
+        return ParameterBKT(doc["p_awal"], doc["p_transit"], doc["p_slip"], doc["p_tebak"])
+
+    return await _cache_parameter.dapatkan_atau_muat(topik, _muat)
+
+
+def _tren(p_lama: float, p_baru: float) -> str:
+    if p_baru - p_lama > AMBANG_TREN:
+        return "membaik"
+    if p_lama - p_baru > AMBANG_TREN:
+        return "menurun"
+    return "stagnan"
+
+
+async def perbarui_penguasaan(
+    id_mahasiswa: str,
+    topik: str,
+    benar: bool,
+    waktu: Optional[datetime] = None
+) -> float:
+    """
+    Update BKT satu observasi untuk (mahasiswa, topik)
+
+    Args:
+        id_mahasiswa: ID mahasiswa
+        topik: Topik yang diobservasi
+        benar: True jika exercise lulus, False untuk error / exercise gagal
+        waktu: Waktu observasi (default sekarang)
+
+    Returns:
+        P(menguasai) setelah observasi
+    """
+    waktu = waktu or datetime.utcnow()
+    parameter = await dapatkan_parameter_topik(topik)
+    collection = dapatkan_collection(PROGRESS_COLLECTION)
+    filter_progress = {"id_mahasiswa": ke_object_id(id_mahasiswa), "topik": topik}
+
+    p_baru = parameter.p_awal
+    for _ in range(MAKS_PERCOBAAN_CAS):
+        doc = await collection.find_one(
+            filter_progress, projection={"probabilitas_menguasai": 1, "tingkat_penguasaan": 1}
+        )
+        if doc is None:
+            p_baru = perbarui_bkt(parameter.p_awal, benar, parameter)
+            dokumen_baru = {
+                **filter_progress,
+                "probabilitas_menguasai": p_baru,
+                "tingkat_penguasaan": round(p_baru * 100),
+                "jumlah_observasi": 1,
+                "jumlah_error_di_topik": 0 if benar else 1,
+                "tanggal_error_terakhir": None if benar else waktu,
+                "tren_perbaikan": _tren(parameter.p_awal, p_baru),
+                "created_at": waktu,
+                "updated_at": waktu
+            }
+            try:
+                await collection.insert_one(dokumen_baru)
+                return p_baru
+            except DuplicateKeyError:
+                continue  # Dibuat request lain bersamaan: ulangi sebagai update
+
+        p_tersimpan = doc.get("probabilitas_menguasai")
+        # Dokumen lama (sebelum BKT): tingkat_penguasaan dipakai sebagai prior
+        p_lama = p_tersimpan if p_tersimpan is not None else min(max((doc.get("tingkat_penguasaan") or 0) / 100, 0.01), 0.99)
+        p_baru = perbarui_bkt(p_lama, benar, parameter)
+
+        update: Dict[str, Any] = {
+            "$set": {
+                "probabilitas_menguasai": p_baru,
+                "tingkat_penguasaan": round(p_baru * 100),
+                "tren_perbaikan": _tren(p_lama, p_baru),
+                "updated_at": waktu
+            },
+            "$inc": {"jumlah_observasi": 1}
+        }
+        if not benar:
+            update["$set"]["tanggal_error_terakhir"] = waktu
+            update["$inc"]["jumlah_error_di_topik"] = 1
+
+        hasil = await collection.update_one({"_id": doc["_id"], "probabilitas_menguasai": p_tersimpan}, update)
+        if hasil.modified_count:
+            return p_baru
+
+    logger.warning(f"⚠️ Update penguasaan {id_mahasiswa}/{topik} kalah race {MAKS_PERCOBAAN_CAS}x, dilewati")
+    return p_baru
+
+
+# ==================== BATCH REFIT ====================
+
+Observasi = Tuple[str, float, int]  # (id_mahasiswa, timestamp, 1 = benar / 0 = salah)
+
+
+def _timestamp_utc(waktu: Optional[datetime]) -> float:
+    """Epoch detik dari datetime naive UTC (Motor); .timestamp() biasa menganggapnya waktu lokal"""
+    if waktu is None:
+        return 0.0
+    if waktu.tzinfo is None:
+        waktu = waktu.replace(tzinfo=timezone.utc)
+    return waktu.timestamp()
+
+
+async def _muat_observasi() -> Dict[str, List[Observasi]]:
+    """Seluruh riwayat observasi per topik: error analisis + submisi exercise"""
+    per_topik: Dict[str, List[Observasi]] = {}
+
+    cursor_error = dapatkan_collection("submisi_error").find(
+        {"topik_terkait.0": {"$exists": True}},
+        projection={"_id": 0, "id_mahasiswa": 1, "topik_terkait": 1, "created_at": 1}
+    )
+    async for doc in cursor_error:
+        waktu = _timestamp_utc(doc.get("created_at"))
+        for topik in set(doc["topik_terkait"]):
+            per_topik.setdefault(topik, []).append((str(doc["id_mahasiswa"]), waktu, 0))
+
+    topik_exercise = {
+        doc["_id"]: doc.get("topik")
+        async for doc in dapatkan_collection("exercises").find({}, projection={"topik": 1})
+    }
+    cursor_submisi = dapatkan_collection("exercise_submissions").find(
+        {}, projection={"_id": 0, "id_mahasiswa": 1, "id_exercise": 1, "status_selesai": 1, "created_at": 1}
+    )
+    async for doc in cursor_submisi:
+        topik = topik_exercise.get(doc.get("id_exercise"))
+        if not topik:
+            continue
+        waktu = _timestamp_utc(doc.get("created_at"))
+        per_topik.setdefault(topik, []).append((str(doc["id_mahasiswa"]), waktu, 1 if doc.get("status_selesai") else 0))
+
+    return per_topik
+
+
+def _fit_topik(observasi_topik: List[Observasi]) -> Dict[str, Any]:
+    """
+    Pilih parameter terbaik dan hitung state akhir semua mahasiswa untuk satu topik
+    (satu lintasan waktu atas semua urutan & semua kandidat parameter)
+    """
+    mahasiswa = np.array([o[0] for o in observasi_topik])
+    waktu = np.array([o[1] for o in observasi_topik], dtype=np.float64)
+    obs = np.array([o[2] for o in observasi_topik], dtype=np.int8)
+
+    # Urutkan per mahasiswa lalu waktu -> observasi rata, urutan = blok per mahasiswa
+    id_unik, indeks_mahasiswa = np.unique(mahasiswa, return_inverse=True)
+    urutan = np.lexsort((waktu, indeks_mahasiswa))
+    obs, waktu, indeks_mahasiswa = obs[urutan], waktu[urutan], indeks_mahasiswa[urutan]
+    panjang = np.bincount(indeks_mahasiswa, minlength=len(id_unik))
+    awal = np.concatenate(([0], np.cumsum(panjang)[:-1]))
+
+    # Urutan terpanjang dulu (syarat jalankan_grid_bkt)
+    susunan = np.argsort(-panjang, kind="stable")
+    if len(obs) >= settings.bkt_min_observasi_refit:
+        grid = grid_parameter()
+    else:
+        grid = [parameter_default()]  # Data terlalu sedikit untuk refit yang stabil
+    log_likelihood, p_akhir = jalankan_grid_bkt(obs, awal[susunan], panjang[susunan], grid)
+    terbaik = int(np.argmax(log_likelihood.sum(axis=1)))
+
+    p_per_mahasiswa = np.empty(len(id_unik), dtype=np.float64)
+    p_per_mahasiswa[susunan] = p_akhir[terbaik]
+    jumlah_salah = np.add.reduceat(1 - obs, awal)
+    waktu_salah = np.maximum.reduceat(np.where(obs == 0, waktu, -np.inf), awal)
+
+    return {
+        "parameter": grid[terbaik],
+        "log_likelihood": float(log_likelihood[terbaik].sum()),
+        "jumlah_observasi": int(len(obs)),
+        "state": [
+            (str(id_unik[i]), float(p_per_mahasiswa[i]), int(panjang[i]), int(jumlah_salah[i]),
+             None if np.isinf(waktu_salah[i]) else datetime.fromtimestamp(float(waktu_salah[i]), timezone.utc).replace(tzinfo=None))
+            for i in range(len(id_unik))
+        ]
+    }
+
+
+async def refit_bkt() -> int:
+    """
+    Batch job: refit parameter BKT per topik & hitung ulang state penguasaan semua mahasiswa
+
+    Catatan: update online yang terjadi selama job berjalan dapat tertimpa hasil
+    batch; observasi tersebut tetap ikut dihitung pada refit berikutnya.
+
+    Returns:
+        Jumlah topik yang di-refit
+    """
+    mulai = time.perf_counter()
+    per_topik = await _muat_observasi()
+
+    def _fit_semua() -> Dict[str, Dict[str, Any]]:
+        return {topik: _fit_topik(observasi) for topik, observasi in per_topik.items()}
+
+    hasil_fit = await asyncio.to_thread(_fit_semua)
+
+    sekarang = datetime.utcnow()
+    operasi_parameter = [
+        ReplaceOne(
+            {"_id": topik},
+            {
+                **fit["parameter"].ke_dict(),
+                "log_likelihood": fit["log_likelihood"],
+                "jumlah_observasi": fit["jumlah_observasi"],
+                "dihitung": sekarang
+            },
+            upsert=True
+        )
+        for topik, fit in hasil_fit.items()
+    ]
+    if operasi_parameter:
+        await dapatkan_collection(PARAMETER_BKT_COLLECTION).bulk_write(operasi_parameter, ordered=False)
+    _cache_parameter.kosongkan()
+
+    progress = dapatkan_collection(PROGRESS_COLLECTION)
+    operasi: List[UpdateOne] = []
+    jumlah_state = 0
+    for topik, fit in hasil_fit.items():
+        for id_mahasiswa, p, jumlah_observasi, jumlah_salah, waktu_salah in fit["state"]:
+            operasi.append(UpdateOne(
+                {"id_mahasiswa": ke_object_id(id_mahasiswa), "topik": topik},
+                {
+                    "$set": {
+                        "probabilitas_menguasai": p,
+                        "tingkat_penguasaan": round(p * 100),
+                        "jumlah_observasi": jumlah_observasi,
+                        "jumlah_error_di_topik": jumlah_salah,
+                        "tanggal_error_terakhir": waktu_salah,
+                        "updated_at": sekarang
+                    },
+                    "$setOnInsert": {"created_at": sekarang}
+                },
+                upsert=True
+            ))
+            if len(operasi) >= UKURAN_BULK_WRITE:
+                await progress.bulk_write(operasi, ordered=False)
+                jumlah_state += len(operasi)
+                operasi = []
+    if operasi:
+        await progress.bulk_write(operasi, ordered=False)
+        jumlah_state += len(operasi)
+
+    logger.info(
+        f"📊 Refit BKT: {len(hasil_fit)} topik, {jumlah_state} state mahasiswa "
+        f"dalam {time.perf_counter() - mulai:.1f}s"
+    )
+    return len(hasil_fit)
+
+
+penjadwal_bkt = PenjadwalPeriodik(
+    "refit_bkt",
+    settings.bkt_refit_interval,
+    refit_bkt,
+    jeda_awal_detik=120.0
+)
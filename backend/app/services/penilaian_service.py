@@ -0,0 +1,224 @@
+"""
+Service Penilaian - evaluasi kode submisi exercise
+
+Urutan penilaian (nilai_submisi):
+1. Struktur AST: kode yang secara struktur identik dengan solusi referensi (nama
+   variabel boleh beda, literal harus sama) langsung lulus tanpa subprocess.
+   Sidik jari referensi di-cache per exercise (dihitung saat exercise dibuat).
+2. Test case yang bisa dieksekusi dijalankan di sandbox (lihat app.utils.sandbox).
+3. Tanpa test case: skor = kemiripan struktur (Dice hash subtree) dengan referensi.
+
+Exercise.testCases berisi string; test case yang bisa dieksekusi ditulis sebagai JSON:
+- stdin/stdout : {"input": "3\\n4", "output_diharapkan": "7"}
+- ekspresi     : {"ekspresi": "tambah(3, 4)", "hasil_diharapkan": "7"}  (dibandingkan dengan repr)
+String lain (deskripsi biasa) diabaikan.
+
+Hasil sandbox di-cache per (id_exercise, sha256 kode), submisi identik yang bersamaan hanya
+dijalankan sekali (single-flight CacheTTL).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.config import settings
+from app.utils.cache import CacheTTL
+from app.utils.sandbox import BatasSandbox, HasilSandbox, PoolSandbox
+from app.utils.struktur_kode import SidikJariKode, kemiripan_struktur, sidik_jari
+
+pool_sandbox = PoolSandbox(
+    maks_paralel=settings.penilaian_maks_paralel or os.cpu_count() or 1,
+    maks_antrian=settings.penilaian_maks_antrian,
+    batas=BatasSandbox(
+        waktu_cpu_detik=settings.penilaian_batas_cpu_detik,
+        waktu_test_detik=settings.penilaian_batas_waktu_test,
+        waktu_total_detik=settings.penilaian_batas_waktu_total,
+        memori_mb=settings.penilaian_batas_memori_mb,
+        wajib_isolasi=settings.penilaian_wajib_isolasi,
+        uid_awal=settings.penilaian_uid_sandbox_awal
+    )
+)
+
+cache_penilaian = CacheTTL("penilaian", ukuran_maks=5000, ttl_detik=settings.penilaian_cache_ttl)
+
+# Sidik jari solusi referensi per exercise; kunci ikut hash solusi agar update
+# solusiReferensi otomatis memakai sidik jari baru
+cache_sidik_jari_referensi = CacheTTL("sidik_jari_referensi", ukuran_maks=5000, ttl_detik=86400.0)
+
+
+def _hash_kode(kode: str) -> str:
+    return hashlib.sha256(kode.encode("utf-8")).hexdigest()
+
+
+async def siapkan_sidik_jari_referensi(id_exercise: str, solusi_referensi: str) -> Optional[SidikJariKode]:
+    """
+    Ambil (atau hitung & cache) sidik jari struktur solusi referensi exercise.
+    Dipanggil saat exercise dibuat agar submisi pertama tidak perlu menghitungnya.
+    Parse saat cache miss dijalankan di thread agar tidak memblok event loop.
+
+    Returns:
+        SidikJariKode, atau None jika solusi referensi bukan kode Python yang valid
+    """
+    kunci = (id_exercise, _hash_kode(solusi_referensi))
+    sidik = cache_sidik_jari_referensi.dapatkan(kunci)
+    if sidik is None:
+        try:
+            sidik = await asyncio.to_thread(sidik_jari, solusi_referensi)
+        except (SyntaxError, ValueError):
+            return None
+        cache_sidik_jari_referensi.simpan(kunci, sidik)
+    return sidik
+
+
+def _feedback_struktur(nilai_score: int) -> str:
+    if nilai_score >= 80:
+        return "✅ Solusi Anda sangat baik! Struktur kode mirip dengan solusi referensi."
+    if nilai_score >= 60:
+        return "👍 Solusi Anda cukup baik, tapi bisa ditingkatkan lagi."
+    return "💡 Solusi Anda perlu perbaikan. Coba bandingkan dengan solusi referensi."
+
+
+def parse_test_cases(test_cases: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Ambil test case yang bisa dieksekusi dari Exercise.testCases
+
+    Args:
+        test_cases: List string test case (JSON atau deskripsi biasa)
+
+    Returns:
+        List test case {"input"/"output_diharapkan"} atau {"ekspresi"/"hasil_diharapkan"}
+    """
+    hasil: List[Dict[str, Any]] = []
+    for teks in test_cases:
+        try:
+            test = json.loads(teks)
+        except (TypeError, ValueError):
+            continue
+        if not isinstance(test, dict):
+            continue
+        if "ekspresi" in test and "hasil_diharapkan" in test:
+            hasil.append({"ekspresi": str(test["ekspresi"]), "hasil_diharapkan": str(test["hasil_diharapkan"])})
+        elif "output_diharapkan" in test:
+            hasil.append({"input": str(test.get("input", "")), "output_diharapkan": str(test["output_diharapkan"])})
+    return hasil
+
+
+def _ringkas_hasil(hasil: HasilSandbox, jumlah_test: int) -> Dict[str, Any]:
+    """Ubah HasilSandbox menjadi skor, status selesai, feedback dan detail per test"""
+    if not hasil.error and len(hasil.hasil_test) != jumlah_test:
+        # Jumlah hasil tidak sesuai jumlah test: jangan sampai skor > 100
+        hasil = HasilSandbox(error="Hasil sandbox tidak valid", durasi_ms=hasil.durasi_ms)
+
+    if hasil.error:
+        hasil_test = [
+            {"nomor": i + 1, "status": "error", "pesan": hasil.error, "durasi_ms": 0.0}
+            for i in range(jumlah_test)
+        ]
+    else:
+        hasil_test = [{"nomor": i + 1, **item} for i, item in enumerate(hasil.hasil_test)]
+
+    lulus = sum(1 for item in hasil_test if item["status"] == "lulus")
+    nilai_score = int(round(lulus * 100 / jumlah_test)) if jumlah_test else 0
+
+    if hasil.error:
+        feedback = f"⚠️ Kode tidak bisa dijalankan: {hasil.error}"
+    elif lulus == jumlah_test:
+        feedback = f"✅ Semua test case lulus ({lulus}/{jumlah_test})."
+    else:
+        gagal = next((item for item in hasil_test if item["status"] != "lulus"), None)
+        feedback = f"💡 {lulus}/{jumlah_test} test case lulus."
+        if gagal is not None:
+            feedback += f" Test #{gagal['nomor']} {gagal['status']}: {gagal['pesan']}"
+
+    return {
+        "status_selesai": jumlah_test > 0 and lulus == jumlah_test,
+        "nilai_score": nilai_score,
+        "feedback": feedback,
+        "hasil_test": hasil_test,
+        "durasi_ms": round(hasil.durasi_ms, 2),
+    }
+
+
+async def nilai_submisi(
+    id_exercise: str,
+    kode: str,
+    test_cases: Sequence[str],
+    solusi_referensi: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Nilai kode submisi: cek struktur AST dulu, lalu test case di sandbox jika perlu
+
+    Args:
+        id_exercise: ID exercise (bagian dari kunci cache)
+        kode: Kode solusi mahasiswa
+        test_cases: Exercise.testCases
+        solusi_referensi: Exercise.solusiReferensi
+
+    Returns:
+        Dict status_selesai, nilai_score, feedback, kemiripan_struktur, hasil_test
+        (per test: nomor, status, pesan, durasi_ms; None jika tidak dijalankan) dan
+        durasi_ms; None jika referensi tidak valid dan tidak ada test case yang bisa
+        dieksekusi (pemanggil memakai penilaian fallback)
+
+    Raises:
+        AntrianSandboxPenuh: Jika antrian penilaian penuh
+    """
+    tests = parse_test_cases(test_cases)
+    referensi = await siapkan_sidik_jari_referensi(id_exercise, solusi_referensi)
+
+    try:
+        # Parse + hash AST bisa berat untuk kode besar: jangan blok event loop
+        sidik_submisi = await asyncio.to_thread(sidik_jari, kode)
+    except (SyntaxError, ValueError) as e:
+        if referensi is None and not tests:
+            # Referensi bukan Python (mis. exercise JavaScript) dan tidak ada test:
+            # kegagalan parse bukan berarti kode salah, pemanggil memakai fallback
+            return None
+        pesan = f"SyntaxError: {e.msg} (baris {e.lineno})" if isinstance(e, SyntaxError) else str(e)
+        return {
+            "status_selesai": False,
+            "nilai_score": 0,
+            "feedback": f"⚠️ Kode tidak bisa dijalankan: {pesan}",
+            "kemiripan_struktur": None,
+            "hasil_test": None,
+            "durasi_ms": 0.0,
+        }
+
+    kemiripan = round(kemiripan_struktur(sidik_submisi, referensi), 4) if referensi else None
+
+    # Identik secara struktur dengan referensi: tidak perlu subprocess
+    if referensi is not None and sidik_submisi.hash_tepat == referensi.hash_tepat:
+        return {
+            "status_selesai": True,
+            "nilai_score": 100,
+            "feedback": "✅ Solusi Anda benar! Struktur kode sama dengan solusi referensi.",
+            "kemiripan_struktur": 1.0,
+            "hasil_test": None,
+            "durasi_ms": 0.0,
+        }
+
+    if tests:
+        kunci = (id_exercise, _hash_kode(kode))
+
+        async def _jalankan() -> Dict[str, Any]:
+            hasil = await pool_sandbox.jalankan(kode, tests)
+            return _ringkas_hasil(hasil, len(tests))
+
+        penilaian = dict(await cache_penilaian.dapatkan_atau_muat(kunci, _jalankan))
+        penilaian["kemiripan_struktur"] = kemiripan
+        return penilaian
+
+    if kemiripan is None:
+        return None
+
+    nilai_score = int(kemiripan * 100)
+    return {
+        "status_selesai": True,
+        "nilai_score": nilai_score,
+        "feedback": _feedback_struktur(nilai_score),
+        "kemiripan_struktur": kemiripan,
+        "hasil_test": None,
+        "durasi_ms": 0.0,
+    }
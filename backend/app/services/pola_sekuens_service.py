@@ -0,0 +1,198 @@
+"""
+Service Pola Sekuens - sequential pattern mining riwayat error seluruh mahasiswa
+
+Job berkala:
+1. Stream submisi_error terurut (id_mahasiswa, created_at) - memakai index compound
+   yang sama - dan susun satu urutan per mahasiswa untuk dua dimensi: tipe_error
+   dan topik (topik_terkait pertama). Pengulangan berturut-turut digabung agar
+   pola menggambarkan transisi; hanya urutan mahasiswa yang sedang dibaca yang
+   ditahan sebagai list, sisanya buffer int32 ringkas (app.utils.prefixspan).
+2. PrefixSpan per dimensi; subtree tiap item awal ditambang paralel di process pool.
+3. Pola (panjang >= 2) teratas disimpan di collection "pola_sekuens" dan dibaca
+   langsung oleh endpoint analytics admin.
+"""
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo import ReplaceOne
+
+from app.config import settings
+from app.database import dapatkan_collection
+from app.utils.penjadwal import PenjadwalPeriodik
+from app.utils.prefixspan import Pola, PenyusunDatabase, inisialisasi_worker, item_sering, prefixspan, tambang_subtree
+
+logger = logging.getLogger(__name__)
+
+POLA_SEKUENS_COLLECTION = "pola_sekuens"
+
+DIMENSI_POLA = ("tipe_error", "topik")
+
+# Di bawah jumlah item awal ini penambangan dijalankan di thread (overhead spawn tidak sepadan)
+MIN_ITEM_PARALEL = 4
+
+
+class _KamusItem:
+    """Encoding label (tipe error / topik) <-> int"""
+
+    def __init__(self) -> None:
+        self.label: List[str] = []
+        self._indeks: Dict[str, int] = {}
+
+    def kode(self, label: str) -> int:
+        indeks = self._indeks.get(label)
+        if indeks is None:
+            indeks = self._indeks[label] = len(self.label)
+            self.label.append(label)
+        return indeks
+
+
+def _ringkas_urutan(urutan: List[int]) -> List[int]:
+    """Gabungkan pengulangan berturut-turut & batasi ke event terbaru"""
+    hasil = [x for i, x in enumerate(urutan) if i == 0 or x != urutan[i - 1]]
+    return hasil[-settings.pola_sekuens_maks_panjang_urutan:]
+
+
+async def _muat_database() -> Dict[str, Tuple[np.ndarray, np.ndarray, List[str]]]:
+    """Stream riwayat error -> database urutan per dimensi (item, offset, label)"""
+    penyusun = {dimensi: PenyusunDatabase() for dimensi in DIMENSI_POLA}
+    kamus = {dimensi: _KamusItem() for dimensi in DIMENSI_POLA}
+    urutan_aktif: Dict[str, List[int]] = {dimensi: [] for dimensi in DIMENSI_POLA}
+
+    def _tutup_urutan() -> None:
+        # Urutan < 2 event tidak bisa memuat pola transisi (dan tidak dihitung di persentase)
+        for dimensi in DIMENSI_POLA:
+            urutan = _ringkas_urutan(urutan_aktif[dimensi])
+            if len(urutan) >= 2:
+                penyusun[dimensi].tambah(urutan)
+            urutan_aktif[dimensi] = []
+
+    cursor = dapatkan_collection("submisi_error").find(
+        {},
+        projection={"_id": 0, "id_mahasiswa": 1, "tipe_error": 1, "topik_terkait": 1}
+    ).sort([("id_mahasiswa", 1), ("created_at", 1)]).batch_size(2000)
+
+    mahasiswa_aktif: Any = None
+    async for doc in cursor:
+        if doc.get("id_mahasiswa") != mahasiswa_aktif:
+            _tutup_urutan()
+            mahasiswa_aktif = doc.get("id_mahasiswa")
+        if doc.get("tipe_error"):
+            urutan_aktif["tipe_error"].append(kamus["tipe_error"].kode(doc["tipe_error"]))
+        if doc.get("topik_terkait"):
+            urutan_aktif["topik"].append(kamus["topik"].kode(doc["topik_terkait"][0]))
+    _tutup_urutan()
+
+    return {dimensi: (*penyusun[dimensi].selesai(), kamus[dimensi].label) for dimensi in DIMENSI_POLA}
+
+
+async def _tambang_paralel(item: np.ndarray, offset: np.ndarray, min_support: int) -> List[Pola]:
+    """PrefixSpan dengan subtree per item awal dibagi ke process pool"""
+    maks_panjang = settings.pola_sekuens_maks_panjang
+    awal = item_sering(item, offset, min_support)
+    workers = min(settings.pola_sekuens_workers or os.cpu_count() or 1, len(awal))
+    if workers <= 1 or len(awal) < MIN_ITEM_PARALEL:
+        return await asyncio.to_thread(prefixspan, item, offset, min_support, maks_panjang)
+
+    loop = asyncio.get_running_loop()
+    # Database dikirim sekali per worker lewat initializer; subtree terbesar dijadwalkan dulu
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=inisialisasi_worker,
+        initargs=(item, offset)
+    ) as pool:
+        hasil_subtree = await asyncio.gather(*[
+            loop.run_in_executor(pool, tambang_subtree, x, min_support, maks_panjang)
+            for x in sorted(awal, key=lambda x: -awal[x])
+        ])
+    return [pola for hasil in hasil_subtree for pola in hasil]
+
+
+async def tambang_pola_sekuens() -> int:
+    """
+    Batch job: tambang pola sekuens semua dimensi & simpan ke pola_sekuens
+
+    Returns:
+        Jumlah pola yang disimpan
+    """
+    mulai = time.perf_counter()
+    database = await _muat_database()
+
+    sekarang = datetime.utcnow()
+    operasi: List[ReplaceOne] = []
+    for dimensi, (item, offset, label) in database.items():
+        jumlah_urutan = len(offset) - 1
+        if jumlah_urutan == 0:
+            continue
+        min_support = max(
+            settings.pola_sekuens_min_support_absolut,
+            math.ceil(settings.pola_sekuens_min_support * jumlah_urutan)
+        )
+        pola_list = await _tambang_paralel(item, offset, min_support)
+        pola_list.sort(key=lambda p: (-p[1], -len(p[0])))
+
+        for pola, support in pola_list[:settings.pola_sekuens_maks_disimpan]:
+            label_pola = [label[x] for x in pola]
+            operasi.append(ReplaceOne(
+                {"_id": f"{dimensi}:{' > '.join(label_pola)}"},
+                {
+                    "dimensi": dimensi,
+                    "pola": label_pola,
+                    "panjang": len(label_pola),
+                    "jumlah_mahasiswa": support,
+                    "persentase_mahasiswa": round(support / jumlah_urutan * 100, 2),
+                    "dihitung": sekarang
+                },
+                upsert=True
+            ))
+        logger.info(f"📊 Pola sekuens {dimensi}: {jumlah_urutan} urutan, {len(pola_list)} pola (support >= {min_support})")
+
+    collection = dapatkan_collection(POLA_SEKUENS_COLLECTION)
+    await collection.create_index([("dimensi", 1), ("jumlah_mahasiswa", -1)])
+    if operasi:
+        await collection.bulk_write(operasi, ordered=False)
+    # Pola yang sudah tidak sering lagi
+    await collection.delete_many({"dihitung": {"$lt": sekarang}})
+
+    logger.info(f"✅ Pola sekuens: {len(operasi)} pola disimpan dalam {time.perf_counter() - mulai:.1f}s")
+    return len(operasi)
+
+
+async def ambil_pola_sekuens(
+    dimensi: str,
+    limit: int,
+    panjang_min: int = 2,
+    mengandung: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Pola sekuens hasil batch, terurut jumlah mahasiswa
+
+    Args:
+        dimensi: "tipe_error" atau "topik"
+        limit: Maksimal pola
+        panjang_min: Panjang pola minimal
+        mengandung: Hanya pola yang memuat label ini (opsional)
+    """
+    filter_pola: Dict[str, Any] = {"dimensi": dimensi, "panjang": {"$gte": panjang_min}}
+    if mengandung:
+        filter_pola["pola"] = mengandung
+    return await dapatkan_collection(POLA_SEKUENS_COLLECTION).find(
+        filter_pola, projection={"_id": 0}
+    ).sort([("jumlah_mahasiswa", -1), ("panjang", -1)]).limit(limit).to_list(length=limit)
+
+
+penjadwal_pola_sekuens = PenjadwalPeriodik(
+    "pola_sekuens",
+    settings.pola_sekuens_interval,
+    tambang_pola_sekuens,
+    jeda_awal_detik=90.0
+)
@@ -0,0 +1,265 @@
+"""
+Service Rekomendasi - ranking exercise & sumber daya per mahasiswa (batch NumPy)
+
+Skor setiap item untuk setiap mahasiswa dihitung sekaligus sebagai operasi matriks:
+- gap      : seberapa lemah mahasiswa di topik item (1 - penguasaan/100)
+- kesulitan: kecocokan tingkatKesulitan item dengan tingkatKemahiran mahasiswa
+- prasyarat: porsi prerequisite topik item (TopikPembelajaran) yang sudah dikuasai
+
+skor = BOBOT_GAP * gap + BOBOT_KESULITAN * kesulitan + BOBOT_PRASYARAT * prasyarat
+
+Top-N per mahasiswa disimpan di collection "rekomendasi_mahasiswa", sehingga endpoint
+rekomendasi cukup satu find_one by _id. Job dijalankan berkala oleh PenjadwalPeriodik.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.database import dapatkan_collection
+from app.repositories.user_repository import USERS_COLLECTION
+from app.services.katalog_service import IndeksKatalog, indeks_exercise, indeks_sumber_daya
+from app.utils.penjadwal import PenjadwalPeriodik
+
+logger = logging.getLogger(__name__)
+
+REKOMENDASI_COLLECTION = "rekomendasi_mahasiswa"
+
+LEVEL_KESULITAN = {"pemula": 0.0, "menengah": 1.0, "mahir": 2.0}
+
+# Gap untuk topik yang belum punya progress (belum pernah error = belum tentu lemah)
+GAP_TANPA_PROGRESS = 0.2
+
+# Penguasaan minimal agar prerequisite dianggap terpenuhi
+BATAS_PRASYARAT_DIKUASAI = 70.0
+
+# Jumlah mahasiswa per blok perhitungan (membatasi memori matriks S x I)
+UKURAN_BLOK_MAHASISWA = 1024
+
+
+def hitung_skor(
+    penguasaan: np.ndarray,
+    level_mahasiswa: np.ndarray,
+    topik_item: np.ndarray,
+    level_item: np.ndarray,
+    prasyarat: np.ndarray
+) -> np.ndarray:
+    """
+    Hitung matriks skor mahasiswa x item
+
+    Args:
+        penguasaan: (S, T) tingkat penguasaan 0-100, NaN = belum ada progress
+        level_mahasiswa: (S,) level kemahiran (0 pemula .. 2 mahir)
+        topik_item: (I, T) 1 jika item membahas topik
+        level_item: (I,) level kesulitan item
+        prasyarat: (T, T) prasyarat[t, p] = 1 jika p prerequisite dari t
+
+    Returns:
+        (S, I) skor float32, makin besar makin relevan
+    """
+    tanpa_progress = np.isnan(penguasaan)
+
+    # Gap penguasaan per topik, dirata-rata ke topik item
+    gap = np.where(tanpa_progress, GAP_TANPA_PROGRESS, 1.0 - np.nan_to_num(penguasaan) / 100.0)
+    jumlah_topik = topik_item.sum(axis=1)
+    bobot_topik = topik_item / np.maximum(jumlah_topik, 1.0)[:, None]
+    skor_gap = gap @ bobot_topik.T
+
+    # Kecocokan kesulitan: 1 jika sama, 0 jika beda dua level
+    skor_kesulitan = 1.0 - np.abs(level_mahasiswa[:, None] - level_item[None, :]) / 2.0
+
+    # Kesiapan prasyarat per topik (topik tanpa prerequisite = siap)
+    dikuasai = (tanpa_progress | (np.nan_to_num(penguasaan) >= BATAS_PRASYARAT_DIKUASAI)).astype(np.float32)
+    jumlah_prasyarat = prasyarat.sum(axis=1)
+    kesiapan_topik = np.where(
+        jumlah_prasyarat > 0,
+        (dikuasai @ prasyarat.T) / np.maximum(jumlah_prasyarat, 1.0),
+        1.0
+    )
+    # Item tanpa topik dianggap siap
+    skor_prasyarat = kesiapan_topik @ bobot_topik.T + (1.0 - bobot_topik.sum(axis=1))[None, :]
+
+    skor = (
+        settings.rekomendasi_bobot_gap * skor_gap
+        + settings.rekomendasi_bobot_kesulitan * skor_kesulitan
+        + settings.rekomendasi_bobot_prasyarat * skor_prasyarat
+    )
+    return skor.astype(np.float32)
+
+
+def top_n(skor: np.ndarray, n: int) -> np.ndarray:
+    """
+    Indeks n item dengan skor tertinggi per baris, terurut menurun
+
+    Returns:
+        (S, min(n, I)) indeks item
+    """
+    n = min(n, skor.shape[1])
+    if n == 0:
+        return np.empty((skor.shape[0], 0), dtype=np.int64)
+    kandidat = np.argpartition(-skor, n - 1, axis=1)[:, :n]
+    skor_kandidat = np.take_along_axis(skor, kandidat, axis=1)
+    urutan = np.argsort(-skor_kandidat, axis=1, kind="stable")
+    return np.take_along_axis(kandidat, urutan, axis=1)
+
+
+def _matriks_item(
+    item_list: Sequence[Dict[str, Any]],
+    kolom_topik: Dict[str, int],
+    ambil_topik: Any
+) -> Tuple[np.ndarray, np.ndarray]:
+    topik_item = np.zeros((len(item_list), len(kolom_topik)), dtype=np.float32)
+    level_item = np.empty(len(item_list), dtype=np.float32)
+    for i, item in enumerate(item_list):
+        for topik in ambil_topik(item):
+            topik_item[i, kolom_topik[topik]] = 1.0
+        level_item[i] = LEVEL_KESULITAN.get(item["tingkat_kesulitan"], 0.0)
+    return topik_item, level_item
+
+
+def _ranking_semua(
+    penguasaan: np.ndarray,
+    level_mahasiswa: np.ndarray,
+    prasyarat: np.ndarray,
+    katalog: Dict[str, Tuple[np.ndarray, np.ndarray]]
+) -> Dict[str, np.ndarray]:
+    """Hitung top-N semua mahasiswa per katalog, per blok (dijalankan di thread)"""
+    hasil: Dict[str, List[np.ndarray]] = {nama: [] for nama in katalog}
+    for awal in range(0, penguasaan.shape[0], UKURAN_BLOK_MAHASISWA):
+        blok = slice(awal, awal + UKURAN_BLOK_MAHASISWA)
+        for nama, (topik_item, level_item) in katalog.items():
+            skor = hitung_skor(penguasaan[blok], level_mahasiswa[blok], topik_item, level_item, prasyarat)
+            # Tie-break: item lebih baru (indeks lebih kecil) sedikit diutamakan
+            skor -= np.arange(skor.shape[1], dtype=np.float32) * 1e-6
+            hasil[nama].append(top_n(skor, settings.rekomendasi_top_n))
+    return {
+        nama: np.concatenate(bagian) if bagian else np.empty((0, 0), dtype=np.int64)
+        for nama, bagian in hasil.items()
+    }
+
+
+async def hitung_rekomendasi_semua() -> int:
+    """
+    Batch job: hitung ulang top-N exercise & sumber daya untuk semua mahasiswa
+
+    Returns:
+        Jumlah mahasiswa yang rekomendasinya diperbarui
+    """
+    mulai = time.perf_counter()
+    await asyncio.gather(indeks_exercise.pastikan_segar(), indeks_sumber_daya.pastikan_segar())
+    daftar_exercise = indeks_exercise.semua()
+    daftar_sumber_daya = indeks_sumber_daya.semua()
+
+    # Data mahasiswa, progress dan prerequisite topik
+    mahasiswa_list = await dapatkan_collection(USERS_COLLECTION).find(
+        {"role": "mahasiswa"}, projection={"tingkatKemahiran": 1}
+    ).to_list(length=None)
+    if not mahasiswa_list:
+        return 0
+
+    progress_list = await dapatkan_collection("progress_belajar").find(
+        {}, projection={"_id": 0, "id_mahasiswa": 1, "topik": 1, "tingkat_penguasaan": 1}, batch_size=5000
+    ).to_list(length=None)
+    topik_list = await dapatkan_collection("topik_pembelajaran").find(
+        {}, projection={"_id": 0, "nama": 1, "prerequisite": 1}
+    ).to_list(length=None)
+
+    # Ruang topik = gabungan semua sumber
+    progress_list = [p for p in progress_list if p.get("topik")]
+    semua_topik = {p["topik"] for p in progress_list}
+    semua_topik.update(t["nama"] for t in topik_list)
+    semua_topik.update(p for t in topik_list for p in t.get("prerequisite", []))
+    semua_topik.update(item["topik"] for item in daftar_exercise if item["topik"])
+    semua_topik.update(topik for item in daftar_sumber_daya for topik in item["topik_terkait"])
+    kolom_topik = {topik: j for j, topik in enumerate(sorted(semua_topik))}
+
+    baris_mahasiswa = {m["_id"]: i for i, m in enumerate(mahasiswa_list)}
+    level_mahasiswa = np.array(
+        [LEVEL_KESULITAN.get(m.get("tingkatKemahiran", "pemula"), 0.0) for m in mahasiswa_list],
+        dtype=np.float32
+    )
+    penguasaan = np.full((len(mahasiswa_list), len(kolom_topik)), np.nan, dtype=np.float32)
+    for p in progress_list:
+        i = baris_mahasiswa.get(p["id_mahasiswa"])
+        if i is not None:
+            penguasaan[i, kolom_topik[p["topik"]]] = p.get("tingkat_penguasaan", 0)
+
+    prasyarat = np.zeros((len(kolom_topik), len(kolom_topik)), dtype=np.float32)
+    for t in topik_list:
+        for p in t.get("prerequisite", []):
+            prasyarat[kolom_topik[t["nama"]], kolom_topik[p]] = 1.0
+
+    katalog = {
+        "exercise": _matriks_item(daftar_exercise, kolom_topik, lambda item: [item["topik"]] if item["topik"] else []),
+        "sumber_daya": _matriks_item(daftar_sumber_daya, kolom_topik, lambda item: item["topik_terkait"]),
+    }
+    ranking = await asyncio.to_thread(_ranking_semua, penguasaan, level_mahasiswa, prasyarat, katalog)
+
+    # Simpan top-N per mahasiswa (bulk upsert per batch)
+    collection = dapatkan_collection(REKOMENDASI_COLLECTION)
+    sekarang = datetime.utcnow()
+    operasi: List[UpdateOne] = []
+    for i, mahasiswa in enumerate(mahasiswa_list):
+        operasi.append(UpdateOne(
+            {"_id": str(mahasiswa["_id"])},
+            {"$set": {
+                "exercise": [daftar_exercise[j]["id"] for j in ranking["exercise"][i]],
+                "sumber_daya": [daftar_sumber_daya[j]["id"] for j in ranking["sumber_daya"][i]],
+                "dihitung": sekarang
+            }},
+            upsert=True
+        ))
+        if len(operasi) >= 500:
+            await collection.bulk_write(operasi, ordered=False)
+            operasi = []
+    if operasi:
+        await collection.bulk_write(operasi, ordered=False)
+
+    logger.info(
+        f"📊 Rekomendasi dihitung untuk {len(mahasiswa_list)} mahasiswa x "
+        f"({len(daftar_exercise)} exercise + {len(daftar_sumber_daya)} sumber daya) "
+        f"dalam {time.perf_counter() - mulai:.1f}s"
+    )
+    return len(mahasiswa_list)
+
+
+async def ambil_rekomendasi_tersimpan(
+    id_mahasiswa: str,
+    indeks: IndeksKatalog,
+    jenis: str,
+    limit: int
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Ambil rekomendasi hasil batch untuk satu mahasiswa
+
+    Args:
+        id_mahasiswa: ID mahasiswa
+        indeks: Index katalog untuk mengambil detail item
+        jenis: "exercise" atau "sumber_daya"
+        limit: Maksimal item
+
+    Returns:
+        List item, atau None jika belum pernah dihitung (pakai fallback)
+    """
+    dokumen = await dapatkan_collection(REKOMENDASI_COLLECTION).find_one(
+        {"_id": id_mahasiswa}, projection={jenis: 1}
+    )
+    if not dokumen or not dokumen.get(jenis):
+        return None
+
+    await indeks.pastikan_segar()
+    return indeks.ambil(dokumen[jenis][:limit])
+
+
+penjadwal_rekomendasi = PenjadwalPeriodik(
+    "rekomendasi",
+    settings.rekomendasi_interval,
+    hitung_rekomendasi_semua,
+    jeda_awal_detik=30.0
+)
@@ -0,0 +1,135 @@
+"""
+Service Router Model - pilih model LLM kecil (cepat & murah) atau besar per request
+
+Kompleksitas request diestimasi dari sinyal yang sudah tersedia sebelum LLM dipanggil:
+- Kelas error: error sintaks / nama (NameError, SyntaxError, ...) mudah dijelaskan,
+  error runtime tipe/indeks sedang, sisanya (RecursionError, exception Java/C,
+  pesan tanpa kelas error) dianggap sulit
+- Panjang kode (baris) dan kedalaman traceback (jumlah frame)
+- Bahasa: Python/JavaScript paling banyak contoh di data latih model kecil
+- Tingkat kemahiran mahasiswa: error mahasiswa mahir cenderung lebih halus
+
+Skor berbobot 0-1; skor >= MODEL_ROUTER_AMBANG -> model besar. Dengan bobot default
+sebagian besar error mahasiswa pemula dilayani model kecil. Jika output model kecil
+gagal di-parse, analisis diulang dengan model besar (fallback). Setiap percobaan
+dicatat ke MetrikAI (rute, model, latensi, token, biaya, fallback).
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.database import prisma
+from app.services.ai_service import RUTE_BESAR, RUTE_KECIL
+from app.utils.drain import baris_utama
+
+_POLA_KELAS_ERROR = re.compile(r"\b([A-Za-z_][\w.]*(?:Error|Exception))\b")
+_POLA_FRAME = re.compile(r"^\s*(?:File\s|at\s)", re.MULTILINE)
+
+KELAS_ERROR_MUDAH = {
+    "SyntaxError", "IndentationError", "TabError", "NameError", "ZeroDivisionError",
+    "ImportError", "ModuleNotFoundError", "ReferenceError", "UnboundLocalError",
+}
+KELAS_ERROR_SEDANG = {
+    "TypeError", "AttributeError", "IndexError", "KeyError", "ValueError",
+    "RangeError", "NullPointerException", "ArrayIndexOutOfBoundsException",
+    "ArithmeticException", "NumberFormatException", "FileNotFoundError",
+}
+BAHASA_UMUM = {"python", "javascript", "typescript"}
+SKOR_KEMAHIRAN = {"pemula": 0.0, "menengah": 0.5, "mahir": 1.0}
+
+# Bobot sinyal (jumlah = 1)
+BOBOT_KELAS_ERROR = 0.4
+BOBOT_PANJANG_KODE = 0.25
+BOBOT_TRACEBACK = 0.1
+BOBOT_BAHASA = 0.1
+BOBOT_KEMAHIRAN = 0.15
+
+BARIS_KODE_MAKS = 80  # Kode >= 80 baris dianggap panjang maksimal
+FRAME_MAKS = 5
+
+
+@dataclass
+class KeputusanRute:
+    rute: str
+    skor: float
+    kelas_error: Optional[str]
+
+
+def kelas_error(pesan_error: str) -> Optional[str]:
+    """Nama kelas error (tanpa package Java) dari baris utama pesan, jika ada"""
+    cocok = _POLA_KELAS_ERROR.search(baris_utama(pesan_error))
+    return cocok.group(1).rsplit(".", 1)[-1] if cocok else None
+
+
+def estimasi_kompleksitas(kode: str, pesan_error: str, bahasa: str, tingkat_kemahiran: str) -> KeputusanRute:
+    """
+    Estimasi kompleksitas request analisis dan pilih rute model
+
+    Args:
+        kode: Kode program mahasiswa
+        pesan_error: Pesan error
+        bahasa: Bahasa pemrograman
+        tingkat_kemahiran: pemula / menengah / mahir
+
+    Returns:
+        KeputusanRute (rute, skor 0-1, kelas error yang terdeteksi)
+    """
+    kelas = kelas_error(pesan_error)
+    if kelas in KELAS_ERROR_MUDAH:
+        skor_kelas = 0.0
+    elif kelas in KELAS_ERROR_SEDANG:
+        skor_kelas = 0.4
+    else:
+        skor_kelas = 1.0
+
+    skor = (
+        BOBOT_KELAS_ERROR * skor_kelas
+        + BOBOT_PANJANG_KODE * min(kode.count("\n") + 1, BARIS_KODE_MAKS) / BARIS_KODE_MAKS
+        + BOBOT_TRACEBACK * min(len(_POLA_FRAME.findall(pesan_error)), FRAME_MAKS) / FRAME_MAKS
+        + BOBOT_BAHASA * (0.0 if bahasa.lower() in BAHASA_UMUM else 1.0)
+        + BOBOT_KEMAHIRAN * SKOR_KEMAHIRAN.get(tingkat_kemahiran, 0.0)
+    )
+    if not settings.model_router_aktif:
+        rute = RUTE_KECIL
+    else:
+        rute = RUTE_BESAR if skor >= settings.model_router_ambang else RUTE_KECIL
+    return KeputusanRute(rute=rute, skor=round(skor, 4), kelas_error=kelas)
+
+
+def hitung_biaya(rute: str, token_input: int, token_output: int) -> float:
+    """Biaya (USD) satu panggilan berdasarkan harga per 1 juta token rute tersebut"""
+    if rute == RUTE_BESAR:
+        harga_input, harga_output = settings.llm_harga_input_besar, settings.llm_harga_output_besar
+    else:
+        harga_input, harga_output = settings.llm_harga_input_kecil, settings.llm_harga_output_kecil
+    return (token_input * harga_input + token_output * harga_output) / 1_000_000
+
+
+async def catat_metrik_ai(percobaan: List[Dict[str, Any]], id_submisi: Optional[str] = None) -> None:
+    """
+    Simpan percobaan panggilan LLM ke MetrikAI
+
+    Args:
+        percobaan: Dict per panggilan (provider, model, rute, skor, token_input,
+            token_output, durasi, berhasil, fallback)
+        id_submisi: SubmisiError hasil analisis (None jika analisis gagal)
+    """
+    for p in percobaan:
+        data: Dict[str, Any] = {
+            "model": p["model"],
+            "provider": p["provider"],
+            "rute": p["rute"],
+            "skorKompleksitas": p["skor"],
+            "fallback": p["fallback"],
+            "tokenInput": p["token_input"],
+            "tokenOutput": p["token_output"],
+            "totalToken": p["token_input"] + p["token_output"],
+            "biaya": hitung_biaya(p["rute"], p["token_input"], p["token_output"]),
+            "waktuRespons": p["durasi"],
+            "statusBerhasil": p["berhasil"],
+        }
+        if id_submisi:
+            data["idSubmisi"] = id_submisi
+        await prisma.metrikai.create(data=data)
@@ -0,0 +1,279 @@
+"""
+Service Template Error - kelompokkan pesan_error ke template stabil (Drain, app.utils.drain)
+
+Setiap SubmisiError baru mendapat id_template (kunci grouping yang tidak
+bergantung pada wording tipe_error dari LLM). Template disimpan di collection
+"template_error": {_id: id_template, template, token, jumlah, contoh, dibuat, terakhir}.
+
+- Pohon Drain di memori per worker, dibangun dari collection saat pertama dipakai;
+  kluster baru / template yang digeneralisasi langsung ditulis dan versi di
+  "meta_katalog" dinaikkan sehingga worker lain memuat ulang (pola index katalog)
+- ID kluster = hash token pesan pertamanya: dua worker yang membuat kluster untuk
+  pesan yang sama sebelum saling sinkron tetap menghasilkan ID yang sama
+- Backfill background untuk submisi lama yang belum punya id_template
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.database import dapatkan_collection
+from app.services.katalog_service import CacheBerversi
+from app.utils.drain import Drain, KlusterTemplate
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_COLLECTION = "template_error"
+NAMA_META_TEMPLATE = "template_error"
+PANJANG_CONTOH = 500
+
+_index_dibuat = False
+
+
+async def _pastikan_index() -> None:
+    global _index_dibuat
+    if not _index_dibuat:
+        await dapatkan_collection(TEMPLATE_COLLECTION).create_index([("jumlah", -1)])
+        _index_dibuat = True
+
+
+def _drain_baru() -> Drain:
+    return Drain(
+        kedalaman=settings.template_error_kedalaman,
+        ambang=settings.template_error_ambang,
+        maks_anak=settings.template_error_maks_anak
+    )
+
+
+def _update_template(kluster: KlusterTemplate, berubah: bool, jumlah: int, pesan: str, waktu: datetime) -> Dict[str, Any]:
+    update: Dict[str, Any] = {
+        "$inc": {"jumlah": jumlah},
+        "$set": {"terakhir": waktu},
+        "$setOnInsert": {"dibuat": waktu, "contoh": pesan[:PANJANG_CONTOH]}
+    }
+    if berubah:
+        update["$set"].update({"template": kluster.template, "token": kluster.token})
+    return update
+
+
+class MinerTemplateError(CacheBerversi[Drain]):
+    """Pohon Drain yang di-cache per worker"""
+
+    def __init__(self) -> None:
+        super().__init__(NAMA_META_TEMPLATE, _drain_baru())
+
+    async def muat_ulang(self) -> Drain:
+        mulai = time.perf_counter()
+        drain = _drain_baru()
+        async for doc in dapatkan_collection(TEMPLATE_COLLECTION).find({}, projection={"token": 1}):
+            drain.muat_kluster(doc["_id"], doc.get("token") or [])
+        logger.info(f"📊 Template error: {len(drain)} template ({(time.perf_counter() - mulai) * 1000:.0f} ms)")
+        return drain
+
+    async def tetapkan_template(self, pesan_error: str) -> Optional[str]:
+        """
+        Tentukan template untuk pesan error baru dan catat frekuensinya
+
+        Args:
+            pesan_error: Pesan error dari compiler/interpreter
+
+        Returns:
+            id_template, atau None jika pesan kosong
+        """
+        drain = await self.pastikan_segar()
+        kluster, berubah = drain.tambah(pesan_error)
+        if kluster is None:
+            return None
+        await _pastikan_index()
+        await dapatkan_collection(TEMPLATE_COLLECTION).update_one(
+            {"_id": kluster.id},
+            _update_template(kluster, berubah, 1, pesan_error, datetime.utcnow()),
+            upsert=True
+        )
+        if berubah:
+            await self.naikkan_versi()
+        return kluster.id
+
+
+miner_template_error = MinerTemplateError()
+
+
+async def ambil_template_teratas(limit: int) -> List[Dict[str, Any]]:
+    """
+    Template error paling sering + sebaran tipe_error (wording LLM) dan jumlah mahasiswa
+
+    Args:
+        limit: Jumlah template
+
+    Returns:
+        List template terurut jumlah submisi
+    """
+    template = await dapatkan_collection(TEMPLATE_COLLECTION).find(
+        {}, projection={"token": 0}
+    ).sort("jumlah", -1).limit(limit).to_list(length=limit)
+    if not template:
+        return []
+
+    pipeline = [
+        {"$match": {"id_template": {"$in": [t["_id"] for t in template]}}},
+        {"$group": {
+            "_id": {"id_template": "$id_template", "tipe_error": "$tipe_error"},
+            "jumlah": {"$sum": 1},
+            "mahasiswa": {"$addToSet": "$id_mahasiswa"}
+        }},
+        {"$sort": {"jumlah": -1}},
+        {"$group": {
+            "_id": "$_id.id_template",
+            "tipe_error": {"$push": {"tipe_error": "$_id.tipe_error", "jumlah": "$jumlah"}},
+            "mahasiswa": {"$push": "$mahasiswa"}
+        }},
+        {"$project": {
+            "tipe_error": {"$slice": ["$tipe_error", 5]},
+            "jumlah_mahasiswa": {"$size": {"$reduce": {
+                "input": "$mahasiswa", "initialValue": [], "in": {"$setUnion": ["$$value", "$$this"]}
+            }}}
+        }}
+    ]
+    rincian = {doc["_id"]: doc async for doc in dapatkan_collection("submisi_error").aggregate(pipeline)}
+
+    return [
+        {
+            "id_template": t["_id"],
+            "template": t.get("template", ""),
+            "jumlah": t.get("jumlah", 0),
+            "jumlah_mahasiswa": rincian.get(t["_id"], {}).get("jumlah_mahasiswa", 0),
+            "tipe_error": rincian.get(t["_id"], {}).get("tipe_error", []),
+            "contoh": t.get("contoh"),
+            "dibuat": t.get("dibuat"),
+            "terakhir": t.get("terakhir")
+        }
+        for t in template
+    ]
+
+
+# ==================== BACKFILL ====================
+
+_status_backfill: Dict[str, Any] = {"berjalan": False, "diproses": 0, "mulai": None, "selesai": None, "error": None}
+_task_backfill: Optional[asyncio.Task] = None
+
+
+async def backfill_template(ukuran_batch: Optional[int] = None) -> int:
+    """
+    Tetapkan id_template untuk submisi lama (urut _id, sama seperti urutan masuk)
+
+    Drain per pesan hanya mikrodetik sehingga dijalankan langsung di event loop;
+    tulisan ke database dikumpulkan per batch.
+
+    Returns:
+        Jumlah submisi yang diperbarui
+    """
+    ukuran_batch = ukuran_batch or settings.template_error_backfill_ukuran_batch
+    submisi = dapatkan_collection("submisi_error")
+    template = dapatkan_collection(TEMPLATE_COLLECTION)
+    await _pastikan_index()
+    mulai = time.perf_counter()
+    total = 0
+    terakhir: Optional[Any] = None
+
+    while True:
+        filter_batch: Dict[str, Any] = {"id_template": {"$exists": False}}
+        if terakhir is not None:
+            filter_batch["_id"] = {"$gt": terakhir}
+        batch = await submisi.find(
+            filter_batch, projection={"pesan_error": 1}
+        ).sort("_id", 1).limit(ukuran_batch).to_list(length=ukuran_batch)
+        if not batch:
+            break
+        terakhir = batch[-1]["_id"]
+
+        drain = await miner_template_error.pastikan_segar()
+        operasi_submisi: List[UpdateOne] = []
+        per_kluster: Dict[str, Dict[str, Any]] = {}
+        for doc in batch:
+            pesan = doc.get("pesan_error") or ""
+            kluster, berubah = drain.tambah(pesan)
+            # Pesan kosong tetap ditandai (None) agar tidak dipindai ulang di backfill berikutnya
+            operasi_submisi.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"id_template": kluster.id if kluster else None}}))
+            if kluster is None:
+                continue
+            info = per_kluster.setdefault(kluster.id, {"kluster": kluster, "berubah": False, "jumlah": 0, "pesan": pesan})
+            info["berubah"] |= berubah
+            info["jumlah"] += 1
+
+        if per_kluster:
+            sekarang = datetime.utcnow()
+            await template.bulk_write([
+                UpdateOne(
+                    {"_id": id_kluster},
+                    _update_template(info["kluster"], info["berubah"], info["jumlah"], info["pesan"], sekarang),
+                    upsert=True
+                )
+                for id_kluster, info in per_kluster.items()
+            ], ordered=False)
+            if any(info["berubah"] for info in per_kluster.values()):
+                await miner_template_error.naikkan_versi()
+        if operasi_submisi:
+            await submisi.bulk_write(operasi_submisi, ordered=False)
+            total += len(operasi_submisi)
+        _status_backfill["diproses"] = total
+
+    logger.info(f"✅ Backfill template error: {total} submisi dalam {time.perf_counter() - mulai:.1f}s")
+    return total
+
+
+async def _jalankan_backfill() -> None:
+    try:
+        _status_backfill["diproses"] = await backfill_template()
+    except asyncio.CancelledError:
+        _status_backfill["error"] = "Dibatalkan"
+        raise
+    except Exception as e:
+        logger.warning(f"⚠️ Backfill template error gagal: {e}")
+        _status_backfill["error"] = str(e)
+    finally:
+        _status_backfill["berjalan"] = False
+        _status_backfill["selesai"] = datetime.utcnow()
+
+
+def mulai_backfill_template() -> Dict[str, Any]:
+    """Mulai backfill di background (jika belum berjalan) dan kembalikan statusnya"""
+    global _task_backfill
+    if not _status_backfill["berjalan"]:
+        _status_backfill.update({
+            "berjalan": True, "diproses": 0, "mulai": datetime.utcnow(), "selesai": None, "error": None
+        })
+        _task_backfill = asyncio.create_task(_jalankan_backfill())
+    return dict(_status_backfill)
+
+
+def dapatkan_status_backfill_template() -> Dict[str, Any]:
+    return dict(_status_backfill)
+
+
+async def batalkan_backfill_template() -> None:
+    """Batalkan backfill yang sedang berjalan (dipanggil saat shutdown)"""
+    if _task_backfill is not None and not _task_backfill.done():
+        _task_backfill.cancel()
+        try:
+            await _task_backfill
+        except asyncio.CancelledError:
+            pass
+
+
+if __name__ == "__main__":
+    # Backfill manual: python -m app.services.template_error_service (dari direktori backend/)
+    from app.database import putuskan_database, sambungkan_database
+
+    async def _main() -> None:
+        await sambungkan_database()
+        try:
+            print(f"✅ {await backfill_template()} submisi diperbarui")
+        finally:
+            await putuskan_database()
+
+    asyncio.run(_main())
@@ -2,19 +2,58 @@
 Utilities untuk autentikasi dan JWT
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional
 from jose import JWTError, jwt  # type: ignore
+import asyncio
 import bcrypt
+import hashlib
+import importlib
+import logging
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer  # type: ignore
 from fastapi.security.http import HTTPAuthorizationCredentials as HTTPAuthCredentials  # type: ignore
 
 from app.config import settings
+from app.utils.cache import CacheTTL
+
+logger = logging.getLogger(__name__)
 
 # Bearer token scheme
 skema_bearer = HTTPBearer()
 
+# Cache klaim JWT: digest token -> klaim hasil decode.
+# SPA mahasiswa mem-poll dashboard/history dengan token yang sama berulang kali,
+# jadi verifikasi HMAC + parsing JSON cukup dilakukan sekali per token.
+_cache_klaim_jwt = CacheTTL("jwt", ukuran_maks=settings.jwt_cache_ukuran, ttl_detik=settings.jwt_cache_ttl)
+
+
+# Executor khusus bcrypt: hashing sengaja lambat (~100-300 ms) dan memblokir,
+# jadi dijalankan di thread pool terbatas agar event loop tetap melayani request lain.
+# bcrypt melepas GIL selama hashing, sehingga thread benar-benar berjalan paralel.
+_executor_bcrypt: Optional[ThreadPoolExecutor] = None
+
+
+def _dapatkan_executor_bcrypt() -> ThreadPoolExecutor:
+    """Dapatkan executor bcrypt singleton (ukuran dari BCRYPT_MAX_WORKERS)"""
+    global _executor_bcrypt
+    if _executor_bcrypt is None:
+        _executor_bcrypt = ThreadPoolExecutor(
+            max_workers=settings.bcrypt_max_workers,
+            thread_name_prefix="bcrypt"
+        )
+    return _executor_bcrypt
+
+
+def tutup_executor_bcrypt() -> None:
+    """Matikan executor bcrypt (dipanggil saat shutdown)"""
+    global _executor_bcrypt
+    if _executor_bcrypt is not None:
+        _executor_bcrypt.shutdown(wait=False, cancel_futures=True)
+        _executor_bcrypt = None
+
 
 def hash_password(password: str) -> str:
     """
@@ -27,7 +66,7 @@ def hash_password(password: str) -> str:
         str: Hashed password (bcrypt format)
     """
     # Generate salt dan hash password
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -53,6 +92,45 @@ def verifikasi_password(password_plain: str, password_hash: str) -> bool:
         return False
 
 
+async def hash_password_async(password: str) -> str:
+    """
+    Versi async dari hash_password, dijalankan di executor bcrypt
+    (gunakan ini di route handler async)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_dapatkan_executor_bcrypt(), hash_password, password)
+
+
+async def verifikasi_password_async(password_plain: str, password_hash: str) -> bool:
+    """
+    Versi async dari verifikasi_password, dijalankan di executor bcrypt
+    (gunakan ini di route handler async)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _dapatkan_executor_bcrypt(),
+        verifikasi_password,
+        password_plain,
+        password_hash
+    )
+
+
+def perlu_rehash(password_hash: str) -> bool:
+    """
+    Cek apakah hash dibuat dengan cost factor berbeda dari BCRYPT_ROUNDS
+    
+    Format bcrypt: $2b$<cost>$<salt+hash>
+    
+    Returns:
+        bool: True jika hash perlu dibuat ulang dengan cost saat ini
+    """
+    try:
+        cost = int(password_hash.split("$")[2])
+    except (IndexError, ValueError, AttributeError):
+        return False
+    return cost != settings.bcrypt_rounds
+
+
 def buat_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Buat JWT access token
@@ -81,15 +159,54 @@ def buat_access_token(data: dict, expires_delta: Optional[timedelta] = None) ->
     return encoded_jwt
 
 
-def verifikasi_token(token: str) -> str:
+def _buat_decoder_jwt() -> Callable[[str], dict]:
     """
-    Verifikasi JWT token dan extract user_id
+    Pilih backend decode JWT sesuai JWT_BACKEND ("jose" atau "pyjwt").
+    PyJWT lebih cepat tapi opsional; jika tidak terinstall, fallback ke python-jose.
+    
+    Returns:
+        Fungsi decode(token) -> klaim, yang melempar JWTError jika token invalid
+    """
+    if settings.jwt_backend == "pyjwt":
+        try:
+            pyjwt: Any = importlib.import_module("jwt")
+            
+            def decode_pyjwt(token: str) -> dict:
+                try:
+                    return pyjwt.decode(
+                        token,
+                        settings.jwt_secret_key,
+                        algorithms=[settings.jwt_algorithm]
+                    )
+                except pyjwt.PyJWTError as e:
+                    raise JWTError(str(e))
+            
+            return decode_pyjwt
+        except (ImportError, AttributeError):
+            logger.warning("⚠️ PyJWT tidak terinstall, JWT_BACKEND fallback ke python-jose")
+    
+    def decode_jose(token: str) -> dict:
+        return jwt.decode(
+            token,
+            settings.jwt_secret_key,
+            algorithms=[settings.jwt_algorithm]
+        )
+    
+    return decode_jose
+
+
+_decode_jwt = _buat_decoder_jwt()
+
+
+def dekode_token(token: str) -> dict:
+    """
+    Decode dan validasi JWT token (hasil di-cache per token sampai exp)
     
     Args:
         token: JWT token string
     
     Returns:
-        str: user_id dari token
+        dict: Klaim token (minimal berisi "sub")
     
     Raises:
         HTTPException: Jika token invalid atau expired
@@ -100,21 +217,48 @@ def verifikasi_token(token: str) -> str:
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    kunci = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = _cache_klaim_jwt.dapatkan(kunci)
+    
+    if payload is not None:
+        # Entri cache tidak pernah melewati exp, tapi cek ulang untuk jaga-jaga
+        if payload.get("exp") is None or payload["exp"] > time.time():
+            return dict(payload)
+        _cache_klaim_jwt.hapus(kunci)
+        raise credentials_exception
+    
     try:
-        payload = jwt.decode(
-            token, 
-            settings.jwt_secret_key, 
-            algorithms=[settings.jwt_algorithm]
-        )
-        user_id: Optional[str] = payload.get("sub")
-        
-        if user_id is None:
-            raise credentials_exception
-            
-        return user_id
-        
+        payload = _decode_jwt(token)
     except JWTError:
         raise credentials_exception
+    
+    if payload.get("sub") is None:
+        raise credentials_exception
+    
+    # Simpan maksimal sampai token kadaluarsa
+    exp = payload.get("exp")
+    ttl = settings.jwt_cache_ttl
+    if exp is not None:
+        ttl = min(ttl, float(exp) - time.time())
+    _cache_klaim_jwt.simpan(kunci, payload, ttl_detik=ttl)
+    
+    return dict(payload)
+
+
+def verifikasi_token(token: str) -> str:
+    """
+    Verifikasi JWT token dan extract user_id
+    
+    Args:
+        token: JWT token string
+    
+    Returns:
+        str: user_id dari token
+    
+    Raises:
+        HTTPException: Jika token invalid atau expired
+    """
+    return dekode_token(token)["sub"]
 
 
 async def dapatkan_user_sekarang(credentials: HTTPAuthCredentials = Depends(skema_bearer)) -> str:
@@ -148,12 +292,12 @@ async def dapatkan_user_lengkap(credentials: HTTPAuthCredentials = Depends(skema
     Raises:
         HTTPException: Jika token invalid atau user tidak ditemukan
     """
-    from app.repositories.user_repository import cari_user_by_id
+    from app.repositories.user_repository import cari_user_by_id_cached
     
     token = credentials.credentials
     user_id = verifikasi_token(token)
     
-    user = await cari_user_by_id(user_id)
+    user = await cari_user_by_id_cached(user_id)
     
     if not user:
         raise HTTPException(
@@ -172,17 +316,27 @@ async def verifikasi_admin(credentials: HTTPAuthCredentials = Depends(skema_bear
         credentials: HTTP Bearer credentials dari request header
     
     Returns:
-        Dict: Admin user object
+        Dict: Admin user object (hanya id/role/status jika JWT_PERCAYA_KLAIM_ROLE aktif)
     
     Raises:
         HTTPException: Jika bukan admin atau token invalid
     """
-    from app.repositories.user_repository import cari_user_by_id
+    from app.repositories.user_repository import cari_user_by_id_cached
     
     token = credentials.credentials
-    user_id = verifikasi_token(token)
+    payload = dekode_token(token)
+    user_id = payload["sub"]
+    
+    # Jalur cepat (opsional): role & status dari klaim JWT yang sudah ditandatangani
+    if settings.jwt_percaya_klaim_role and "role" in payload:
+        if payload["role"] != "admin" or payload.get("status") == "suspended":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Akses ditolak. Hanya admin yang dapat mengakses resource ini."
+            )
+        return {"id": user_id, "role": payload["role"], "status": payload.get("status", "aktif")}
     
-    user = await cari_user_by_id(user_id)
+    user = await cari_user_by_id_cached(user_id)
     
     if not user:
         raise HTTPException(
@@ -190,7 +344,8 @@ async def verifikasi_admin(credentials: HTTPAuthCredentials = Depends(skema_bear
             detail="User tidak ditemukan"
         )
     
-    if user.get("role") != "admin":
+    # Cek yang sama dengan jalur klaim JWT: admin yang di-suspend tidak boleh lolos
+    if user.get("role") != "admin" or user.get("status") == "suspended":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Akses ditolak. Hanya admin yang dapat mengakses resource ini."
@@ -0,0 +1,118 @@
+"""
+Bayesian Knowledge Tracing (BKT)
+
+State per (mahasiswa, topik) = P(menguasai). Setiap observasi (benar/salah):
+1. Posterior  : P(L|benar) = P(L)(1-S) / [P(L)(1-S) + (1-P(L))G]
+                P(L|salah) = P(L)S / [P(L)S + (1-P(L))(1-G)]
+2. Transisi   : P(L') = P(L|obs) + (1 - P(L|obs)) T
+dengan parameter L0 (awal), T (belajar), S (slip), G (tebak).
+
+- perbarui_bkt(): update O(1) dari state sebelumnya (dipakai online)
+- jalankan_grid_bkt(): mode batch NumPy - semua grid parameter x semua urutan
+  observasi dihitung sekaligus dalam satu lintasan waktu, menghasilkan
+  log-likelihood per grid (untuk refit) dan state akhir per grid
+"""
+
+import itertools
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+_EPS = 1e-6
+
+
+@dataclass(frozen=True)
+class ParameterBKT:
+    p_awal: float = 0.3
+    p_transit: float = 0.1
+    p_slip: float = 0.1
+    p_tebak: float = 0.2
+
+    def ke_dict(self) -> Dict[str, float]:
+        return {"p_awal": self.p_awal, "p_transit": self.p_transit, "p_slip": self.p_slip, "p_tebak": self.p_tebak}
+
+
+# Grid refit; S & G < 0.5 agar model tidak degenerate (jawaban benar = bukti tidak menguasai)
+GRID_P_AWAL = (0.1, 0.3, 0.5, 0.7)
+GRID_P_TRANSIT = (0.02, 0.05, 0.1, 0.2, 0.3)
+GRID_P_SLIP = (0.05, 0.1, 0.2, 0.3)
+GRID_P_TEBAK = (0.1, 0.2, 0.3, 0.4)
+
+
+def grid_parameter() -> List[ParameterBKT]:
+    return [
+        ParameterBKT(*kombinasi)
+        for kombinasi in itertools.product(GRID_P_AWAL, GRID_P_TRANSIT, GRID_P_SLIP, GRID_P_TEBAK)
+    ]
+
+
+def perbarui_bkt(p_menguasai: float, benar: bool, parameter: ParameterBKT) -> float:
+    """
+    Satu langkah BKT (posterior + transisi)
+
+    Args:
+        p_menguasai: P(menguasai) sebelum observasi
+        benar: True jika observasi benar (exercise lulus), False jika error
+        parameter: Parameter BKT topik
+
+    Returns:
+        P(menguasai) setelah observasi
+    """
+    p = min(max(p_menguasai, _EPS), 1 - _EPS)
+    if benar:
+        posterior = p * (1 - parameter.p_slip) / (p * (1 - parameter.p_slip) + (1 - p) * parameter.p_tebak)
+    else:
+        posterior = p * parameter.p_slip / (p * parameter.p_slip + (1 - p) * (1 - parameter.p_tebak))
+    return posterior + (1 - posterior) * parameter.p_transit
+
+
+def jalankan_grid_bkt(
+    observasi: np.ndarray,
+    awal_urutan: np.ndarray,
+    panjang_urutan: np.ndarray,
+    grid: List[ParameterBKT]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Forward filtering BKT untuk banyak urutan x banyak parameter sekaligus
+
+    Observasi disimpan rata (ragged, tanpa padding): urutan i adalah
+    observasi[awal_urutan[i] : awal_urutan[i] + panjang_urutan[i]], urut waktu.
+    Urutan harus diurutkan dari yang terpanjang agar urutan aktif di langkah t
+    selalu berupa prefix.
+
+    Args:
+        observasi: (N,) 1 = benar, 0 = salah
+        awal_urutan: (U,) indeks awal tiap urutan
+        panjang_urutan: (U,) panjang tiap urutan, menurun
+        grid: Kandidat parameter (G)
+
+    Returns:
+        Tuple (log-likelihood (G x U), P(menguasai) akhir (G x U))
+    """
+    L0 = np.array([g.p_awal for g in grid], dtype=np.float64)[:, None]
+    T = np.array([g.p_transit for g in grid], dtype=np.float64)[:, None]
+    S = np.array([g.p_slip for g in grid], dtype=np.float64)[:, None]
+    G = np.array([g.p_tebak for g in grid], dtype=np.float64)[:, None]
+
+    jumlah_urutan = len(panjang_urutan)
+    p = np.repeat(L0, jumlah_urutan, axis=1)
+    log_likelihood = np.zeros((len(grid), jumlah_urutan), dtype=np.float64)
+    if jumlah_urutan == 0:
+        return log_likelihood, p
+
+    # Jumlah urutan yang masih aktif di tiap langkah waktu (prefix karena terurut menurun)
+    panjang_maks = int(panjang_urutan[0])
+    aktif_per_langkah = np.searchsorted(-panjang_urutan, -np.arange(1, panjang_maks + 1), side="right")
+
+    for t in range(panjang_maks):
+        n = int(aktif_per_langkah[t])
+        obs = observasi[awal_urutan[:n] + t].astype(bool)[None, :]
+        pt = p[:, :n]
+        p_benar = pt * (1 - S) + (1 - pt) * G
+        p_obs = np.where(obs, p_benar, 1 - p_benar)
+        log_likelihood[:, :n] += np.log(np.clip(p_obs, _EPS, None))
+        posterior = np.where(obs, pt * (1 - S), pt * S) / np.clip(p_obs, _EPS, None)
+        p[:, :n] = posterior + (1 - posterior) * T
+
+    return log_likelihood, p
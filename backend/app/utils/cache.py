@@ -0,0 +1,134 @@
+"""
+Cache in-process dengan TTL dan batas ukuran (LRU)
+
+Dipakai untuk data yang sering dibaca tapi jarang berubah (user terautentikasi,
+klaim JWT, dll). Setiap instance cache mencatat hit/miss ke metrik Prometheus.
+
+Catatan: cache ini per-proses. Pada deployment multi-worker, invalidasi hanya
+berlaku di worker yang melakukan write, jadi TTL harus dibuat pendek.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.utils.observabilitas import catat_cache
+
+
+class CacheTTL:
+    """
+    Cache LRU dengan TTL per entri
+
+    - dapatkan/simpan/hapus bersifat sinkron (aman di event loop tanpa lock)
+    - dapatkan_atau_muat menggabungkan miss yang bersamaan untuk kunci yang sama
+      (single-flight), jadi hanya satu query database yang berjalan
+    """
+
+    def __init__(self, nama: str, ukuran_maks: int = 1024, ttl_detik: float = 60.0):
+        self.nama = nama
+        self._ukuran_maks = ukuran_maks
+        self._ttl_detik = ttl_detik
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._sedang_dimuat: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def dapatkan(self, kunci: Hashable) -> Optional[Any]:
+        """
+        Ambil nilai dari cache
+
+        Returns:
+            Nilai jika ada dan belum kadaluarsa, None jika tidak
+        """
+        entri = self._data.get(kunci)
+        if entri is None:
+            catat_cache(self.nama, False)
+            return None
+
+        kadaluarsa, nilai = entri
+        if kadaluarsa <= time.monotonic():
+            del self._data[kunci]
+            catat_cache(self.nama, False)
+            return None
+
+        self._data.move_to_end(kunci)
+        catat_cache(self.nama, True)
+        return nilai
+
+    def simpan(self, kunci: Hashable, nilai: Any, ttl_detik: Optional[float] = None) -> None:
+        """
+        Simpan nilai ke cache (entri paling lama tidak dipakai dibuang jika penuh)
+
+        Args:
+            kunci: Kunci cache
+            nilai: Nilai yang disimpan
+            ttl_detik: TTL khusus untuk entri ini (default: TTL cache)
+        """
+        ttl = self._ttl_detik if ttl_detik is None else ttl_detik
+        if ttl <= 0:
+            return
+
+        self._data[kunci] = (time.monotonic() + ttl, nilai)
+        self._data.move_to_end(kunci)
+        while len(self._data) > self._ukuran_maks:
+            self._data.popitem(last=False)
+
+    def hapus(self, kunci: Hashable) -> None:
+        """
+        Invalidasi satu kunci, termasuk pemuatan yang sedang berjalan
+        (hasilnya tetap dikembalikan ke penunggu, tapi tidak disimpan)
+        """
+        self._data.pop(kunci, None)
+        self._sedang_dimuat.pop(kunci, None)
+
+    def kosongkan(self) -> None:
+        """Invalidasi seluruh isi cache"""
+        self._data.clear()
+
+    async def dapatkan_atau_muat(
+        self,
+        kunci: Hashable,
+        pemuat: Callable[[], Awaitable[Any]]
+    ) -> Optional[Any]:
+        """
+        Ambil dari cache, atau panggil pemuat jika miss lalu simpan hasilnya.
+        Hasil None tidak di-cache.
+
+        Args:
+            kunci: Kunci cache
+            pemuat: Coroutine function untuk memuat nilai dari sumber asli
+
+        Returns:
+            Nilai dari cache atau hasil pemuat
+        """
+        nilai = self.dapatkan(kunci)
+        if nilai is not None:
+            return nilai
+
+        # Single-flight: tunggu pemuatan yang sedang berjalan untuk kunci yang sama
+        sedang_dimuat = self._sedang_dimuat.get(kunci)
+        if sedang_dimuat is not None:
+            return await asyncio.shield(sedang_dimuat)
+
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        self._sedang_dimuat[kunci] = future
+        try:
+            nilai = await pemuat()
+            # Jangan simpan jika kunci di-invalidasi selama pemuatan berlangsung
+            if nilai is not None and self._sedang_dimuat.get(kunci) is future:
+                self.simpan(kunci, nilai)
+            future.set_result(nilai)
+            return nilai
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Tandai exception sudah "diambil" agar tidak ada warning jika tidak ada yang menunggu
+            future.exception()
+            raise
+        finally:
+            if self._sedang_dimuat.get(kunci) is future:
+                del self._sedang_dimuat[kunci]
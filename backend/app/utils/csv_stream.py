@@ -0,0 +1,90 @@
+"""
+Streaming CSV - tulis baris CSV secara bertahap ke chunk bytes
+
+Dipakai untuk export yang jumlah barisnya tidak terbatas (riwayat submisi, export
+kohort). Baris ditulis ke satu buffer StringIO kecil yang dipakai ulang, lalu
+di-flush sebagai chunk setiap mencapai ukuran tertentu, sehingga memori tetap
+konstan berapa pun jumlah barisnya. Opsional dikompresi gzip secara streaming.
+"""
+
+import csv
+import io
+import zlib
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Optional
+
+# Ukuran chunk yang dikirim ke klien (bytes sebelum kompresi)
+UKURAN_CHUNK_DEFAULT = 64 * 1024
+
+
+class _KompresorGzip:
+    """Kompresor gzip streaming (wbits=31 = header & trailer gzip)"""
+
+    def __init__(self, level: int = 6):
+        self._kompresor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def tulis(self, data: bytes) -> bytes:
+        return self._kompresor.compress(data)
+
+    def flush_sinkron(self) -> bytes:
+        """Keluarkan semua data yang tertahan tanpa menutup stream"""
+        return self._kompresor.flush(zlib.Z_SYNC_FLUSH)
+
+    def selesai(self) -> bytes:
+        return self._kompresor.flush()
+
+
+async def stream_csv(
+    header: Iterable[str],
+    baris: AsyncIterable[Iterable[Any]],
+    gzip: bool = False,
+    ukuran_chunk: int = UKURAN_CHUNK_DEFAULT
+) -> AsyncIterator[bytes]:
+    """
+    Ubah iterator baris async menjadi chunk bytes CSV (UTF-8)
+
+    Args:
+        header: Nama kolom
+        baris: Async iterable berisi list nilai per baris
+        gzip: Kompres output dengan gzip
+        ukuran_chunk: Flush buffer setiap mencapai ukuran ini (karakter)
+
+    Yields:
+        Chunk bytes siap dikirim (header langsung dikirim sebagai chunk pertama)
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    kompresor: Optional[_KompresorGzip] = _KompresorGzip() if gzip else None
+
+    def ambil_isi_buffer() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+        if kompresor is not None:
+            return kompresor.tulis(data)
+        return data
+
+    writer.writerow(header)
+    chunk = ambil_isi_buffer()
+    if kompresor is not None:
+        # Paksa header gzip + baris header CSV terkirim sekarang (first byte cepat)
+        chunk += kompresor.flush_sinkron()
+    yield chunk
+
+    try:
+        async for nilai in baris:
+            writer.writerow(nilai)
+            if buffer.tell() >= ukuran_chunk:
+                chunk = ambil_isi_buffer()
+                if chunk:
+                    yield chunk
+    finally:
+        # Download diputus klien: tutup sumber baris (cursor database) sekarang juga
+        tutup = getattr(baris, "aclose", None)
+        if tutup is not None:
+            await tutup()
+
+    chunk = ambil_isi_buffer()
+    if kompresor is not None:
+        chunk += kompresor.selesai()
+    if chunk:
+        yield chunk
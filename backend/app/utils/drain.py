@@ -0,0 +1,194 @@
+"""
+Template mining online (Drain) untuk pesan error compiler/interpreter
+
+Pesan error hanya berbeda di nama variabel, path dan nomor baris. Drain
+mengelompokkan pesan ke template ("NameError: name <STR> is not defined")
+dengan pohon prefix berkedalaman tetap:
+
+    akar -> jumlah token -> token ke-1 .. ke-(kedalaman-2) -> daftar kluster
+
+- Sebelum tokenisasi, bagian yang jelas variabel di-mask (string berkutip,
+  path, alamat hex, angka), jadi "line 12" dan "line 7" sama
+- Di daun, pesan masuk ke kluster dengan kemiripan token tertinggi (posisi yang
+  sama persis / panjang); jika >= ambang, posisi yang berbeda di template
+  menjadi <*>, jika tidak dibuat kluster baru
+- Token ber-angka dan node yang sudah punya maks_anak anak dialihkan ke cabang <*>
+  agar pohon tidak meledak
+
+Satu pencocokan = beberapa lookup dict + perbandingan token dengan kluster di
+satu daun (mikrodetik), tanpa I/O.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+WILDCARD = "<*>"
+MAKS_TOKEN = 64
+
+_MASK: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"\"[^\"]*\"|'[^']*'|`[^`]*`"), "<STR>"),
+    (re.compile(r"(?:[A-Za-z]:)?(?:[\\/][\w.\-]+){2,}"), "<PATH>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<HEX>"),
+    (re.compile(r"(?<![\w.])[-+]?\d+(?:\.\d+)*(?!\w)"), "<NUM>"),
+]
+# Baris traceback yang bukan pesan error: frame stack & penanda kolom (^^^ / ~~~)
+_BARIS_FRAME = re.compile(r"^(?:File\s|at\s|Traceback\b|\s*[\^~]+\s*$)")
+
+
+def baris_utama(pesan: str) -> str:
+    """
+    Baris pesan error yang dipakai untuk template: baris tidak-kosong terakhir
+    yang bukan frame stack (Python menaruh error di akhir traceback, Java/JS di
+    awal dan diikuti baris "at ...")
+    """
+    kandidat = ""
+    for baris in pesan.splitlines():
+        baris = baris.strip()
+        if baris and not _BARIS_FRAME.match(baris):
+            kandidat = baris
+    return kandidat or pesan.strip()
+
+
+def tokenisasi(pesan: str) -> List[str]:
+    """Mask bagian variabel lalu pecah per spasi (maksimal MAKS_TOKEN token)"""
+    teks = baris_utama(pesan)
+    for pola, pengganti in _MASK:
+        teks = pola.sub(pengganti, teks)
+    return teks.split()[:MAKS_TOKEN]
+
+
+def id_template(token: List[str]) -> str:
+    """ID deterministik dari token awal kluster (worker yang melihat pesan sama membuat ID sama)"""
+    return hashlib.sha1(" ".join(token).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class KlusterTemplate:
+    id: str
+    token: List[str]
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.token)
+
+
+@dataclass
+class _Node:
+    anak: Dict[str, "_Node"] = field(default_factory=dict)
+    kluster: List[KlusterTemplate] = field(default_factory=list)
+
+
+class Drain:
+    """
+    Parser template Drain
+
+    Args:
+        kedalaman: Kedalaman pohon (>= 3); kedalaman - 2 token pertama menjadi jalur
+        ambang: Kemiripan minimal pesan dengan template untuk bergabung ke kluster
+        maks_anak: Maksimal anak per node sebelum token baru dialihkan ke <*>
+    """
+
+    def __init__(self, kedalaman: int = 3, ambang: float = 0.5, maks_anak: int = 100):
+        self.kedalaman_token = max(kedalaman - 2, 1)
+        self.ambang = ambang
+        self.maks_anak = maks_anak
+        self._akar: Dict[int, _Node] = {}
+        self.kluster: Dict[str, KlusterTemplate] = {}
+
+    def __len__(self) -> int:
+        return len(self.kluster)
+
+    @staticmethod
+    def _kunci_token(token: str) -> str:
+        return WILDCARD if any(c.isdigit() for c in token) else token
+
+    def _daun(self, token: List[str], buat: bool) -> Optional[_Node]:
+        node = self._akar.get(len(token))
+        if node is None:
+            if not buat:
+                return None
+            node = self._akar[len(token)] = _Node()
+        for t in token[:self.kedalaman_token]:
+            kunci = self._kunci_token(t)
+            berikut = node.anak.get(kunci)
+            if berikut is None and kunci != WILDCARD:
+                # Token tak dikenal: cabang <*> (saat membuat: jika node sudah penuh)
+                if buat and len(node.anak) < self.maks_anak:
+                    berikut = node.anak[kunci] = _Node()
+                else:
+                    berikut = node.anak.get(WILDCARD)
+            if berikut is None:
+                if not buat:
+                    return None
+                berikut = node.anak[WILDCARD] = _Node()
+            node = berikut
+        return node
+
+    @staticmethod
+    def _kemiripan(template: List[str], token: List[str]) -> Tuple[float, int]:
+        sama = wildcard = 0
+        for a, b in zip(template, token):
+            if a == WILDCARD:
+                wildcard += 1
+            elif a == b:
+                sama += 1
+        return sama / len(token), wildcard
+
+    def _cari(self, daun: _Node, token: List[str]) -> Optional[KlusterTemplate]:
+        terbaik: Optional[KlusterTemplate] = None
+        skor_terbaik = (-1.0, -1)
+        for kluster in daun.kluster:
+            skor = self._kemiripan(kluster.token, token)
+            if skor > skor_terbaik:
+                terbaik, skor_terbaik = kluster, skor
+        if terbaik is None or skor_terbaik[0] < self.ambang:
+            return None
+        return terbaik
+
+    def cocokkan(self, pesan: str) -> Optional[KlusterTemplate]:
+        """Cari kluster untuk pesan tanpa mengubah pohon"""
+        token = tokenisasi(pesan)
+        if not token:
+            return None
+        daun = self._daun(token, buat=False)
+        return self._cari(daun, token) if daun is not None else None
+
+    def tambah(self, pesan: str) -> Tuple[Optional[KlusterTemplate], bool]:
+        """
+        Masukkan pesan ke kluster yang cocok (template digeneralisasi) atau kluster baru
+
+        Returns:
+            Tuple (kluster, berubah). berubah = kluster baru / template berubah.
+            Kluster None jika pesan kosong.
+        """
+        token = tokenisasi(pesan)
+        if not token:
+            return None, False
+        daun = self._daun(token, buat=True)
+        assert daun is not None
+        kluster = self._cari(daun, token)
+        if kluster is None:
+            kluster = KlusterTemplate(id_template(token), token)
+            if kluster.id in self.kluster:
+                return self.kluster[kluster.id], False
+            daun.kluster.append(kluster)
+            self.kluster[kluster.id] = kluster
+            return kluster, True
+
+        template_baru = [a if a == b else WILDCARD for a, b in zip(kluster.token, token)]
+        if template_baru != kluster.token:
+            kluster.token = template_baru
+            return kluster, True
+        return kluster, False
+
+    def muat_kluster(self, id_kluster: str, token: List[str]) -> None:
+        """Masukkan kluster tersimpan (mis. dari database) ke pohon"""
+        if id_kluster in self.kluster or not token:
+            return
+        kluster = KlusterTemplate(id_kluster, list(token))
+        daun = self._daun(kluster.token, buat=True)
+        assert daun is not None
+        daun.kluster.append(kluster)
+        self.kluster[id_kluster] = kluster
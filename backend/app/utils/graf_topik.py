@@ -0,0 +1,167 @@
+"""
+Graf prasyarat topik (DAG) dari TopikPembelajaran.prerequisite
+
+- Urutan topologis: algoritma Kahn dengan tie-break nama (deterministik), dihitung
+  sekali saat graf dibangun
+- Deteksi siklus: simpul yang tersisa setelah Kahn berada di (atau bergantung pada)
+  siklus; satu siklus konkret dicari dengan menelusuri prasyarat simpul sisa
+  untuk pesan error
+- Transitive closure: bitset per topik (int Python, bit j = topik ke-j) berisi
+  seluruh prasyarat langsung & tidak langsung, dibangun mengikuti urutan topologis
+  sehingga cek "apakah p prasyarat t" / "prasyarat apa yang belum dikuasai" adalah
+  operasi bit, bukan traversal graf
+"""
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class SiklusPrasyarat(ValueError):
+    """Prerequisite topik membentuk siklus"""
+
+    def __init__(self, siklus: List[str]):
+        self.siklus = siklus  # Urutan belajar: setiap topik prasyarat topik berikutnya
+        super().__init__(f"Prerequisite membentuk siklus: {' -> '.join(siklus)}")
+
+
+def _iter_bit(bitset: int) -> Iterable[int]:
+    while bitset:
+        bit_rendah = bitset & -bitset
+        yield bit_rendah.bit_length() - 1
+        bitset ^= bit_rendah
+
+
+class GrafTopik:
+    """DAG topik -> prasyarat. Topik yang hanya muncul sebagai prasyarat ikut menjadi simpul."""
+
+    def __init__(self, prasyarat_per_topik: Dict[str, Sequence[str]]):
+        nama = set(prasyarat_per_topik)
+        nama.update(p for daftar in prasyarat_per_topik.values() for p in daftar)
+        self.topik: List[str] = sorted(nama)
+        self._indeks: Dict[str, int] = {t: i for i, t in enumerate(self.topik)}
+        self._prasyarat: List[List[int]] = [[] for _ in self.topik]
+        for t, daftar in prasyarat_per_topik.items():
+            self._prasyarat[self._indeks[t]] = sorted({self._indeks[p] for p in daftar if p != t})
+
+        self.urutan_topologis, sisa = self._kahn()
+        self.siklus: Optional[List[str]] = self._cari_siklus(sisa) if sisa else None
+        # Simpul di siklus diletakkan di akhir (urut nama) agar urutan tetap total
+        self.urutan_topologis += [self.topik[i] for i in sorted(sisa)]
+        self._peringkat: Dict[str, int] = {t: r for r, t in enumerate(self.urutan_topologis)}
+        self._closure = self._bangun_closure()
+
+    def _kahn(self) -> Tuple[List[str], List[int]]:
+        derajat_masuk = [len(p) for p in self._prasyarat]
+        dependen: List[List[int]] = [[] for _ in self.topik]
+        for i, daftar in enumerate(self._prasyarat):
+            for p in daftar:
+                dependen[p].append(i)
+
+        siap = [i for i, d in enumerate(derajat_masuk) if d == 0]
+        heapq.heapify(siap)  # Indeks = urutan nama -> tie-break alfabetis
+        urutan: List[str] = []
+        while siap:
+            i = heapq.heappop(siap)
+            urutan.append(self.topik[i])
+            for j in dependen[i]:
+                derajat_masuk[j] -= 1
+                if derajat_masuk[j] == 0:
+                    heapq.heappush(siap, j)
+        sisa = [i for i, d in enumerate(derajat_masuk) if d > 0]
+        return urutan, sisa
+
+    def _cari_siklus(self, sisa: List[int]) -> List[str]:
+        """Satu siklus konkret di antara simpul sisa Kahn (iteratif, tanpa rekursi)"""
+        di_sisa = set(sisa)
+        # Setiap simpul sisa punya minimal satu prasyarat yang juga sisa -> ikuti sampai berulang
+        posisi: Dict[int, int] = {}
+        jalur: List[int] = []
+        i = sisa[0]
+        while i not in posisi:
+            posisi[i] = len(jalur)
+            jalur.append(i)
+            i = next(p for p in self._prasyarat[i] if p in di_sisa)
+        siklus = jalur[posisi[i]:] + [i]
+        return [self.topik[j] for j in reversed(siklus)]
+
+    def _bangun_closure(self) -> List[int]:
+        closure = [0] * len(self.topik)
+        for t in self.urutan_topologis:
+            i = self._indeks[t]
+            bitset = 0
+            for p in self._prasyarat[i]:
+                bitset |= (1 << p) | closure[p]
+            closure[i] = bitset & ~(1 << i)
+        return closure
+
+    def __contains__(self, topik: str) -> bool:
+        return topik in self._indeks
+
+    def __len__(self) -> int:
+        return len(self.topik)
+
+    def bitset(self, topik_list: Iterable[str]) -> int:
+        """Bitset dari kumpulan topik (topik di luar graf diabaikan)"""
+        bitset = 0
+        for t in topik_list:
+            i = self._indeks.get(t)
+            if i is not None:
+                bitset |= 1 << i
+        return bitset
+
+    def ke_nama(self, bitset: int) -> List[str]:
+        """Nama topik dalam bitset, terurut topologis"""
+        return sorted((self.topik[i] for i in _iter_bit(bitset)), key=self._peringkat.__getitem__)
+
+    def prasyarat_transitif(self, topik: str) -> List[str]:
+        """Semua prasyarat langsung & tidak langsung, terurut topologis"""
+        i = self._indeks.get(topik)
+        return self.ke_nama(self._closure[i]) if i is not None else []
+
+    def adalah_prasyarat(self, prasyarat: str, topik: str) -> bool:
+        i, p = self._indeks.get(topik), self._indeks.get(prasyarat)
+        return i is not None and p is not None and bool(self._closure[i] >> p & 1)
+
+    def prasyarat_belum_dikuasai(self, topik: str, bitset_dikuasai: int) -> List[str]:
+        """Prasyarat (transitif) topik yang tidak ada di bitset_dikuasai"""
+        i = self._indeks.get(topik)
+        return self.ke_nama(self._closure[i] & ~bitset_dikuasai) if i is not None else []
+
+    def urutkan_stabil(self, topik_list: Sequence[str]) -> List[str]:
+        """
+        Urutkan topik agar prasyarat muncul sebelum topik yang membutuhkannya, dengan
+        mempertahankan urutan prioritas input: setiap topik didahului prasyarat
+        (transitif) yang ada di input dan belum muncul. Topik di luar graf tetap
+        di posisinya.
+        """
+        bitset_input = self.bitset(topik_list)
+        bitset_sudah = 0
+        hasil: List[str] = []
+        for t in dict.fromkeys(topik_list):
+            if t in hasil:
+                continue
+            i = self._indeks.get(t)
+            if i is not None:
+                for p in self.ke_nama(self._closure[i] & bitset_input & ~bitset_sudah):
+                    hasil.append(p)
+                bitset_sudah |= (self._closure[i] & bitset_input) | (1 << i)
+            hasil.append(t)
+        return hasil
+
+
+def validasi_prasyarat(
+    prasyarat_per_topik: Dict[str, Sequence[str]],
+    nama: str,
+    prasyarat_baru: Sequence[str]
+) -> None:
+    """
+    Cek apakah mengganti prerequisite satu topik akan membentuk siklus
+
+    Raises:
+        SiklusPrasyarat: Jika perubahan membentuk siklus (termasuk topik prasyarat dirinya sendiri)
+    """
+    if nama in prasyarat_baru:
+        raise SiklusPrasyarat([nama, nama])
+    graf = GrafTopik({**prasyarat_per_topik, nama: list(prasyarat_baru)})
+    if graf.siklus:
+        raise SiklusPrasyarat(graf.siklus)
@@ -0,0 +1,121 @@
+"""
+Pencocokan fuzzy topik bebas (output LLM) ke nama topik kanonik
+
+- Normalisasi: huruf kecil, aksen & tanda baca dibuang, spasi dihapus
+  ("For-Loop" == "for loop" == "forloop")
+- Index trigram terbalik atas nama kanonik + alias: kandidat diambil dari trigram
+  yang sama lalu diperingkat dengan koefisien Dice, hanya KANDIDAT_MAKS teratas yang
+  diverifikasi dengan jarak edit Damerau-Levenshtein (berhenti dini begitu
+  melewati jarak maksimal)
+- Alias (hasil merge admin) dicocokkan persis setelah normalisasi, sehingga variasi
+  yang tidak mirip secara ejaan ("perulangan" -> "Loop") tetap terpetakan
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+KANDIDAT_MAKS = 20
+
+_POLA_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalisasi_topik(teks: str) -> str:
+    """Kunci pencocokan: huruf kecil ASCII alfanumerik tanpa spasi"""
+    teks = unicodedata.normalize("NFKD", teks).encode("ascii", "ignore").decode("ascii")
+    return _POLA_NON_ALNUM.sub("", teks.lower())
+
+
+def trigram(kunci: str) -> Set[str]:
+    """Trigram dengan padding agar awal/akhir kata ikut berbobot"""
+    teks = f"  {kunci} "
+    return {teks[i:i + 3] for i in range(len(teks) - 2)}
+
+
+def jarak_edit(a: str, b: str, maks_jarak: int) -> int:
+    """
+    Jarak edit Damerau-Levenshtein (optimal string alignment: sisip, hapus, ganti,
+    tukar dua huruf bersebelahan). Jika jarak pasti > maks_jarak, kembalikan
+    maks_jarak + 1 tanpa menyelesaikan tabel.
+    """
+    if abs(len(a) - len(b)) > maks_jarak:
+        return maks_jarak + 1
+    dua_baris_lalu: List[int] = []
+    sebelumnya = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        sekarang = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            sekarang[j] = min(sebelumnya[j] + 1, sekarang[j - 1] + 1, sebelumnya[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                sekarang[j] = min(sekarang[j], dua_baris_lalu[j - 2] + 1)
+        if min(sekarang) > maks_jarak:
+            return maks_jarak + 1
+        dua_baris_lalu, sebelumnya = sebelumnya, sekarang
+    return sebelumnya[-1]
+
+
+class IndeksKanonik:
+    """
+    Index pencocokan topik -> nama kanonik
+
+    Args:
+        nama_kanonik: Nama TopikPembelajaran
+        alias: alias ternormalisasi -> nama kanonik
+        ambang: Kemiripan minimal (1 - jarak edit / panjang terpanjang) untuk fuzzy match
+    """
+
+    def __init__(self, nama_kanonik: Iterable[str], alias: Dict[str, str], ambang: float):
+        self.ambang = ambang
+        # Setiap entri: kunci ternormalisasi -> nama kanonik
+        self._persis: Dict[str, str] = {}
+        for nama in nama_kanonik:
+            kunci = normalisasi_topik(nama)
+            if kunci:
+                self._persis.setdefault(kunci, nama)
+        for kunci, nama in alias.items():
+            self._persis.setdefault(kunci, nama)
+
+        self._kunci: List[str] = list(self._persis)
+        self._trigram: List[Set[str]] = [trigram(k) for k in self._kunci]
+        self._index: Dict[str, List[int]] = {}
+        for i, tg in enumerate(self._trigram):
+            for t in tg:
+                self._index.setdefault(t, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self._persis)
+
+    def cocokkan(self, teks: str) -> Optional[Tuple[str, float]]:
+        """
+        Cari nama kanonik untuk teks topik
+
+        Returns:
+            Tuple (nama kanonik, skor kemiripan 0-1), atau None jika tidak ada yang lolos ambang
+        """
+        kunci = normalisasi_topik(teks)
+        if not kunci:
+            return None
+        persis = self._persis.get(kunci)
+        if persis is not None:
+            return persis, 1.0
+
+        tg = trigram(kunci)
+        irisan: Dict[int, int] = {}
+        for t in tg:
+            for i in self._index.get(t, ()):
+                irisan[i] = irisan.get(i, 0) + 1
+        if not irisan:
+            return None
+        kandidat = sorted(irisan, key=lambda i: -2.0 * irisan[i] / (len(tg) + len(self._trigram[i])))[:KANDIDAT_MAKS]
+
+        terbaik: Optional[Tuple[str, float]] = None
+        for i in kandidat:
+            panjang = max(len(kunci), len(self._kunci[i]))
+            maks_jarak = int((1.0 - self.ambang) * panjang + 1e-9)
+            jarak = jarak_edit(kunci, self._kunci[i], maks_jarak)
+            if jarak > maks_jarak:
+                continue
+            skor = 1.0 - jarak / panjang
+            if terbaik is None or skor > terbaik[1]:
+                terbaik = (self._persis[self._kunci[i]], skor)
+        return terbaik
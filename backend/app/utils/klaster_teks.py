@@ -0,0 +1,244 @@
+"""
+Klastering teks pendek (NumPy murni): hashing vectorizer TF-IDF + mini-batch k-means
+
+- Vektorisasi: token kata (huruf kecil) + bigram di-hash ke JUMLAH_FITUR dimensi
+  (crc32), bobot TF sublinear x IDF, baris dinormalisasi L2. Hasilnya matriks
+  sparse CSR sederhana (indptr, indices, data) tanpa dependensi scipy.
+- K-means spherical mini-batch (Sculley, 2010): centroid dense (k x fitur),
+  kemiripan cosine = dot product karena baris & centroid ternormalisasi.
+- k dipilih otomatis (kmeans_k_adaptif) dengan simplified silhouette, sehingga
+  varian kalimat dari miskonsepsi yang sama tidak dipecah oleh k yang terlalu besar.
+"""
+
+import re
+import zlib
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+JUMLAH_FITUR = 1 << 15
+UKURAN_BLOK_ASSIGNMENT = 10000
+
+_POLA_TOKEN = re.compile(r"[a-z0-9_]{2,}")
+
+
+@dataclass
+class MatriksSparse:
+    """Matriks CSR: baris i = indices/data[indptr[i]:indptr[i+1]]"""
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    jumlah_kolom: int
+
+    @property
+    def jumlah_baris(self) -> int:
+        return len(self.indptr) - 1
+
+    def ambil_baris(self, baris: np.ndarray) -> "MatriksSparse":
+        """Sub-matriks berisi baris tertentu (urutan sesuai input)"""
+        awal, akhir = self.indptr[baris], self.indptr[baris + 1]
+        panjang = akhir - awal
+        indptr = np.concatenate(([0], np.cumsum(panjang)))
+        posisi = np.concatenate([np.arange(a, b) for a, b in zip(awal, akhir)]) if len(baris) else np.empty(0, dtype=np.int64)
+        return MatriksSparse(indptr, self.indices[posisi], self.data[posisi], self.jumlah_kolom)
+
+    def kali_dense(self, matriks: np.ndarray) -> np.ndarray:
+        """self @ matriks.T untuk matriks dense (k x kolom) -> (baris x k)"""
+        hasil = np.zeros((self.jumlah_baris, matriks.shape[0]), dtype=np.float32)
+        if self.data.size == 0:
+            return hasil
+        kontribusi = matriks[:, self.indices].T * self.data[:, None]  # (nnz x k)
+        tidak_kosong = np.diff(self.indptr) > 0
+        hasil[tidak_kosong] = np.add.reduceat(kontribusi, self.indptr[:-1][tidak_kosong], axis=0)
+        return hasil
+
+    def jumlah_per_kelompok(self, label: np.ndarray, jumlah_kelompok: int) -> np.ndarray:
+        """Jumlah baris per label -> dense (jumlah_kelompok x kolom)"""
+        hasil = np.zeros((jumlah_kelompok, self.jumlah_kolom), dtype=np.float32)
+        label_nnz = np.repeat(label, np.diff(self.indptr))
+        np.add.at(hasil, (label_nnz, self.indices), self.data)
+        return hasil
+
+
+def tokenisasi(teks: str) -> List[str]:
+    """Unigram + bigram kata huruf kecil"""
+    kata = _POLA_TOKEN.findall(teks.lower())
+    return kata + [f"{a} {b}" for a, b in zip(kata, kata[1:])]
+
+
+def vektorisasi_tfidf(teks_list: Sequence[str], jumlah_fitur: int = JUMLAH_FITUR) -> MatriksSparse:
+    """
+    Hashing vectorizer TF-IDF
+
+    Args:
+        teks_list: Dokumen (teks pendek)
+        jumlah_fitur: Dimensi ruang hash
+
+    Returns:
+        MatriksSparse (dokumen x jumlah_fitur), baris ternormalisasi L2
+    """
+    indptr = [0]
+    indices: List[np.ndarray] = []
+    tf: List[np.ndarray] = []
+    for teks in teks_list:
+        token = tokenisasi(teks)
+        if token:
+            kolom = np.fromiter((zlib.crc32(t.encode("utf-8")) % jumlah_fitur for t in token), dtype=np.int64)
+            unik, jumlah = np.unique(kolom, return_counts=True)
+        else:
+            unik, jumlah = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        indices.append(unik)
+        tf.append(1.0 + np.log(jumlah.astype(np.float32)))
+        indptr.append(indptr[-1] + len(unik))
+
+    semua_indices = np.concatenate(indices) if indices else np.empty(0, dtype=np.int64)
+    data = np.concatenate(tf).astype(np.float32) if tf else np.empty(0, dtype=np.float32)
+    indptr_arr = np.asarray(indptr, dtype=np.int64)
+
+    # IDF halus: log((1 + n) / (1 + df)) + 1
+    df = np.bincount(semua_indices, minlength=jumlah_fitur)
+    idf = np.log((1.0 + len(teks_list)) / (1.0 + df)).astype(np.float32) + 1.0
+    data = data * idf[semua_indices]
+
+    # Normalisasi L2 per baris
+    panjang = np.diff(indptr_arr)
+    if data.size:
+        norma = np.sqrt(np.add.reduceat(data ** 2, indptr_arr[:-1][panjang > 0]))
+        data = data / np.repeat(norma, panjang[panjang > 0])
+    return MatriksSparse(indptr_arr, semua_indices, data.astype(np.float32), jumlah_fitur)
+
+
+def _normalisasi_baris(matriks: np.ndarray) -> np.ndarray:
+    norma = np.linalg.norm(matriks, axis=1, keepdims=True)
+    return matriks / np.maximum(norma, 1e-12)
+
+
+def _baris_dense(X: MatriksSparse, i: int) -> np.ndarray:
+    vektor = np.zeros(X.jumlah_kolom, dtype=np.float32)
+    awal, akhir = X.indptr[i], X.indptr[i + 1]
+    vektor[X.indices[awal:akhir]] = X.data[awal:akhir]
+    return vektor
+
+
+def _inisialisasi_kmeans_pp(X: MatriksSparse, k: int, rng: np.random.Generator, ukuran_sampel: int) -> np.ndarray:
+    """k-means++ (jarak cosine) pada sampel baris"""
+    sampel = rng.choice(X.jumlah_baris, size=min(ukuran_sampel, X.jumlah_baris), replace=False)
+    Xs = X.ambil_baris(np.sort(sampel))
+    centroid = [_baris_dense(Xs, int(rng.integers(Xs.jumlah_baris)))]
+    jarak = 1.0 - Xs.kali_dense(centroid[0][None, :])[:, 0]
+    for _ in range(1, k):
+        bobot = np.clip(jarak, 0.0, None) ** 2
+        if bobot.sum() <= 1e-9:
+            break  # Sisa baris identik dengan centroid yang sudah ada
+        baru = _baris_dense(Xs, int(rng.choice(Xs.jumlah_baris, p=bobot / bobot.sum())))
+        centroid.append(baru)
+        jarak = np.minimum(jarak, 1.0 - Xs.kali_dense(baru[None, :])[:, 0])
+    return _normalisasi_baris(np.asarray(centroid, dtype=np.float32))
+
+
+def kmeans_minibatch(
+    X: MatriksSparse,
+    k: int,
+    ukuran_batch: int = 256,
+    maks_iterasi: int = 100,
+    seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Mini-batch k-means spherical
+
+    Args:
+        X: Matriks sparse, baris ternormalisasi L2
+        k: Jumlah klaster (dibatasi jumlah baris)
+        ukuran_batch: Baris per iterasi
+        maks_iterasi: Jumlah iterasi mini-batch
+        seed: Seed RNG (hasil deterministik)
+
+    Returns:
+        Tuple (centroid (k' x fitur) ternormalisasi, label per baris,
+        kemiripan cosine tiap baris ke centroid-nya)
+    """
+    rng = np.random.default_rng(seed)
+    centroid = _inisialisasi_kmeans_pp(X, min(k, X.jumlah_baris), rng, ukuran_sampel=max(10 * k, 1000))
+    k = centroid.shape[0]
+    hitungan = np.zeros(k, dtype=np.float32)
+
+    for _ in range(maks_iterasi):
+        batch = rng.choice(X.jumlah_baris, size=min(ukuran_batch, X.jumlah_baris), replace=False)
+        Xb = X.ambil_baris(batch)
+        label = np.argmax(Xb.kali_dense(centroid), axis=1)
+        jumlah = np.bincount(label, minlength=k).astype(np.float32)
+        ada = jumlah > 0
+        hitungan += jumlah
+        # Update per centroid: c <- c + (sum_x - m*c) / v  (learning rate 1/v per sampel)
+        total = Xb.jumlah_per_kelompok(label, k)
+        centroid[ada] += (total[ada] - jumlah[ada, None] * centroid[ada]) / hitungan[ada, None]
+        centroid = _normalisasi_baris(centroid)
+
+    # Assignment akhir per blok baris (membatasi memori matriks nnz x k)
+    label = np.empty(X.jumlah_baris, dtype=np.int64)
+    kemiripan = np.empty(X.jumlah_baris, dtype=np.float32)
+    for awal in range(0, X.jumlah_baris, UKURAN_BLOK_ASSIGNMENT):
+        baris = np.arange(awal, min(awal + UKURAN_BLOK_ASSIGNMENT, X.jumlah_baris))
+        skor = X.ambil_baris(baris).kali_dense(centroid)
+        label[baris] = np.argmax(skor, axis=1)
+        kemiripan[baris] = skor[np.arange(len(baris)), label[baris]]
+    return centroid, label, kemiripan
+
+
+def silhouette_sederhana(kemiripan_semua: np.ndarray, label: np.ndarray) -> float:
+    """
+    Simplified silhouette (jarak ke centroid, bukan ke semua titik): O(n * k)
+
+    Args:
+        kemiripan_semua: Kemiripan cosine tiap baris ke setiap centroid (baris x k)
+        label: Klaster tiap baris
+
+    Returns:
+        Rata-rata (b - a) / max(a, b), a = jarak ke centroid sendiri, b = jarak ke
+        centroid lain terdekat; 0.0 jika k < 2
+    """
+    if kemiripan_semua.shape[1] < 2:
+        return 0.0
+    baris = np.arange(len(label))
+    a = 1.0 - kemiripan_semua[baris, label]
+    lain = kemiripan_semua.copy()
+    lain[baris, label] = -np.inf
+    b = 1.0 - lain.max(axis=1)
+    return float(np.mean((b - a) / np.maximum(np.maximum(a, b), 1e-12)))
+
+
+def kmeans_k_adaptif(
+    X: MatriksSparse,
+    maks_k: int,
+    min_silhouette: float = 0.1,
+    ukuran_sampel: int = 5000,
+    seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Mini-batch k-means dengan k dipilih otomatis (2..maks_k) lewat simplified silhouette
+
+    Silhouette dihitung pada sampel baris (maksimal ukuran_sampel). Jika silhouette
+    terbaik < min_silhouette, data dianggap satu klaster (k = 1).
+
+    Returns:
+        Sama dengan kmeans_minibatch untuk k terpilih
+    """
+    maks_k = min(maks_k, X.jumlah_baris)
+    if maks_k < 2:
+        return kmeans_minibatch(X, 1, seed=seed)
+
+    rng = np.random.default_rng(seed)
+    sampel = np.sort(rng.choice(X.jumlah_baris, size=min(ukuran_sampel, X.jumlah_baris), replace=False))
+    Xs = X.ambil_baris(sampel)
+
+    terbaik: Tuple[np.ndarray, np.ndarray, np.ndarray] = kmeans_minibatch(X, 1, seed=seed)
+    skor_terbaik = min_silhouette
+    for k in range(2, maks_k + 1):
+        hasil = kmeans_minibatch(X, k, seed=seed)
+        if hasil[0].shape[0] < k:
+            break  # k-means++ kehabisan titik berbeda: k lebih besar tidak berguna
+        skor = silhouette_sederhana(Xs.kali_dense(hasil[0]), hasil[1][sampel])
+        if skor > skor_terbaik:
+            terbaik, skor_terbaik = hasil, skor
+    return terbaik
@@ -0,0 +1,85 @@
+"""
+Loader batch - ambil banyak dokumen berdasarkan ID dengan satu query $in
+
+Dipakai untuk "join" manual by id (relation Prisma di-comment karena Cosmos DB),
+menggantikan pola N+1 (satu find_unique per baris). Hasil opsional di-cache per
+ID dengan CacheTTL, jadi ID yang sering muncul tidak di-query ulang.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+
+from app.database import dapatkan_collection
+from app.utils.cache import CacheTTL
+
+
+def _ke_kunci_query(id_str: str) -> Any:
+    """ID string -> ObjectId (jika valid) untuk dipakai di filter _id"""
+    return ObjectId(id_str) if ObjectId.is_valid(id_str) else id_str
+
+
+class LoaderBatch:
+    """
+    Loader dokumen by _id untuk satu collection
+
+    - muat_banyak(ids): satu query $in untuk semua ID yang belum ada di cache
+    - muat(id): shortcut untuk satu ID
+    - hapus(id): invalidasi cache setelah dokumen diubah
+    """
+
+    def __init__(
+        self,
+        nama_collection: str,
+        projection: Optional[Dict[str, int]] = None,
+        konversi: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        cache: Optional[CacheTTL] = None
+    ):
+        self._nama_collection = nama_collection
+        self._projection = projection
+        self._konversi = konversi
+        self._cache = cache
+
+    async def muat_banyak(self, id_list: Iterable[Optional[str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Ambil dokumen untuk semua ID (duplikat & None diabaikan)
+
+        Args:
+            id_list: ID string (boleh berulang)
+
+        Returns:
+            Dict {id: dokumen}; ID yang tidak ditemukan tidak ada di dict
+        """
+        hasil: Dict[str, Dict[str, Any]] = {}
+        belum_ada: List[str] = []
+        for id_str in dict.fromkeys(i for i in id_list if i):
+            dokumen = self._cache.dapatkan(id_str) if self._cache is not None else None
+            if dokumen is not None:
+                hasil[id_str] = dokumen
+            else:
+                belum_ada.append(id_str)
+
+        if belum_ada:
+            cursor = dapatkan_collection(self._nama_collection).find(
+                {"_id": {"$in": [_ke_kunci_query(i) for i in belum_ada]}},
+                projection=self._projection
+            )
+            async for doc in cursor:
+                id_str = str(doc["_id"])
+                dokumen = self._konversi(doc) if self._konversi else doc
+                hasil[id_str] = dokumen
+                if self._cache is not None:
+                    self._cache.simpan(id_str, dokumen)
+
+        return hasil
+
+    async def muat(self, id_str: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Ambil satu dokumen by ID (None jika tidak ada)"""
+        if not id_str:
+            return None
+        return (await self.muat_banyak([id_str])).get(id_str)
+
+    def hapus(self, id_str: str) -> None:
+        """Invalidasi cache untuk satu ID"""
+        if self._cache is not None:
+            self._cache.hapus(id_str)
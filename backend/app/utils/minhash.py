@@ -0,0 +1,129 @@
+"""
+MinHash + LSH untuk deteksi near-duplicate kode submisi
+
+- Token Python dinormalisasi (identifier -> ID, angka -> NUM, string -> STR,
+  komentar & baris kosong dibuang; keyword, operator dan builtin tetap), lalu
+  dibentuk shingle UKURAN_SHINGLE token berurutan.
+- Signature: JUMLAH_PERMUTASI nilai min dari hash universal (a*x + b) mod p.
+  Fraksi komponen signature yang sama = estimasi Jaccard dua himpunan shingle.
+- LSH: signature dipotong JUMLAH_BAND band x BARIS_PER_BAND baris; dua submisi
+  menjadi kandidat jika minimal satu band identik, dengan peluang
+  1 - (1 - J^8)^16. Untuk 16 x 8: J=0.5 -> 0.06, J=0.6 -> 0.24, J=0.7 -> 0.61,
+  J=0.75 -> 0.82, J=0.8 -> 0.95, J>=0.85 -> >0.99. Band disimpan saat insert,
+  jadi ambang query dibatasi minimal AMBANG_MINIMAL; di bawahnya sebagian besar
+  pasangan tidak pernah menjadi kandidat.
+
+Semua fungsi di modul ini murni (tanpa I/O) sehingga aman dipanggil di process pool.
+"""
+
+import io
+import keyword
+import tokenize
+import zlib
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.struktur_kode import NAMA_BUILTIN
+
+UKURAN_SHINGLE = 5
+JUMLAH_PERMUTASI = 128
+JUMLAH_BAND = 16
+BARIS_PER_BAND = JUMLAH_PERMUTASI // JUMLAH_BAND
+# Ambang Jaccard terendah yang masih masuk akal untuk 16 x 8 (recall kandidat ~0.82)
+AMBANG_MINIMAL = 0.75
+
+_PRIMA = np.uint64((1 << 61) - 1)
+_MASK_32 = np.uint64(0xFFFFFFFF)
+
+# Seed tetap: signature harus sama antar proses & antar deploy agar bisa disimpan
+_rng = np.random.default_rng(20240601)
+_KOEF_A = _rng.integers(1, 1 << 32, size=JUMLAH_PERMUTASI, dtype=np.uint64)
+_KOEF_B = _rng.integers(0, 1 << 32, size=JUMLAH_PERMUTASI, dtype=np.uint64)
+
+_TOKEN_DIABAIKAN = {
+    tokenize.COMMENT, tokenize.NL, tokenize.ENCODING, tokenize.ENDMARKER, tokenize.TYPE_COMMENT,
+}
+
+
+def token_ternormalisasi(kode: str) -> List[str]:
+    """
+    Tokenisasi kode Python dengan identifier & literal dinormalisasi.
+    Kode yang tidak bisa ditokenisasi lengkap tetap diproses sampai titik error.
+    """
+    hasil: List[str] = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(kode).readline):
+            if token.type in _TOKEN_DIABAIKAN:
+                continue
+            if token.type == tokenize.NAME:
+                teks = token.string
+                hasil.append(teks if keyword.iskeyword(teks) or teks in NAMA_BUILTIN else "ID")
+            elif token.type == tokenize.NUMBER:
+                hasil.append("NUM")
+            elif token.type == tokenize.STRING:
+                hasil.append("STR")
+            elif token.type in (tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT):
+                hasil.append(tokenize.tok_name[token.type])
+            else:
+                hasil.append(token.string)
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        pass
+    return hasil
+
+
+def hash_shingle(kode: str) -> np.ndarray:
+    """Hash 32-bit unik untuk setiap shingle token kode"""
+    token = token_ternormalisasi(kode)
+    if not token:
+        return np.empty(0, dtype=np.uint64)
+    if len(token) < UKURAN_SHINGLE:
+        shingle = [" ".join(token)]
+    else:
+        shingle = [" ".join(token[i:i + UKURAN_SHINGLE]) for i in range(len(token) - UKURAN_SHINGLE + 1)]
+    return np.unique(np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle), dtype=np.uint64))
+
+
+def signature_minhash(kode: str) -> List[int]:
+    """
+    Hitung signature MinHash kode
+
+    Returns:
+        List JUMLAH_PERMUTASI int32 bertanda (sesuai tipe Int Prisma; kosong jika
+        kode tidak punya token)
+    """
+    x = hash_shingle(kode)
+    if x.size == 0:
+        return []
+    # (a * x + b) mod p; a, x, b < 2^32 sehingga tidak overflow uint64
+    nilai = (np.outer(_KOEF_A, x) + _KOEF_B[:, None]) % _PRIMA
+    return (nilai.min(axis=1) & _MASK_32).astype(np.uint32).view(np.int32).tolist()
+
+
+def band_lsh(signature: Sequence[int]) -> List[str]:
+    """Kunci bucket LSH per band ("<nomor band>:<hash baris band>")"""
+    if len(signature) != JUMLAH_PERMUTASI:
+        return []
+    larik = np.asarray(signature, dtype=np.int32)
+    return [
+        f"{i}:{zlib.crc32(larik[i * BARIS_PER_BAND:(i + 1) * BARIS_PER_BAND].tobytes()):08x}"
+        for i in range(JUMLAH_BAND)
+    ]
+
+
+def sidik_minhash(kode: str) -> Tuple[List[int], List[str]]:
+    """Signature + band LSH sekaligus (dipakai saat insert & backfill)"""
+    signature = signature_minhash(kode)
+    return signature, band_lsh(signature)
+
+
+def sidik_minhash_batch(kode_list: Sequence[str]) -> List[Tuple[List[int], List[str]]]:
+    """Versi batch sidik_minhash untuk worker process pool"""
+    return [sidik_minhash(kode) for kode in kode_list]
+
+
+def estimasi_jaccard(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimasi Jaccard dari dua signature (fraksi komponen yang sama)"""
+    if len(a) != JUMLAH_PERMUTASI or len(b) != JUMLAH_PERMUTASI:
+        return 0.0
+    return float(np.count_nonzero(np.asarray(a) == np.asarray(b))) / JUMLAH_PERMUTASI
@@ -0,0 +1,323 @@
+"""
+Observabilitas - Metrik Prometheus/OpenMetrics untuk PahamKode
+
+Metrik yang diekspos di endpoint /metrics:
+- pahamkode_http_request_duration_seconds   : latensi request per rute (template), method, status
+- pahamkode_http_request_in_flight          : jumlah request yang sedang diproses
+- pahamkode_db_operasi_duration_seconds     : latensi operasi database per driver, collection, operasi
+- pahamkode_motor_pool_checkout_wait_seconds: waktu tunggu checkout koneksi dari pool Motor
+- pahamkode_motor_pool_koneksi_dipakai      : koneksi Motor yang sedang di-checkout
+- pahamkode_llm_duration_seconds            : latensi panggilan LLM per provider & model
+- pahamkode_llm_token_total                 : token input/output LLM per provider & model
+- pahamkode_llm_rute_total                  : keputusan router model (kecil/besar) & fallback
+- pahamkode_event_loop_lag_seconds          : keterlambatan event loop asyncio
+- pahamkode_cache_permintaan_total / pahamkode_cache_hit_ratio : efektivitas cache in-process
+- pahamkode_rate_limit_total                : pengecekan rate limit login/register (diizinkan/ditolak)
+
+Untuk deployment multi-worker (uvicorn --workers / gunicorn), set PROMETHEUS_MULTIPROC_DIR
+agar metrik dari semua worker digabung saat di-scrape.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from prometheus_client import (  # type: ignore
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from pymongo import monitoring
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bucket latensi (detik)
+BUCKET_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BUCKET_DB = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BUCKET_LLM = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+
+# ===== HTTP =====
+LATENSI_HTTP = Histogram(
+    "pahamkode_http_request_duration_seconds",
+    "Latensi request HTTP per rute",
+    ["route", "method", "status"],
+    buckets=BUCKET_HTTP,
+)
+REQUEST_IN_FLIGHT = Gauge(
+    "pahamkode_http_request_in_flight",
+    "Jumlah request HTTP yang sedang diproses",
+    multiprocess_mode="livesum",
+)
+
+# ===== DATABASE =====
+LATENSI_DB = Histogram(
+    "pahamkode_db_operasi_duration_seconds",
+    "Latensi operasi database per collection & operasi",
+    ["driver", "collection", "operasi", "hasil"],
+    buckets=BUCKET_DB,
+)
+TUNGGU_CHECKOUT_POOL = Histogram(
+    "pahamkode_motor_pool_checkout_wait_seconds",
+    "Waktu tunggu checkout koneksi dari pool Motor",
+    buckets=BUCKET_DB,
+)
+KONEKSI_POOL_DIPAKAI = Gauge(
+    "pahamkode_motor_pool_koneksi_dipakai",
+    "Jumlah koneksi Motor yang sedang di-checkout",
+    multiprocess_mode="livesum",
+)
+
+# ===== LLM =====
+LATENSI_LLM = Histogram(
+    "pahamkode_llm_duration_seconds",
+    "Latensi panggilan LLM per provider & model",
+    ["provider", "model", "hasil"],
+    buckets=BUCKET_LLM,
+)
+TOKEN_LLM = Counter(
+    "pahamkode_llm_token_total",
+    "Jumlah token LLM per provider, model & tipe (input/output)",
+    ["provider", "model", "tipe"],
+)
+RUTE_LLM = Counter(
+    "pahamkode_llm_rute_total",
+    "Jumlah request analisis per rute model (kecil/besar) & asal (router/fallback)",
+    ["rute", "asal"],
+)
+
+# ===== RUNTIME =====
+LAG_EVENT_LOOP = Gauge(
+    "pahamkode_event_loop_lag_seconds",
+    "Keterlambatan event loop asyncio (selisih waktu bangun vs jadwal)",
+    multiprocess_mode="max",
+)
+
+# ===== CACHE =====
+PERMINTAAN_CACHE = Counter(
+    "pahamkode_cache_permintaan_total",
+    "Jumlah lookup cache in-process per hasil (hit/miss)",
+    ["cache", "hasil"],
+)
+RASIO_HIT_CACHE = Gauge(
+    "pahamkode_cache_hit_ratio",
+    "Rasio hit cache in-process sejak proses start",
+    ["cache"],
+    multiprocess_mode="max",
+)
+
+# ===== RATE LIMIT =====
+PERCOBAAN_RATE_LIMIT = Counter(
+    "pahamkode_rate_limit_total",
+    "Jumlah pengecekan rate limit per rute, dimensi (ip/email) dan hasil",
+    ["rute", "dimensi", "hasil"],
+)
+
+_statistik_cache: Dict[str, Tuple[int, int]] = {}
+
+# Hasil panggilan LLM terakhir per provider (dibaca oleh readiness probe, tanpa memanggil LLM)
+status_llm_terakhir: Dict[str, Dict[str, Any]] = {}
+
+
+def catat_cache(nama_cache: str, hit: bool) -> None:
+    """
+    Catat satu lookup cache (hit/miss) untuk metrik rasio hit
+
+    Args:
+        nama_cache: Nama cache (misal "user", "jwt")
+        hit: True jika data ditemukan di cache
+    """
+    PERMINTAAN_CACHE.labels(nama_cache, "hit" if hit else "miss").inc()
+    jumlah_hit, jumlah_total = _statistik_cache.get(nama_cache, (0, 0))
+    jumlah_hit += int(hit)
+    jumlah_total += 1
+    _statistik_cache[nama_cache] = (jumlah_hit, jumlah_total)
+    RASIO_HIT_CACHE.labels(nama_cache).set(jumlah_hit / jumlah_total)
+
+
+def catat_rate_limit(rute: str, dimensi: str, diizinkan: bool) -> None:
+    """Catat satu pengecekan rate limit (diizinkan/ditolak)"""
+    PERCOBAAN_RATE_LIMIT.labels(rute, dimensi, "diizinkan" if diizinkan else "ditolak").inc()
+
+
+def catat_operasi_db(driver: str, collection: str, operasi: str, durasi_detik: float, berhasil: bool = True) -> None:
+    """Catat latensi satu operasi database"""
+    LATENSI_DB.labels(driver, collection, operasi, "ok" if berhasil else "gagal").observe(durasi_detik)
+
+
+def catat_llm(
+    provider: str,
+    model: str,
+    durasi_detik: float,
+    token_input: int = 0,
+    token_output: int = 0,
+    berhasil: bool = True
+) -> None:
+    """Catat latensi dan pemakaian token satu panggilan LLM"""
+    LATENSI_LLM.labels(provider, model, "ok" if berhasil else "gagal").observe(durasi_detik)
+    status_llm_terakhir[provider] = {
+        "model": model,
+        "berhasil": berhasil,
+        "durasi_detik": round(durasi_detik, 3),
+        "waktu": time.time()
+    }
+    if token_input:
+        TOKEN_LLM.labels(provider, model, "input").inc(token_input)
+    if token_output:
+        TOKEN_LLM.labels(provider, model, "output").inc(token_output)
+
+
+def catat_rute_llm(rute: str, fallback: bool = False) -> None:
+    """Catat satu panggilan LLM per rute model (keputusan router atau fallback parse)"""
+    RUTE_LLM.labels(rute, "fallback" if fallback else "router").inc()
+
+
+# ===== MOTOR (PyMongo monitoring) =====
+
+class ListenerPerintahMotor(monitoring.CommandListener):
+    """
+    Ukur latensi setiap perintah MongoDB yang dikirim Motor.
+    Nama collection diambil dari event started lalu dipasangkan via request_id.
+    """
+
+    _BATAS_PENDING = 10000
+
+    def __init__(self) -> None:
+        self._pending: Dict[int, str] = {}
+
+    def started(self, event: Any) -> None:
+        if len(self._pending) >= self._BATAS_PENDING:
+            self._pending.clear()
+        target = event.command.get(event.command_name)
+        self._pending[event.request_id] = target if isinstance(target, str) else "-"
+
+    def succeeded(self, event: Any) -> None:
+        collection = self._pending.pop(event.request_id, "-")
+        catat_operasi_db("motor", collection, event.command_name, event.duration_micros / 1e6)
+
+    def failed(self, event: Any) -> None:
+        collection = self._pending.pop(event.request_id, "-")
+        catat_operasi_db("motor", collection, event.command_name, event.duration_micros / 1e6, berhasil=False)
+
+
+class ListenerPoolMotor(monitoring.ConnectionPoolListener):
+    """
+    Ukur waktu tunggu checkout koneksi dan jumlah koneksi yang sedang dipakai.
+    Motor menjalankan PyMongo di thread pool, dan event check_out_started &
+    checked_out terjadi di thread yang sama, jadi waktu mulai disimpan di thread-local.
+    """
+
+    def __init__(self) -> None:
+        self._lokal = threading.local()
+        self._kunci = threading.Lock()
+        self.koneksi_dipakai = 0
+
+    def connection_check_out_started(self, event: Any) -> None:
+        self._lokal.mulai = time.perf_counter()
+
+    def connection_checked_out(self, event: Any) -> None:
+        mulai = getattr(self._lokal, "mulai", None)
+        if mulai is not None:
+            TUNGGU_CHECKOUT_POOL.observe(time.perf_counter() - mulai)
+            self._lokal.mulai = None
+        with self._kunci:
+            self.koneksi_dipakai += 1
+        KONEKSI_POOL_DIPAKAI.inc()
+
+    def connection_check_out_failed(self, event: Any) -> None:
+        mulai = getattr(self._lokal, "mulai", None)
+        if mulai is not None:
+            TUNGGU_CHECKOUT_POOL.observe(time.perf_counter() - mulai)
+            self._lokal.mulai = None
+
+    def connection_checked_in(self, event: Any) -> None:
+        with self._kunci:
+            self.koneksi_dipakai = max(0, self.koneksi_dipakai - 1)
+        KONEKSI_POOL_DIPAKAI.dec()
+
+    def pool_created(self, event: Any) -> None:
+        pass
+
+    def pool_ready(self, event: Any) -> None:
+        pass
+
+    def pool_cleared(self, event: Any) -> None:
+        pass
+
+    def pool_closed(self, event: Any) -> None:
+        pass
+
+    def connection_created(self, event: Any) -> None:
+        pass
+
+    def connection_ready(self, event: Any) -> None:
+        pass
+
+    def connection_closed(self, event: Any) -> None:
+        pass
+
+
+# Singleton listener (didaftarkan ke AsyncIOMotorClient di app.database)
+listener_perintah_motor = ListenerPerintahMotor()
+listener_pool_motor = ListenerPoolMotor()
+
+
+# ===== EVENT LOOP LAG =====
+
+class MonitorEventLoop:
+    """
+    Task background yang tidur setiap interval dan mengukur seberapa terlambat ia dibangunkan.
+    Lag tinggi = ada kode sinkron yang memblokir event loop.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self._interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.lag_terakhir = 0.0
+
+    async def _loop(self) -> None:
+        while True:
+            jadwal = time.perf_counter() + self._interval
+            await asyncio.sleep(self._interval)
+            self.lag_terakhir = max(0.0, time.perf_counter() - jadwal)
+            LAG_EVENT_LOOP.set(self.lag_terakhir)
+
+    def mulai(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def hentikan(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+monitor_event_loop = MonitorEventLoop(interval=settings.event_loop_lag_interval)
+
+
+def render_metrik() -> Tuple[bytes, str]:
+    """
+    Render semua metrik dalam format teks Prometheus
+
+    Returns:
+        Tuple (isi, content_type)
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess  # type: ignore
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
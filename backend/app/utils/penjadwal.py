@@ -0,0 +1,122 @@
+"""
+Penjadwal job periodik in-process
+
+Menjalankan coroutine secara berkala di background (misal batch rekomendasi).
+Pada deployment multi-worker, lease di collection "kunci_job" memastikan hanya
+satu worker yang menjalankan job yang sama dalam satu interval.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from app.database import dapatkan_collection
+
+logger = logging.getLogger(__name__)
+
+KUNCI_JOB_COLLECTION = "kunci_job"
+
+# Identitas worker untuk lease (host + pid)
+ID_WORKER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def ambil_lease(nama_job: str, durasi_detik: float) -> bool:
+    """
+    Ambil lease job: berhasil jika belum ada pemegang atau lease sebelumnya kadaluarsa
+
+    Args:
+        nama_job: Nama job (dipakai sebagai _id dokumen lease)
+        durasi_detik: Lama lease berlaku
+
+    Returns:
+        True jika worker ini berhak menjalankan job
+    """
+    sekarang = datetime.utcnow()
+    try:
+        await dapatkan_collection(KUNCI_JOB_COLLECTION).find_one_and_update(
+            {"_id": nama_job, "berlaku_sampai": {"$lt": sekarang}},
+            {"$set": {
+                "pemegang": ID_WORKER,
+                "berlaku_sampai": sekarang + timedelta(seconds=durasi_detik)
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # Dokumen ada dan lease masih berlaku (upsert bentrok dengan _id yang sama)
+        return False
+    # Lease baru dibuat (upsert) atau lease lama yang kadaluarsa diambil alih
+    return True
+
+
+class PenjadwalPeriodik:
+    """
+    Task background yang menjalankan fungsi setiap interval detik
+
+    Exception dari fungsi dicatat lalu diabaikan, jadi satu kegagalan tidak
+    menghentikan jadwal berikutnya.
+    """
+
+    def __init__(
+        self,
+        nama: str,
+        interval_detik: float,
+        fungsi: Callable[[], Awaitable[object]],
+        pakai_lease: bool = True,
+        jeda_awal_detik: float = 0.0
+    ):
+        self.nama = nama
+        self._interval = interval_detik
+        self._fungsi = fungsi
+        self._pakai_lease = pakai_lease
+        self._jeda_awal = jeda_awal_detik
+        self._task: Optional[asyncio.Task] = None
+        self.terakhir_jalan: Optional[datetime] = None
+        self.durasi_terakhir: Optional[float] = None
+
+    async def jalankan_sekali(self) -> bool:
+        """
+        Jalankan fungsi sekali (dengan lease jika aktif)
+
+        Returns:
+            True jika fungsi dijalankan oleh worker ini
+        """
+        if self._pakai_lease and not await ambil_lease(self.nama, self._interval * 0.9):
+            return False
+
+        mulai = time.perf_counter()
+        await self._fungsi()
+        self.durasi_terakhir = time.perf_counter() - mulai
+        self.terakhir_jalan = datetime.utcnow()
+        logger.info(f"✅ Job {self.nama} selesai dalam {self.durasi_terakhir:.1f}s")
+        return True
+
+    async def _loop(self) -> None:
+        if self._jeda_awal > 0:
+            await asyncio.sleep(self._jeda_awal)
+        while True:
+            try:
+                await self.jalankan_sekali()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Job {self.nama} gagal: {e}")
+            await asyncio.sleep(self._interval)
+
+    def mulai(self) -> None:
+        if self._task is None and self._interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def hentikan(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
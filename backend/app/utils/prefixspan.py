@@ -0,0 +1,137 @@
+"""
+PrefixSpan (Pei et al., 2001) untuk urutan item tunggal
+
+Database urutan disimpan rata sebagai dua array NumPy: item (int32, semua urutan
+disambung) dan offset (urutan i = item[offset[i]:offset[i+1]]). Proyeksi memakai
+pseudo-projection (pasangan indeks urutan + posisi awal suffix), tidak menyalin
+suffix. Support = jumlah urutan (mahasiswa) yang mengandung pola sebagai
+subsequence (boleh ada item lain di antaranya).
+
+Subtree setiap item awal independen, sehingga bisa ditambang paralel:
+process pool memanggil inisialisasi_worker() sekali (database dikirim satu kali
+per worker) lalu tambang_subtree() per item awal.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Pola = Tuple[Tuple[int, ...], int]  # (item, support)
+Proyeksi = List[Tuple[int, int]]  # (indeks urutan, posisi awal suffix)
+
+_item_worker: Optional[np.ndarray] = None
+_offset_worker: Optional[np.ndarray] = None
+
+
+class PenyusunDatabase:
+    """Kumpulkan urutan satu per satu ke buffer int32 ringkas (tanpa list Python per urutan)"""
+
+    def __init__(self) -> None:
+        self._item = array("i")
+        self._offset = array("q", [0])
+
+    def __len__(self) -> int:
+        return len(self._offset) - 1
+
+    def tambah(self, urutan: Sequence[int]) -> None:
+        self._item.extend(urutan)
+        self._offset.append(len(self._item))
+
+    def selesai(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Database urutan (item int32, offset int64)"""
+        return np.frombuffer(self._item, dtype=np.int32).copy(), np.frombuffer(self._offset, dtype=np.int64).copy()
+
+
+def _perluas(
+    item: np.ndarray,
+    offset: np.ndarray,
+    proyeksi: Proyeksi
+) -> Tuple[Dict[int, int], Dict[int, Proyeksi]]:
+    """Hitung support item berikutnya & proyeksi barunya (kemunculan pertama per urutan)"""
+    support: Dict[int, int] = {}
+    proyeksi_baru: Dict[int, Proyeksi] = {}
+    for indeks, posisi in proyeksi:
+        awal = offset[indeks] + posisi
+        suffix = item[awal:offset[indeks + 1]]
+        if suffix.size == 0:
+            continue
+        unik, pertama = np.unique(suffix, return_index=True)
+        for x, p in zip(unik.tolist(), pertama.tolist()):
+            support[x] = support.get(x, 0) + 1
+            proyeksi_baru.setdefault(x, []).append((indeks, posisi + p + 1))
+    return support, proyeksi_baru
+
+
+def _tambang(
+    item: np.ndarray,
+    offset: np.ndarray,
+    prefix: Tuple[int, ...],
+    proyeksi: Proyeksi,
+    min_support: int,
+    maks_panjang: int,
+    hasil: List[Pola]
+) -> None:
+    if len(prefix) >= maks_panjang:
+        return
+    support, proyeksi_baru = _perluas(item, offset, proyeksi)
+    for x, jumlah in support.items():
+        if jumlah < min_support:
+            continue
+        pola = prefix + (x,)
+        hasil.append((pola, jumlah))
+        _tambang(item, offset, pola, proyeksi_baru[x], min_support, maks_panjang, hasil)
+
+
+def item_sering(item: np.ndarray, offset: np.ndarray, min_support: int) -> Dict[int, int]:
+    """Item dengan support (jumlah urutan) >= min_support"""
+    indeks_urutan = np.repeat(np.arange(len(offset) - 1), np.diff(offset))
+    pasangan = np.unique(np.stack([indeks_urutan, item.astype(np.int64)]), axis=1)
+    unik, jumlah = np.unique(pasangan[1], return_counts=True)
+    return {int(x): int(n) for x, n in zip(unik, jumlah) if n >= min_support}
+
+
+def tambang_subtree(
+    item_awal: int,
+    min_support: int,
+    maks_panjang: int,
+    item: Optional[np.ndarray] = None,
+    offset: Optional[np.ndarray] = None
+) -> List[Pola]:
+    """
+    Semua pola sering berawalan item_awal (panjang >= 2)
+
+    Args:
+        item_awal: Item pertama pola
+        min_support: Support minimal (jumlah urutan)
+        maks_panjang: Panjang pola maksimal
+        item, offset: Database urutan; default database worker (inisialisasi_worker)
+
+    Returns:
+        List (pola, support)
+    """
+    item = _item_worker if item is None else item
+    offset = _offset_worker if offset is None else offset
+    # Kemunculan pertama item_awal di setiap urutan
+    posisi_global = np.flatnonzero(item == item_awal)
+    indeks_urutan = np.searchsorted(offset, posisi_global, side="right") - 1
+    indeks_unik, pertama = np.unique(indeks_urutan, return_index=True)
+    posisi_lokal = posisi_global[pertama] - offset[indeks_unik] + 1
+    proyeksi: Proyeksi = list(zip(indeks_unik.tolist(), posisi_lokal.tolist()))
+    hasil: List[Pola] = []
+    _tambang(item, offset, (item_awal,), proyeksi, min_support, maks_panjang, hasil)
+    return hasil
+
+
+def inisialisasi_worker(item: np.ndarray, offset: np.ndarray) -> None:
+    """Initializer process pool: simpan database urutan di global worker"""
+    global _item_worker, _offset_worker
+    _item_worker, _offset_worker = item, offset
+
+
+def prefixspan(item: np.ndarray, offset: np.ndarray, min_support: int, maks_panjang: int) -> List[Pola]:
+    """PrefixSpan satu proses: semua pola sering panjang >= 2"""
+    hasil: List[Pola] = []
+    for x in item_sering(item, offset, min_support):
+        hasil.extend(tambang_subtree(x, min_support, maks_panjang, item, offset))
+    return hasil
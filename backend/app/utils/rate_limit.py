@@ -0,0 +1,185 @@
+"""
+Rate limit login/register dengan sliding window
+
+Setiap percobaan dicatat per kunci (IP atau email). Request ditolak jika jumlah
+percobaan dalam jendela waktu terakhir sudah mencapai batas. Pengecekan dilakukan
+sebelum query user dan bcrypt, jadi serangan brute force tidak menghabiskan CPU.
+
+Backend store:
+- memori : deque timestamp per kunci (per-proses, LRU dibatasi rate_limit_maks_kunci)
+- mongo  : collection "rate_limit" dengan TTL index, dibagi antar worker
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.database import dapatkan_collection
+from app.utils.observabilitas import catat_rate_limit
+
+logger = logging.getLogger(__name__)
+
+
+class PenyimpananMemori:
+    """Sliding log di memori: deque timestamp (monotonic) per kunci"""
+
+    def __init__(self, maks_kunci: int = 100000):
+        self._maks_kunci = maks_kunci
+        self._data: "OrderedDict[str, Deque[float]]" = OrderedDict()
+
+    async def coba(self, kunci: str, batas: int, jendela_detik: float) -> Optional[float]:
+        """
+        Catat satu percobaan jika masih di bawah batas
+
+        Returns:
+            None jika diizinkan, atau detik sampai percobaan berikutnya diizinkan
+        """
+        sekarang = time.monotonic()
+        batas_waktu = sekarang - jendela_detik
+
+        percobaan = self._data.get(kunci)
+        if percobaan is None:
+            percobaan = deque()
+            self._data[kunci] = percobaan
+            while len(self._data) > self._maks_kunci:
+                self._data.popitem(last=False)
+        else:
+            self._data.move_to_end(kunci)
+
+        while percobaan and percobaan[0] <= batas_waktu:
+            percobaan.popleft()
+
+        if len(percobaan) >= batas:
+            # Diizinkan lagi saat percobaan tertua keluar dari jendela
+            return percobaan[0] + jendela_detik - sekarang
+
+        percobaan.append(sekarang)
+        return None
+
+    async def reset(self, kunci: str) -> None:
+        self._data.pop(kunci, None)
+
+
+class PenyimpananMongo:
+    """
+    Sliding log di MongoDB, satu dokumen per percobaan: {kunci, created_at}.
+    Dokumen lama dibuang otomatis oleh TTL index.
+    """
+
+    NAMA_COLLECTION = "rate_limit"
+
+    def __init__(self) -> None:
+        self._index_siap = False
+
+    async def _pastikan_index(self, jendela_detik: float) -> Any:
+        collection = dapatkan_collection(self.NAMA_COLLECTION)
+        if self._index_siap:
+            return collection
+
+        await collection.create_index([("kunci", 1), ("created_at", -1)])
+        try:
+            await collection.create_index("created_at", expireAfterSeconds=int(math.ceil(jendela_detik)))
+        except Exception:
+            # Cosmos DB (MongoDB API) hanya mendukung TTL index pada field _ts
+            try:
+                await collection.create_index("_ts", expireAfterSeconds=int(math.ceil(jendela_detik)))
+            except Exception as e:
+                logger.warning(f"⚠️ Gagal membuat TTL index rate_limit: {e}")
+        self._index_siap = True
+        return collection
+
+    async def coba(self, kunci: str, batas: int, jendela_detik: float) -> Optional[float]:
+        collection = await self._pastikan_index(jendela_detik)
+        sekarang = datetime.utcnow()
+        filter_jendela = {
+            "kunci": kunci,
+            "created_at": {"$gt": sekarang - timedelta(seconds=jendela_detik)}
+        }
+
+        jumlah = await collection.count_documents(filter_jendela, limit=batas)
+        if jumlah >= batas:
+            # Ambil percobaan tertua ke-`batas` dari yang terbaru, yaitu yang paling cepat keluar jendela
+            dokumen = await collection.find(
+                filter_jendela, {"created_at": 1}
+            ).sort("created_at", -1).skip(batas - 1).limit(1).to_list(length=1)
+            if dokumen:
+                keluar = dokumen[0]["created_at"] + timedelta(seconds=jendela_detik)
+                return max(0.0, (keluar - sekarang).total_seconds())
+            return jendela_detik
+
+        await collection.insert_one({"kunci": kunci, "created_at": sekarang})
+        return None
+
+    async def reset(self, kunci: str) -> None:
+        await dapatkan_collection(self.NAMA_COLLECTION).delete_many({"kunci": kunci})
+
+
+class PembatasPercobaan:
+    """
+    Rate limiter sliding window untuk endpoint autentikasi
+
+    Setiap aturan (dimensi, kunci, batas) dicek berurutan; aturan pertama yang
+    terlampaui langsung menolak request dengan 429 + header Retry-After.
+    """
+
+    def __init__(self, penyimpanan: Any, jendela_detik: float):
+        self._penyimpanan = penyimpanan
+        self._jendela_detik = jendela_detik
+
+    async def periksa(self, rute: str, aturan: List[Tuple[str, Optional[str], int]]) -> None:
+        """
+        Periksa dan catat percobaan untuk semua aturan
+
+        Args:
+            rute: Nama rute (label metrik, misal "login")
+            aturan: List (dimensi, nilai_kunci, batas), misal [("ip", "1.2.3.4", 30)]
+
+        Raises:
+            HTTPException 429 jika salah satu aturan terlampaui
+        """
+        if not settings.rate_limit_aktif:
+            return
+
+        for dimensi, nilai, batas in aturan:
+            if not nilai or batas <= 0:
+                continue
+
+            try:
+                tunggu = await self._penyimpanan.coba(
+                    f"{rute}:{dimensi}:{nilai}", batas, self._jendela_detik
+                )
+            except Exception as e:
+                # Store bermasalah (misal database down): jangan kunci semua user
+                logger.warning(f"⚠️ Rate limit store gagal, request diizinkan: {e}")
+                return
+
+            catat_rate_limit(rute, dimensi, tunggu is None)
+            if tunggu is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Terlalu banyak percobaan. Silakan coba lagi nanti.",
+                    headers={"Retry-After": str(max(1, math.ceil(tunggu)))}
+                )
+
+    async def reset(self, rute: str, dimensi: str, nilai: str) -> None:
+        """Hapus riwayat percobaan satu kunci (misal email setelah login berhasil)"""
+        try:
+            await self._penyimpanan.reset(f"{rute}:{dimensi}:{nilai}")
+        except Exception as e:
+            logger.warning(f"⚠️ Gagal reset rate limit: {e}")
+
+
+def _buat_penyimpanan() -> Any:
+    if settings.rate_limit_backend.lower() == "mongo":
+        return PenyimpananMongo()
+    return PenyimpananMemori(maks_kunci=settings.rate_limit_maks_kunci)
+
+
+# Singleton limiter untuk /api/auth
+pembatas_auth = PembatasPercobaan(_buat_penyimpanan(), settings.rate_limit_jendela_detik)
@@ -0,0 +1,636 @@
+"""
+Sandbox eksekusi kode mahasiswa
+
+Setiap submisi dijalankan di subprocess Python terpisah (`python -I`) dengan:
+- rlimit CPU, memori (address space), ukuran file, jumlah file & proses
+- timeout wall-clock per test (setitimer) dan per submisi (kill process group)
+- isolasi (preexec_fn): namespace jaringan + mount baru, seluruh filesystem di-remount
+  read-only, /proc diganti tmpfs kosong (environment & cwd proses server tidak
+  terlihat), file .env ditutup /dev/null, direktori kerja berupa tmpfs kecil. Server
+  root: child turun ke uid sandbox unik per eksekusi (NPROC = 1); server bukan root:
+  user namespace tanpa pemetaan uid (direktori kerja tidak bisa ditulisi). Proses
+  server dibuat non-dumpable. Mode isolasi dicek sekali dan
+  dilog; tanpa isolasi eksekusi ditolak kecuali PENILAIAN_WAJIB_ISOLASI=false
+- environment kosong
+
+Integritas nilai: kode mahasiswa berjalan di proses yang sama dengan harness, jadi
+apa pun yang ada di proses itu bisa dibaca / ditulis olehnya. Karena itu nilai yang
+diharapkan (output_diharapkan / hasil_diharapkan) tidak pernah dikirim ke subprocess;
+harness hanya mengembalikan output mentah per test lewat pipe khusus (bukan stdout)
+bertanda nonce acak per eksekusi, dan perbandingan dilakukan di proses induk.
+Memalsukan hasil paling jauh hanya bisa memalsukan output - sama dengan menjawab.
+Output dan pesan error mahasiswa tidak pernah diteruskan ke feedback (hanya status,
+nama exception builtin dan durasi), sehingga sandbox tidak bisa dipakai membaca data.
+
+Satu subprocess menjalankan semua test case satu submisi (biaya start interpreter
+dibayar sekali); setiap test mendapat namespace baru. Subprocess dijadwalkan oleh
+PoolSandbox: N worker dengan antrian terbatas, submisi ditolak jika antrian penuh.
+"""
+
+import asyncio
+import builtins
+import ctypes
+import json
+import logging
+import os
+import re
+import resource
+import secrets
+import signal
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLONE_NEWNS = 0x00020000
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+PR_SET_DUMPABLE = 4
+MS_RDONLY, MS_NOSUID, MS_NODEV, MS_NOEXEC = 0x1, 0x2, 0x4, 0x8
+MS_REMOUNT, MS_NOATIME, MS_NODIRATIME, MS_BIND = 0x20, 0x400, 0x800, 0x1000
+MS_REC, MS_PRIVATE, MS_RELATIME = 0x4000, 0x40000, 0x200000
+# Filesystem semu yang tidak perlu di-remount read-only
+_FS_SEMU = {
+    "proc", "sysfs", "devtmpfs", "devpts", "mqueue", "cgroup", "cgroup2", "securityfs",
+    "debugfs", "tracefs", "pstore", "bpf", "configfs", "fusectl", "hugetlbfs", "autofs", "binfmt_misc",
+}
+DIREKTORI_BACKEND = Path(__file__).resolve().parents[2]
+STATUS_HARNESS = {"selesai", "error", "timeout"}
+MAKS_OUTPUT_TEST = 65536  # Karakter output per test yang dikembalikan harness
+
+# Harness yang dijalankan di subprocess; payload JSON dibaca dari stdin.
+# Semua state ada di dalam _utama() (bukan global __main__) dan kode mahasiswa
+# dijalankan dengan globals baru per test.
+HARNESS = r'''
+import builtins, io, json, os, signal, socket, sys, time
+
+
+class BatasWaktuTest(BaseException):
+    pass
+
+
+def _utama():
+    payload = json.loads(sys.stdin.read())
+    tests = payload.pop("tests")  # Hanya input / ekspresi, tanpa nilai yang diharapkan
+    batas_waktu = payload["batas_waktu_test"]
+    maks_output = payload["maks_output_test"]
+    saluran = os.fdopen(payload["fd_hasil"], "w", encoding="utf-8")
+    nonce = payload["nonce"]
+    sumber = payload.pop("kode")
+    del payload
+
+    def _alarm(signum, frame):
+        raise BatasWaktuTest()
+
+    def _jaringan_nonaktif(*args, **kwargs):
+        raise OSError("Akses jaringan tidak diizinkan di sandbox")
+
+    def _proses_nonaktif(*args, **kwargs):
+        raise OSError("Membuat proses baru tidak diizinkan di sandbox")
+
+    def _tulis_hasil(data):
+        saluran.write(nonce + json.dumps(data) + "\n")
+        saluran.flush()
+
+    signal.signal(signal.SIGALRM, _alarm)
+    # Bukan batas keamanan (bisa dilewati lewat _socket); isolasi sebenarnya = namespace jaringan
+    socket.socket = _jaringan_nonaktif
+    socket.create_connection = _jaringan_nonaktif
+    socket.getaddrinfo = _jaringan_nonaktif
+    # RLIMIT_NPROC tidak berlaku untuk root, jadi fork/exec juga diblokir di level Python
+    for nama in ("fork", "forkpty", "system", "popen", "posix_spawn", "posix_spawnp", "execv", "execve"):
+        if hasattr(os, nama):
+            setattr(os, nama, _proses_nonaktif)
+    import _posixsubprocess
+    _posixsubprocess.fork_exec = _proses_nonaktif
+
+    try:
+        kode = compile(sumber, "<submisi>", "exec")
+    except SyntaxError as e:
+        _tulis_hasil({"error_kompilasi": f"SyntaxError: {e.msg} (baris {e.lineno})"})
+        return
+
+    stdout_asli = sys.stdout
+    hasil = []
+    for test in tests:
+        keluaran = io.StringIO()
+        sys.stdin = io.StringIO(test.get("input", ""))
+        sys.stdout = keluaran
+        status, pesan, aktual = "selesai", None, None
+        mulai = time.perf_counter()
+        signal.setitimer(signal.ITIMER_REAL, batas_waktu)
+        try:
+            namespace = {"__name__": "__main__", "__builtins__": builtins}
+            exec(kode, namespace)
+            if test.get("ekspresi"):
+                aktual = repr(eval(test["ekspresi"], namespace))
+        except BatasWaktuTest:
+            status = "timeout"
+        except MemoryError:
+            status, pesan = "error", "MemoryError"
+        except SystemExit:
+            pass
+        except BaseException as e:
+            status, pesan = "error", type(e).__name__
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        durasi_ms = (time.perf_counter() - mulai) * 1000
+        sys.stdout = stdout_asli
+        sys.stdin = sys.__stdin__
+        if status == "selesai" and aktual is None:
+            aktual = keluaran.getvalue()
+        hasil.append({
+            "status": status,
+            "pesan": pesan,
+            "aktual": aktual[:maks_output] if aktual is not None else None,
+            "durasi_ms": round(durasi_ms, 2),
+        })
+
+    _tulis_hasil({"hasil": hasil})
+
+
+_utama()
+'''
+
+
+@dataclass
+class BatasSandbox:
+    """Batas sumber daya satu subprocess sandbox"""
+    waktu_cpu_detik: int = 5
+    waktu_test_detik: float = 2.0
+    waktu_total_detik: float = 10.0
+    memori_mb: int = 256
+    ukuran_file_kb: int = 1024
+    maks_file_terbuka: int = 64
+    maks_output_kb: int = 256
+    wajib_isolasi: bool = True  # Tolak eksekusi jika namespace (jaringan, mount) tidak tersedia
+    uid_awal: int = 60000  # uid sandbox saat server root; tiap eksekusi paralel memakai uid berbeda
+
+
+@dataclass
+class HasilSandbox:
+    """Hasil menjalankan semua test case satu submisi"""
+    hasil_test: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None  # Error kompilasi / sandbox (semua test dianggap gagal)
+    durasi_ms: float = 0.0
+
+
+class AntrianSandboxPenuh(RuntimeError):
+    """Antrian PoolSandbox penuh - submisi ditolak (dipetakan ke HTTP 503)"""
+
+
+_libc: Optional[Any] = None
+# Mode isolasi yang terbukti berhasil: (flag unshare, turunkan uid); None = belum dicek,
+# (0, False) = tidak tersedia
+_mode_isolasi: Optional[Tuple[int, bool]] = None
+_kunci_probe = asyncio.Lock()
+_uid_dipakai: Set[int] = set()
+
+
+def _unshare(flag: int) -> None:
+    """unshare(2) lewat os.unshare (Python >= 3.12) atau libc; melempar OSError jika gagal"""
+    if hasattr(os, "unshare"):
+        os.unshare(flag)  # type: ignore[attr-defined]
+        return
+    assert _libc is not None
+    if _libc.unshare(flag) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+
+
+def _mount(sumber: Optional[str], target: str, jenis: Optional[str], flag: int, data: Optional[str] = None) -> None:
+    assert _libc is not None
+    hasil = _libc.mount(
+        sumber.encode() if sumber else None,
+        target.encode(),
+        jenis.encode() if jenis else None,
+        ctypes.c_ulong(flag),
+        data.encode() if data else None,
+    )
+    if hasil != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"mount {target}: {os.strerror(errno)}")
+
+
+def _daftar_remount() -> List[Tuple[str, int]]:
+    """
+    Titik mount yang di-remount read-only di child beserta flag yang harus
+    dipertahankan (di user namespace flag mount yang terkunci tidak boleh dilepas).
+    Dibaca di induk agar preexec_fn hanya menjalankan syscall.
+    """
+    hasil: List[Tuple[str, int]] = []
+    with open("/proc/self/mounts", encoding="utf-8") as f:
+        for baris in f:
+            bagian = baris.split()
+            if len(bagian) < 3 or bagian[2] in _FS_SEMU:
+                continue
+            titik = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), bagian[1])
+            try:
+                f_flag = os.statvfs(titik).f_flag
+            except OSError:
+                continue
+            flag = f_flag & (MS_NOSUID | MS_NODEV | MS_NOEXEC | MS_NOATIME | MS_NODIRATIME)
+            if f_flag & os.ST_RELATIME:
+                flag |= MS_RELATIME
+            hasil.append((titik, flag))
+    return hasil
+
+
+def _berkas_rahasia() -> List[str]:
+    """File .env aplikasi (di direktori backend & direktori kerja server), ditutup /dev/null di child"""
+    direktori = {str(DIREKTORI_BACKEND), str(DIREKTORI_BACKEND.parent), os.getcwd()}
+    return sorted({
+        str(berkas) for d in direktori for berkas in Path(d).glob(".env*")
+        if berkas.is_file() and berkas.name != ".env.example"
+    })
+
+
+def _pasang_batas(
+    batas: BatasSandbox,
+    mode: Tuple[int, bool],
+    direktori: str,
+    uid: Optional[int],
+    remount: List[Tuple[str, int]],
+    rahasia: List[str]
+):
+    """
+    preexec_fn: namespace (jaringan + mount, opsional user), filesystem read-only,
+    /proc privat kosong, file .env ditutup, direktori kerja tmpfs, rlimit, lalu turun
+    ke uid tanpa hak akses. Error apa pun membuat spawn gagal (fail closed).
+    """
+    flag, turunkan_uid = mode
+
+    def _preexec() -> None:
+        if flag:
+            _unshare(flag)
+            _mount(None, "/", None, MS_REC | MS_PRIVATE)
+            for titik, flag_dipertahankan in remount:
+                try:
+                    _mount(None, titik, None, MS_REMOUNT | MS_BIND | MS_RDONLY | flag_dipertahankan)
+                except OSError:
+                    pass  # Mount yang sudah read-only / tidak bisa di-remount
+            for berkas in rahasia:
+                _mount("/dev/null", berkas, None, MS_BIND)
+            # /proc kosong: environment & cwd proses server (/proc/<ppid>/...) tidak terlihat
+            _mount("tmpfs", "/proc", "tmpfs", MS_NOSUID | MS_NODEV | MS_NOEXEC, "size=4k,mode=555")
+            _mount("tmpfs", direktori, "tmpfs", MS_NOSUID | MS_NODEV, f"size={batas.ukuran_file_kb}k,mode=777")
+            os.chdir(direktori)
+
+        memori = batas.memori_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_CPU, (batas.waktu_cpu_detik, batas.waktu_cpu_detik + 1))
+        resource.setrlimit(resource.RLIMIT_AS, (memori, memori))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (batas.ukuran_file_kb * 1024,) * 2)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (batas.maks_file_terbuka,) * 2)
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        if turunkan_uid and uid is not None:
+            # uid unik per eksekusi: NPROC = 1 berarti proses ini saja, tidak bisa fork
+            resource.setrlimit(resource.RLIMIT_NPROC, (1, 1))
+            os.setgroups([])
+            os.setresgid(uid, uid, uid)
+            os.setresuid(uid, uid, uid)
+        else:
+            # Tidak boleh fork/spawn proses baru
+            resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    return _preexec
+
+
+async def _probe_isolasi(batas: BatasSandbox) -> Tuple[int, bool]:
+    """
+    Cek sekali mode isolasi yang bisa dipakai dengan menjalankan interpreter kosong:
+    - root: namespace jaringan + mount, lalu turun ke uid sandbox (interpreter harus bisa
+      dibaca & dijalankan uid tersebut)
+    - bukan root: user namespace + jaringan + mount (proses sudah tanpa hak akses di luar namespace)
+    Sekaligus membuat proses server non-dumpable sehingga /proc/<pid server> tidak bisa
+    dibaca proses lain dengan uid yang sama.
+    """
+    global _libc, _mode_isolasi
+    async with _kunci_probe:
+        if _mode_isolasi is not None:
+            return _mode_isolasi
+        if _libc is None:
+            # Dimuat di induk, bukan di child setelah fork
+            _libc = ctypes.CDLL(None, use_errno=True)
+        if _libc.prctl(PR_SET_DUMPABLE, 0, 0, 0, 0) != 0:
+            logger.warning("⚠️ Sandbox penilaian: gagal membuat proses server non-dumpable")
+
+        # Server root wajib turun uid: di user namespace tanpa turun uid, child tetap
+        # uid 0 di luar namespace dan bisa membaca file milik root
+        if os.geteuid() == 0:
+            kandidat = [(CLONE_NEWNET | CLONE_NEWNS, True)]
+        else:
+            kandidat = [(CLONE_NEWUSER | CLONE_NEWNET | CLONE_NEWNS, False)]
+
+        _mode_isolasi = (0, False)
+        remount, rahasia = _daftar_remount(), _berkas_rahasia()
+        for mode in kandidat:
+            with tempfile.TemporaryDirectory(prefix="pahamkode-sandbox-") as direktori:
+                os.chmod(direktori, 0o755)
+                try:
+                    proses = await asyncio.create_subprocess_exec(
+                        sys.executable, "-I", "-c", "pass",
+                        stdout=asyncio.subprocess.DEVNULL,
+                        stderr=asyncio.subprocess.DEVNULL,
+                        cwd=direktori,
+                        env={},
+                        preexec_fn=_pasang_batas(batas, mode, direktori, batas.uid_awal, remount, rahasia),
+                    )
+                    if await proses.wait() == 0:
+                        _mode_isolasi = mode
+                        break
+                except Exception:
+                    continue
+
+        if _mode_isolasi[0]:
+            logger.info("✅ Sandbox penilaian: namespace jaringan & mount tersedia, proses terisolasi")
+        else:
+            logger.warning(
+                "⚠️ Sandbox penilaian: isolasi TIDAK tersedia (butuh root / CAP_SYS_ADMIN atau user "
+                f"namespace; server root: interpreter {sys.executable} harus bisa dijalankan uid "
+                f"{batas.uid_awal}). Kode mahasiswa bisa mengakses jaringan dan file server; "
+                "eksekusi ditolak kecuali PENILAIAN_WAJIB_ISOLASI=false."
+            )
+        return _mode_isolasi
+
+
+def _alokasi_uid(awal: int) -> int:
+    """uid sandbox yang sedang tidak dipakai eksekusi lain (dipanggil di event loop)"""
+    uid = awal
+    while uid in _uid_dipakai:
+        uid += 1
+    _uid_dipakai.add(uid)
+    return uid
+
+
+async def _komunikasi_terbatas(
+    proses: asyncio.subprocess.Process,
+    payload: bytes,
+    saluran: asyncio.StreamReader,
+    maks_byte: int
+) -> bytes:
+    """Kirim payload ke stdin lalu baca pipe hasil sampai EOF, hanya menyimpan maks_byte terakhir"""
+    assert proses.stdin is not None
+    try:
+        proses.stdin.write(payload)
+        await proses.stdin.drain()
+        proses.stdin.close()
+    except (BrokenPipeError, ConnectionResetError):
+        pass  # Proses sudah berhenti (misal gagal start karena rlimit)
+
+    keluaran = bytearray()
+    while True:
+        potongan = await saluran.read(65536)
+        if not potongan:
+            break
+        keluaran += potongan
+        if len(keluaran) > maks_byte:
+            del keluaran[:len(keluaran) - maks_byte]
+    await proses.wait()
+    return bytes(keluaran)
+
+
+def _nama_exception(pesan: Any) -> str:
+    """Nama kelas exception builtin dari pesan harness; selain itu "Exception" (teks bebas tidak diteruskan)"""
+    nama = str(pesan or "").split(":", 1)[0].strip()
+    kelas = getattr(builtins, nama, None)
+    return nama if isinstance(kelas, type) and issubclass(kelas, BaseException) else "Exception"
+
+
+def _nilai_hasil(data: Any, tests: List[Dict[str, Any]], batas: BatasSandbox) -> Optional[List[Dict[str, Any]]]:
+    """
+    Validasi hasil mentah harness lalu bandingkan dengan nilai yang diharapkan
+    (yang hanya ada di proses induk). None jika format / jumlah hasil tidak sesuai.
+
+    Semua yang dikirim subprocess dianggap tidak tepercaya: output dan pesan error
+    mahasiswa tidak diteruskan ke feedback (bisa berisi apa pun yang dibaca kode),
+    hanya status, nama exception builtin dan durasi yang dibulatkan.
+    """
+    if not isinstance(data, list) or len(data) != len(tests):
+        return None
+    maks_durasi = batas.waktu_test_detik * 1000
+    hasil_test: List[Dict[str, Any]] = []
+    for item, test in zip(data, tests):
+        if not isinstance(item, dict) or item.get("status") not in STATUS_HARNESS:
+            return None
+        aktual = item.get("aktual")
+        durasi = item.get("durasi_ms")
+        status = item["status"]
+        if status == "selesai":
+            if not isinstance(aktual, str):
+                return None
+            diharapkan = test.get("hasil_diharapkan", "") if test.get("ekspresi") else test.get("output_diharapkan", "")
+            if aktual.strip() == str(diharapkan).strip():
+                status, pesan = "lulus", None
+            else:
+                status, pesan = "gagal", "Output tidak sesuai dengan yang diharapkan"
+        elif status == "timeout":
+            pesan = f"Melebihi batas waktu {batas.waktu_test_detik}s"
+        else:
+            pesan = f"Terjadi {_nama_exception(item.get('pesan'))} saat kode dijalankan"
+        hasil_test.append({
+            "status": status,
+            "pesan": pesan,
+            "durasi_ms": float(round(min(max(durasi, 0.0), maks_durasi))) if isinstance(durasi, (int, float)) else 0.0,
+        })
+    return hasil_test
+
+
+def _cek_kompilasi(kode: str) -> Optional[str]:
+    """Kompilasi di proses induk: pesan error (hanya dari source) atau None jika valid"""
+    try:
+        compile(kode, "<submisi>", "exec")
+    except SyntaxError as e:
+        return f"SyntaxError: {e.msg} (baris {e.lineno})"
+    except (ValueError, RecursionError, MemoryError):
+        return "Kode tidak bisa dikompilasi"
+    return None
+
+
+async def jalankan_di_sandbox(
+    kode: str,
+    tests: List[Dict[str, Any]],
+    batas: Optional[BatasSandbox] = None
+) -> HasilSandbox:
+    """
+    Jalankan kode terhadap daftar test case di subprocess terisolasi
+
+    Args:
+        kode: Source code Python mahasiswa
+        tests: Test case, masing-masing {"input", "output_diharapkan"} (stdin/stdout)
+            atau {"ekspresi", "hasil_diharapkan"} (repr hasil ekspresi)
+        batas: Batas sumber daya (default BatasSandbox())
+
+    Returns:
+        HasilSandbox dengan status ("lulus"/"gagal"/"error"/"timeout") & durasi per test
+    """
+    batas = batas or BatasSandbox()
+    error_kompilasi = _cek_kompilasi(kode)
+    if error_kompilasi:
+        return HasilSandbox(error=error_kompilasi)
+
+    mode = await _probe_isolasi(batas)
+    if not mode[0] and batas.wajib_isolasi:
+        return HasilSandbox(error="Isolasi sandbox tidak tersedia di server")
+
+    nonce = secrets.token_hex(16)
+    uid = _alokasi_uid(batas.uid_awal) if mode[1] else None
+    fd_baca, fd_tulis = os.pipe()
+    payload = json.dumps({
+        "kode": kode,
+        # Nilai yang diharapkan tidak dikirim ke subprocess
+        "tests": [
+            {"ekspresi": t["ekspresi"]} if t.get("ekspresi") else {"input": t.get("input", "")}
+            for t in tests
+        ],
+        "batas_waktu_test": batas.waktu_test_detik,
+        "maks_output_test": MAKS_OUTPUT_TEST,
+        "fd_hasil": fd_tulis,
+        "nonce": nonce,
+    }).encode()
+
+    mulai = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    try:
+        with tempfile.TemporaryDirectory(prefix="pahamkode-sandbox-") as direktori:
+            os.chmod(direktori, 0o755)
+            try:
+                proses = await asyncio.create_subprocess_exec(
+                    sys.executable, "-I", "-c", HARNESS,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL,
+                    cwd=direktori,
+                    env={"PYTHONIOENCODING": "utf-8", "PYTHONDONTWRITEBYTECODE": "1"},
+                    preexec_fn=_pasang_batas(batas, mode, direktori, uid, _daftar_remount(), _berkas_rahasia()),
+                    start_new_session=True,
+                    pass_fds=(fd_tulis,),
+                )
+            except BaseException:
+                os.close(fd_baca)
+                raise
+            finally:
+                os.close(fd_tulis)
+
+            saluran = asyncio.StreamReader(limit=batas.maks_output_kb * 1024)
+            transport, _ = await loop.connect_read_pipe(
+                lambda: asyncio.StreamReaderProtocol(saluran), os.fdopen(fd_baca, "rb", buffering=0)
+            )
+            try:
+                keluaran_bytes: Optional[bytes] = await asyncio.wait_for(
+                    _komunikasi_terbatas(proses, payload, saluran, batas.maks_output_kb * 1024),
+                    timeout=batas.waktu_total_detik
+                )
+            except asyncio.TimeoutError:
+                keluaran_bytes = None
+            finally:
+                transport.close()
+                if proses.returncode is None:
+                    try:
+                        os.killpg(proses.pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                    await proses.wait()
+    finally:
+        # NPROC = 1 -> tidak ada proses turunan yang bisa tersisa dengan uid ini
+        if uid is not None:
+            _uid_dipakai.discard(uid)
+
+    durasi_ms = (time.perf_counter() - mulai) * 1000
+    if keluaran_bytes is None:
+        return HasilSandbox(error=f"Eksekusi melebihi batas waktu {batas.waktu_total_detik}s", durasi_ms=durasi_ms)
+
+    # Baris hasil harness diawali nonce eksekusi ini
+    for baris in reversed(keluaran_bytes.decode("utf-8", errors="replace").splitlines()):
+        if not baris.startswith(nonce):
+            continue
+        try:
+            data = json.loads(baris[len(nonce):])
+        except ValueError:
+            break
+        if not isinstance(data, dict):
+            break
+        hasil_test = _nilai_hasil(data.get("hasil"), tests, batas)
+        if hasil_test is None:
+            return HasilSandbox(error="Hasil sandbox tidak valid", durasi_ms=durasi_ms)
+        return HasilSandbox(hasil_test=hasil_test, durasi_ms=durasi_ms)
+
+    if proses.returncode is not None and proses.returncode < 0:
+        sinyal = -proses.returncode
+        pesan = "melebihi batas CPU" if sinyal in (signal.SIGXCPU, signal.SIGKILL) else f"dihentikan sinyal {sinyal}"
+        return HasilSandbox(error=f"Proses {pesan}", durasi_ms=durasi_ms)
+    return HasilSandbox(error="Proses berhenti tanpa hasil (kemungkinan melebihi batas memori)", durasi_ms=durasi_ms)
+
+
+class PoolSandbox:
+    """
+    Pool worker sandbox dengan antrian terbatas
+
+    - maks_paralel subprocess berjalan bersamaan (idealnya = jumlah core)
+    - maks_antrian submisi menunggu; lebih dari itu jalankan() melempar AntrianSandboxPenuh
+    """
+
+    def __init__(self, maks_paralel: int, maks_antrian: int, batas: Optional[BatasSandbox] = None):
+        self.maks_paralel = max(1, maks_paralel)
+        self._maks_antrian = maks_antrian
+        self._batas = batas or BatasSandbox()
+        self._antrian: Optional[asyncio.Queue] = None
+        self._worker: List[asyncio.Task] = []
+
+    @property
+    def panjang_antrian(self) -> int:
+        return self._antrian.qsize() if self._antrian is not None else 0
+
+    def _pastikan_worker(self) -> asyncio.Queue:
+        if self._antrian is None:
+            self._antrian = asyncio.Queue(maxsize=self._maks_antrian)
+            self._worker = [asyncio.create_task(self._loop_worker()) for _ in range(self.maks_paralel)]
+        return self._antrian
+
+    async def _loop_worker(self) -> None:
+        assert self._antrian is not None
+        while True:
+            kode, tests, future = await self._antrian.get()
+            try:
+                if not future.cancelled():
+                    hasil = await jalankan_di_sandbox(kode, tests, self._batas)
+                    if not future.cancelled():
+                        future.set_result(hasil)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Sandbox gagal dijalankan: {e}")
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._antrian.task_done()
+
+    async def jalankan(self, kode: str, tests: List[Dict[str, Any]]) -> HasilSandbox:
+        """
+        Masukkan submisi ke antrian dan tunggu hasilnya
+
+        Raises:
+            AntrianSandboxPenuh: Jika antrian sudah penuh
+        """
+        antrian = self._pastikan_worker()
+        future: "asyncio.Future[HasilSandbox]" = asyncio.get_running_loop().create_future()
+        try:
+            antrian.put_nowait((kode, tests, future))
+        except asyncio.QueueFull:
+            raise AntrianSandboxPenuh("Antrian penilaian penuh, coba lagi beberapa saat lagi")
+        return await future
+
+    async def hentikan(self) -> None:
+        for task in self._worker:
+            task.cancel()
+        for task in self._worker:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._worker = []
+        self._antrian = None
@@ -0,0 +1,186 @@
+"""
+Sidik jari struktur kode Python (AST ternormalisasi + hash subtree)
+
+Normalisasi:
+- Nama variabel/argumen diganti berurutan (v0, v1, ...) sesuai kemunculan pertama,
+  jadi kode yang hanya beda penamaan dianggap sama. Nama builtin (print, len, ...)
+  dan nama fungsi/kelas yang didefinisikan (dipakai test case ekspresi) tetap.
+- Nama yang bukan variabel (keyword argumen, modul import, atribut) ikut apa adanya,
+  jadi sorted(x, reverse=True) dan sorted(x, key=True) berbeda.
+- Docstring dibuang.
+- Literal: untuk kemiripan hanya tipenya yang dihitung; untuk hash_tepat nilainya ikut.
+
+Kemiripan = koefisien Dice atas multiset hash subtree (statement & ekspresi).
+Hash memakai blake2b sehingga stabil antar proses.
+"""
+
+import ast
+import builtins
+import hashlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Set, Tuple
+
+NAMA_BUILTIN = frozenset(dir(builtins))
+MAKS_PANJANG_KODE = 100_000  # Karakter; kode lebih panjang tidak dianalisis
+
+# Field string yang berisi nama variabel (dinormalisasi v0, v1, ...); field non-AST lain
+# (keyword.arg, ImportFrom.module, Attribute.attr, ...) masuk ke label apa adanya
+_FIELD_VARIABEL = {
+    (ast.Name, "id"), (ast.arg, "arg"), (ast.alias, "asname"), (ast.Global, "names"),
+    (ast.Nonlocal, "names"), (ast.ExceptHandler, "name"), (ast.MatchAs, "name"),
+    (ast.MatchStar, "name"), (ast.MatchMapping, "rest"),
+}
+
+# Node yang tidak dihitung sebagai subtree sendiri (dilipat ke key induknya)
+_NODE_DILIPAT = (ast.expr_context, ast.operator, ast.boolop, ast.cmpop, ast.unaryop)
+
+
+@dataclass
+class SidikJariKode:
+    """Sidik jari struktur satu potong kode"""
+    hash_tepat: str  # Hash seluruh AST (nama dinormalisasi, literal dengan nilai)
+    subtree: Counter  # Multiset hash subtree (literal hanya tipe)
+    jumlah_node: int
+
+
+def _hash(teks: str) -> str:
+    return hashlib.blake2b(teks.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _siapkan_tree(tree: ast.AST) -> Set[str]:
+    """
+    Buang docstring (in-place) dan kumpulkan nama fungsi & kelas yang didefinisikan
+    (nama ini tidak dinormalisasi) dalam satu traversal
+    """
+    nama_tetap: Set[str] = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        if not isinstance(node, ast.Module):
+            nama_tetap.add(node.name)
+        body = node.body
+        if (
+            body and isinstance(body[0], ast.Expr)
+            and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str)
+        ):
+            node.body = body[1:] or [ast.Pass()]
+    return nama_tetap
+
+
+class _Penghitung:
+    """Traversal post-order yang menghitung hash struktur & hash tepat setiap node"""
+
+    def __init__(self, nama_tetap: Set[str]):
+        self._nama_tetap = nama_tetap
+        self._alias: Dict[str, str] = {}
+        self.subtree: Counter = Counter()
+        self.jumlah_node = 0
+
+    def _nama(self, nama: str) -> str:
+        if nama in NAMA_BUILTIN or nama in self._nama_tetap:
+            return nama
+        alias = self._alias.get(nama)
+        if alias is None:
+            alias = f"v{len(self._alias)}"
+            self._alias[nama] = alias
+        return alias
+
+    def _label(self, node: ast.AST, operator: List[str]) -> Tuple[str, str]:
+        """
+        Label node untuk (struktur, tepat): jenis node + operator yang dilipat + semua
+        field non-AST (nama keyword, modul & level ImportFrom, asname, konversi
+        f-string, ...). Field yang mengikat variabel dinormalisasi seperti Name.
+        """
+        jenis = type(node).__name__
+        if isinstance(node, ast.Constant):
+            return f"{jenis}:{type(node.value).__name__}", f"{jenis}:{node.value!r}"
+
+        bagian = list(operator)
+        for nama_field in node._fields:
+            nilai = getattr(node, nama_field, None)
+            if isinstance(nilai, ast.AST) or (isinstance(nilai, list) and any(isinstance(x, ast.AST) for x in nilai)):
+                continue
+            variabel = (type(node), nama_field) in _FIELD_VARIABEL
+            for item in (nilai if isinstance(nilai, list) else [nilai]):
+                bagian.append(self._nama(item) if variabel and isinstance(item, str) else repr(item))
+        label = f"{jenis}:{'/'.join(bagian)}" if bagian else jenis
+        return label, label
+
+    def _buka(self, node: ast.AST) -> List[Any]:
+        """Frame traversal: [label_struktur, label_tepat, anak, indeks anak berikutnya, hash anak]"""
+        anak_list: List[ast.AST] = []
+        operator: List[str] = []
+        for nama_field in node._fields:
+            nilai = getattr(node, nama_field, None)
+            for anak in (nilai if isinstance(nilai, list) else (nilai,)):
+                if isinstance(anak, _NODE_DILIPAT):
+                    if not isinstance(anak, ast.expr_context):
+                        operator.append(type(anak).__name__)
+                elif isinstance(anak, ast.AST):
+                    anak_list.append(anak)
+
+        # Label dihitung sebelum anak dikunjungi agar alias nama mengikuti urutan kemunculan
+        label_struktur, label_tepat = self._label(node, operator)
+        return [node, label_struktur, label_tepat, anak_list, 0, [], []]
+
+    def kunjungi(self, akar: ast.AST) -> Tuple[str, str]:
+        # Iteratif dengan stack eksplisit: kode bersarang sangat dalam tidak memicu RecursionError
+        tumpukan = [self._buka(akar)]
+        hasil: Tuple[str, str] = ("", "")
+        while tumpukan:
+            frame = tumpukan[-1]
+            node, label_struktur, label_tepat, anak_list, indeks, anak_struktur, anak_tepat = frame
+            if indeks < len(anak_list):
+                frame[4] = indeks + 1
+                tumpukan.append(self._buka(anak_list[indeks]))
+                continue
+
+            tumpukan.pop()
+            h_struktur = _hash(f"{label_struktur}({','.join(anak_struktur)})")
+            h_tepat = _hash(f"{label_tepat}({','.join(anak_tepat)})")
+            self.jumlah_node += 1
+            if isinstance(node, (ast.stmt, ast.expr)):
+                self.subtree[h_struktur] += 1
+            if tumpukan:
+                tumpukan[-1][5].append(h_struktur)
+                tumpukan[-1][6].append(h_tepat)
+            hasil = (h_struktur, h_tepat)
+        return hasil
+
+
+def sidik_jari(kode: str) -> SidikJariKode:
+    """
+    Hitung sidik jari struktur kode
+
+    Args:
+        kode: Source code Python
+
+    Returns:
+        SidikJariKode
+
+    Raises:
+        SyntaxError: Jika kode tidak bisa di-parse
+        ValueError: Jika kode melebihi MAKS_PANJANG_KODE atau terlalu dalam untuk di-parse
+    """
+    if len(kode) > MAKS_PANJANG_KODE:
+        raise ValueError(f"Kode melebihi {MAKS_PANJANG_KODE} karakter")
+    try:
+        tree = ast.parse(kode)
+    except (RecursionError, MemoryError):
+        # Parser / compiler CPython rekursif: ekspresi bersarang ribuan level
+        raise ValueError("Kode terlalu dalam / kompleks untuk dianalisis") from None
+    penghitung = _Penghitung(_siapkan_tree(tree))
+    _, h_tepat = penghitung.kunjungi(tree)
+    return SidikJariKode(hash_tepat=h_tepat, subtree=penghitung.subtree, jumlah_node=penghitung.jumlah_node)
+
+
+def kemiripan_struktur(a: SidikJariKode, b: SidikJariKode) -> float:
+    """
+    Koefisien Dice multiset subtree: 2 * |A ∩ B| / (|A| + |B|), 0.0 - 1.0
+    """
+    total = sum(a.subtree.values()) + sum(b.subtree.values())
+    if total == 0:
+        return 1.0 if a.hash_tepat == b.hash_tepat else 0.0
+    irisan = sum((a.subtree & b.subtree).values())
+    return 2.0 * irisan / total
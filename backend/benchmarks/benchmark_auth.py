@@ -0,0 +1,64 @@
+"""
+Microbenchmark overhead autentikasi per request (decode JWT)
+
+Mengukur biaya dekode_token untuk:
+- jose tanpa cache   : decode + verifikasi HMAC + validasi klaim setiap request
+- pyjwt tanpa cache  : sama, dengan backend PyJWT (jika terinstall)
+- dengan cache       : token yang sama dipakai berulang (pola polling SPA)
+
+Cara pakai (dari direktori backend/):
+    python -m benchmarks.benchmark_auth --iterasi 20000
+"""
+
+import argparse
+import importlib
+import time
+from typing import Callable
+
+
+def _ukur(nama: str, fungsi: Callable[[], object], iterasi: int) -> None:
+    """Jalankan fungsi berulang kali dan cetak biaya per panggilan"""
+    fungsi()  # warm-up
+    mulai = time.perf_counter()
+    for _ in range(iterasi):
+        fungsi()
+    durasi = time.perf_counter() - mulai
+    print(f"  {nama:<22}: {durasi / iterasi * 1e6:8.2f} µs/request ({iterasi / durasi:,.0f} request/detik)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmark decode JWT")
+    parser.add_argument("--iterasi", type=int, default=20000, help="Jumlah decode per skenario")
+    args = parser.parse_args()
+
+    from app.config import settings
+    from app.utils import auth
+
+    token = auth.buat_access_token(data={"sub": "6765f0c2a1b2c3d4e5f60718", "role": "mahasiswa", "status": "aktif"})
+
+    print("=" * 60)
+    print(f"🔑 Microbenchmark autentikasi ({args.iterasi} iterasi, {settings.jwt_algorithm})")
+    print("=" * 60)
+
+    def tanpa_cache() -> object:
+        auth._cache_klaim_jwt.kosongkan()
+        return auth.dekode_token(token)
+
+    _ukur("jose tanpa cache", tanpa_cache, args.iterasi)
+
+    try:
+        importlib.import_module("jwt")
+        settings.jwt_backend = "pyjwt"
+        auth._decode_jwt = auth._buat_decoder_jwt()
+        _ukur("pyjwt tanpa cache", tanpa_cache, args.iterasi)
+        settings.jwt_backend = "jose"
+        auth._decode_jwt = auth._buat_decoder_jwt()
+    except ImportError:
+        print("  pyjwt tanpa cache     : dilewati (PyJWT tidak terinstall)")
+
+    auth._cache_klaim_jwt.kosongkan()
+    _ukur("dengan cache", lambda: auth.dekode_token(token), args.iterasi)
+
+
+if __name__ == "__main__":
+    main()
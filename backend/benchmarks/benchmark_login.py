@@ -0,0 +1,98 @@
+"""
+Benchmark throughput login (verifikasi bcrypt) dengan konkurensi
+
+Membandingkan dua mode:
+- sinkron  : bcrypt.checkpw dipanggil langsung di handler async (perilaku lama)
+- executor : verifikasi_password_async (thread pool bcrypt terbatas)
+
+Selain throughput login, benchmark juga mengukur latensi "request ringan"
+yang berjalan bersamaan (probe tiap 10 ms) untuk melihat seberapa lama
+event loop tertahan selama badai login.
+
+Cara pakai (dari direktori backend/):
+    python -m benchmarks.benchmark_login --jumlah 64 --konkurensi 32 --rounds 12 --workers 4
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from app.config import settings
+
+
+def _persentil(data: List[float], p: float) -> float:
+    """Persentil sederhana (nearest-rank)"""
+    if not data:
+        return 0.0
+    urut = sorted(data)
+    indeks = min(len(urut) - 1, max(0, int(round(p / 100 * len(urut))) - 1))
+    return urut[indeks]
+
+
+async def _probe(latensi: List[float], selesai: asyncio.Event) -> None:
+    """Simulasi request ringan: ukur jeda antara jadwal dan eksekusi"""
+    while not selesai.is_set():
+        mulai = time.perf_counter()
+        await asyncio.sleep(0.01)
+        latensi.append(time.perf_counter() - mulai - 0.01)
+
+
+async def jalankan_mode(mode: str, jumlah: int, konkurensi: int, password_hash: str) -> None:
+    """Jalankan satu skenario benchmark dan cetak hasilnya"""
+    from app.utils.auth import verifikasi_password, verifikasi_password_async
+
+    semaphore = asyncio.Semaphore(konkurensi)
+    latensi_login: List[float] = []
+    latensi_probe: List[float] = []
+    selesai = asyncio.Event()
+
+    async def login() -> None:
+        async with semaphore:
+            mulai = time.perf_counter()
+            if mode == "sinkron":
+                ok = verifikasi_password("password-rahasia", password_hash)
+            else:
+                ok = await verifikasi_password_async("password-rahasia", password_hash)
+            assert ok
+            latensi_login.append(time.perf_counter() - mulai)
+
+    probe = asyncio.create_task(_probe(latensi_probe, selesai))
+    mulai_total = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(jumlah)))
+    durasi_total = time.perf_counter() - mulai_total
+    selesai.set()
+    await probe
+
+    print(f"\n[{mode}]")
+    print(f"  Throughput login      : {jumlah / durasi_total:.1f} login/detik ({durasi_total:.2f} detik total)")
+    print(f"  Latensi login p50/p95 : {statistics.median(latensi_login) * 1000:.0f} / {_persentil(latensi_login, 95) * 1000:.0f} ms")
+    print(f"  Lag request lain p95  : {_persentil(latensi_probe, 95) * 1000:.1f} ms (maks {max(latensi_probe, default=0) * 1000:.1f} ms)")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark login bcrypt")
+    parser.add_argument("--jumlah", type=int, default=64, help="Jumlah login")
+    parser.add_argument("--konkurensi", type=int, default=32, help="Login bersamaan")
+    parser.add_argument("--rounds", type=int, default=settings.bcrypt_rounds, help="Cost factor bcrypt")
+    parser.add_argument("--workers", type=int, default=settings.bcrypt_max_workers, help="Thread executor bcrypt")
+    args = parser.parse_args()
+
+    settings.bcrypt_rounds = args.rounds
+    settings.bcrypt_max_workers = args.workers
+
+    from app.utils.auth import hash_password
+    password_hash = hash_password("password-rahasia")
+
+    print("=" * 60)
+    print(f"🔐 Benchmark login: {args.jumlah} login, konkurensi {args.konkurensi}, "
+          f"cost {args.rounds}, workers {args.workers}")
+    print("=" * 60)
+
+    await jalankan_mode("sinkron", args.jumlah, args.konkurensi, password_hash)
+    await jalankan_mode("executor", args.jumlah, args.konkurensi, password_hash)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
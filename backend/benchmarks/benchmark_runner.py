@@ -0,0 +1,136 @@
+"""
+Benchmark throughput penilaian exercise (sandbox subprocess)
+
+Menjalankan sejumlah submisi berbeda (tanpa cache) melalui PoolSandbox dengan
+beberapa ukuran pool, lalu mencetak submisi/detik total dan per core. Di akhir,
+sebagai pembanding: submisi identik (cache hit penilaian_service) dan submisi yang
+struktur AST-nya sama dengan solusi referensi (dinilai tanpa subprocess).
+
+Cara pakai (dari direktori backend/):
+    python -m benchmarks.benchmark_runner --jumlah 100 --workers 1,2,4 --tests 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import List
+
+from app.utils.sandbox import BatasSandbox, PoolSandbox
+
+KODE_SUBMISI = """
+def faktorial(n):
+    hasil = 1
+    for i in range(2, n + 1):
+        hasil *= i
+    return hasil
+
+if __name__ == "__main__":
+    import sys
+    data = sys.stdin.read().split()
+    if data:
+        print(faktorial(int(data[0])))
+# varian {nomor}
+"""
+
+
+def _buat_tests(jumlah: int) -> List[str]:
+    tests = []
+    for i in range(jumlah):
+        n = 5 + i
+        faktorial = 1
+        for k in range(2, n + 1):
+            faktorial *= k
+        if i % 2 == 0:
+            tests.append(json.dumps({"input": str(n), "output_diharapkan": str(faktorial)}))
+        else:
+            tests.append(json.dumps({"ekspresi": f"faktorial({n})", "hasil_diharapkan": str(faktorial)}))
+    return tests
+
+
+def _persentil(data: List[float], p: float) -> float:
+    """Persentil sederhana (nearest-rank)"""
+    if not data:
+        return 0.0
+    urut = sorted(data)
+    indeks = min(len(urut) - 1, max(0, int(round(p / 100 * len(urut))) - 1))
+    return urut[indeks]
+
+
+async def jalankan_pool(workers: int, jumlah: int, tests: List[str]) -> None:
+    """Jalankan jumlah submisi berbeda pada pool berukuran workers"""
+    from app.services.penilaian_service import parse_test_cases
+
+    pool = PoolSandbox(maks_paralel=workers, maks_antrian=jumlah, batas=BatasSandbox())
+    test_list = parse_test_cases(tests)
+    latensi: List[float] = []
+
+    async def submit(nomor: int) -> None:
+        mulai = time.perf_counter()
+        hasil = await pool.jalankan(KODE_SUBMISI.format(nomor=nomor), test_list)
+        assert hasil.error is None and all(t["status"] == "lulus" for t in hasil.hasil_test), hasil
+        latensi.append(time.perf_counter() - mulai)
+
+    mulai_total = time.perf_counter()
+    await asyncio.gather(*(submit(i) for i in range(jumlah)))
+    durasi_total = time.perf_counter() - mulai_total
+    await pool.hentikan()
+
+    core_dipakai = min(workers, os.cpu_count() or 1)
+    throughput = jumlah / durasi_total
+    print(f"\n[workers={workers}]")
+    print(f"  Throughput            : {throughput:.1f} submisi/detik ({durasi_total:.2f} detik total)")
+    print(f"  Per core              : {throughput / core_dipakai:.1f} submisi/detik/core ({core_dipakai} core)")
+    print(f"  Latensi p50/p95       : {statistics.median(latensi) * 1000:.0f} / {_persentil(latensi, 95) * 1000:.0f} ms")
+
+
+async def jalankan_cache(jumlah: int, tests: List[str]) -> None:
+    """Submisi identik: hanya eksekusi pertama yang menjalankan sandbox"""
+    from app.services.penilaian_service import nilai_submisi, pool_sandbox
+
+    kode = KODE_SUBMISI.format(nomor="cache")
+    mulai = time.perf_counter()
+    for _ in range(jumlah):
+        await nilai_submisi("benchmark", kode, tests, solusi_referensi="")
+    durasi_total = time.perf_counter() - mulai
+    await pool_sandbox.hentikan()
+    print("\n[cache hit]")
+    print(f"  Throughput            : {jumlah / durasi_total:.0f} submisi/detik")
+
+    # Nama variabel beda, struktur sama dengan referensi -> tanpa subprocess
+    referensi = KODE_SUBMISI.format(nomor="referensi")
+    varian = [KODE_SUBMISI.replace("hasil", f"hasil_{i}").format(nomor=i) for i in range(jumlah)]
+    mulai = time.perf_counter()
+    for kode in varian:
+        penilaian = await nilai_submisi("benchmark-struktur", kode, tests, solusi_referensi=referensi)
+        assert penilaian is not None and penilaian["hasil_test"] is None
+    durasi_total = time.perf_counter() - mulai
+    print("\n[struktur identik]")
+    print(f"  Throughput            : {jumlah / durasi_total:.0f} submisi/detik "
+          f"({durasi_total / jumlah * 1e6:.0f} µs/submisi)")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark throughput sandbox penilaian")
+    parser.add_argument("--jumlah", type=int, default=100, help="Jumlah submisi per skenario")
+    parser.add_argument("--workers", type=str, default=f"1,{os.cpu_count() or 1}", help="Ukuran pool, dipisah koma")
+    parser.add_argument("--tests", type=int, default=5, help="Test case per submisi")
+    args = parser.parse_args()
+
+    tests = _buat_tests(args.tests)
+    daftar_workers = sorted({int(w) for w in args.workers.split(",") if w.strip()})
+
+    print("=" * 60)
+    print(f"🧪 Benchmark sandbox: {args.jumlah} submisi x {args.tests} test, "
+          f"workers {daftar_workers}, {os.cpu_count()} core")
+    print("=" * 60)
+
+    for workers in daftar_workers:
+        await jalankan_pool(workers, args.jumlah, tests)
+    await jalankan_cache(args.jumlah, tests)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())